@@ -0,0 +1,70 @@
+import argparse
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+
+import pandas as pd
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from monitoring.time_buckets import MinuteBucketer
+
+
+def legacy_minute_key(timestamp):
+    try:
+        dt = pd.to_datetime(timestamp)
+        return dt.floor('1min').strftime('%Y-%m-%d %H:%M:%S')
+    except:
+        return str(timestamp)
+
+
+def generate_timestamps(count, events_per_second):
+    start = datetime.now().replace(microsecond=0)
+    return [
+        (start + timedelta(seconds=i // events_per_second)).strftime('%Y-%m-%d %H:%M:%S')
+        for i in range(count)
+    ]
+
+
+def time_call(func, timestamps):
+    started = time.perf_counter()
+    for ts in timestamps:
+        func(ts)
+    return time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--events", type=int, default=200000)
+    parser.add_argument("--legacy-events", type=int, default=20000)
+    parser.add_argument("--events-per-second", type=int, default=50)
+    args = parser.parse_args()
+
+    timestamps = generate_timestamps(args.events, args.events_per_second)
+    bucketer = MinuteBucketer()
+
+    for ts in timestamps[:1000]:
+        assert bucketer.minute_key(ts) == legacy_minute_key(ts), ts
+
+    legacy_sample = timestamps[:args.legacy_events]
+    legacy_elapsed = time_call(legacy_minute_key, legacy_sample)
+    fast_elapsed = time_call(MinuteBucketer().epoch_minute, timestamps)
+    fallback_elapsed = time_call(MinuteBucketer()._fallback, legacy_sample)
+
+    legacy_ns = legacy_elapsed / len(legacy_sample) * 1e9
+    fast_ns = fast_elapsed / len(timestamps) * 1e9
+    fallback_ns = fallback_elapsed / len(legacy_sample) * 1e9
+
+    print("=" * 60)
+    print("MINUTE BUCKETING BENCHMARK")
+    print("=" * 60)
+    print(f"   Events: {len(timestamps)} ({args.events_per_second}/s)")
+    print(f"   legacy get_minute_key:     {legacy_ns:10.0f} ns/event")
+    print(f"   pandas fallback only:      {fallback_ns:10.0f} ns/event")
+    print(f"   MinuteBucketer fast path:  {fast_ns:10.0f} ns/event")
+    print(f"   Speedup vs legacy:         {legacy_ns / fast_ns:10.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+import argparse
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from storage.time_columns import ensure_time_columns
+
+STATUSES = ('approved', 'backend_reversed', 'denied', 'failed', 'refunded', 'reversed')
+START_TS = 1704067200
+
+GENERATE = f"""
+    WITH RECURSIVE minutes(n) AS (
+        SELECT 0 UNION ALL SELECT n + 1 FROM minutes WHERE n + 1 < ?
+    ),
+    statuses(status, weight) AS (
+        VALUES {', '.join(f"('{status}', {i})" for i, status in enumerate(STATUSES))}
+    )
+    INSERT INTO transactions (timestamp, status, count)
+    SELECT
+        strftime('%Y-%m-%d %H:%M:%S', {START_TS} + n * 60, 'unixepoch'),
+        status,
+        CASE WHEN weight = 0 THEN 80 + (n * 7919) % 60 ELSE (n * 31 + weight * 17) % (12 - weight) END
+    FROM minutes, statuses
+"""
+
+QUERIES = (
+    (
+        'range (last day)',
+        "SELECT SUM(count) FROM transactions WHERE timestamp >= :start_text AND timestamp < :end_text",
+        "SELECT SUM(count) FROM transactions WHERE ts >= :start_ts AND ts < :end_ts"
+    ),
+    (
+        'status + range',
+        "SELECT SUM(count) FROM transactions "
+        "WHERE status = 'failed' AND timestamp >= :start_text AND timestamp < :end_text",
+        "SELECT SUM(count) FROM transactions "
+        "WHERE status = 'failed' AND ts >= :start_ts AND ts < :end_ts"
+    ),
+    (
+        'hour-of-day pattern',
+        "SELECT CAST(strftime('%H', timestamp) AS INTEGER) AS h, status, SUM(count) "
+        "FROM transactions GROUP BY h, status ORDER BY h, status",
+        "SELECT hour, status, SUM(count) FROM transactions GROUP BY hour, status ORDER BY hour, status"
+    ),
+    (
+        'daily failures',
+        "SELECT date(timestamp) AS d, SUM(CASE WHEN status = 'failed' THEN count ELSE 0 END) "
+        "FROM transactions GROUP BY d ORDER BY d",
+        "SELECT date(day * 86400, 'unixepoch'), SUM(CASE WHEN status = 'failed' THEN count ELSE 0 END) "
+        "FROM transactions GROUP BY day ORDER BY day"
+    )
+)
+
+
+def build_database(path, rows):
+    if os.path.exists(path):
+        os.remove(path)
+    conn = sqlite3.connect(path)
+    conn.execute('CREATE TABLE transactions ("timestamp" TIMESTAMP, "status" TEXT, "count" INTEGER)')
+    with conn:
+        conn.execute(GENERATE, (max(1, rows // len(STATUSES)),))
+    return conn
+
+
+def time_query(conn, sql, params, repeat):
+    best = float('inf')
+    result = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = conn.execute(sql, params).fetchall()
+        best = min(best, time.perf_counter() - started)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=50_000_000)
+    parser.add_argument("--db", default=os.path.join(tempfile.gettempdir(), "transactions_benchmark.db"))
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--keep", action="store_true")
+    args = parser.parse_args()
+
+    print(f"Building synthetic database with ~{args.rows:,} rows at {args.db}")
+    started = time.perf_counter()
+    conn = build_database(args.db, args.rows)
+    rows = conn.execute("SELECT COUNT(*) FROM transactions").fetchone()[0]
+    print(f"   {rows:,} rows in {time.perf_counter() - started:.1f}s")
+
+    end_ts = START_TS + (rows // len(STATUSES)) * 60
+    params = {
+        'start_ts': end_ts - 86400,
+        'end_ts': end_ts,
+        'start_text': time.strftime('%Y-%m-%d %H:%M:%S', time.gmtime(end_ts - 86400)),
+        'end_text': time.strftime('%Y-%m-%d %H:%M:%S', time.gmtime(end_ts))
+    }
+
+    before = {name: time_query(conn, sql, params, args.repeat) for name, sql, _ in QUERIES}
+
+    started = time.perf_counter()
+    ensure_time_columns(conn, 'transactions')
+    print(f"   Migration (ts/hour/day columns + indexes) took {time.perf_counter() - started:.1f}s")
+
+    after = {name: time_query(conn, sql, params, args.repeat) for name, _, sql in QUERIES}
+    conn.close()
+
+    print("=" * 72)
+    print(f"{'query':24s} {'before ms':>12s} {'after ms':>12s} {'speedup':>9s}  match")
+    print("=" * 72)
+    ok = True
+    for name, _, _ in QUERIES:
+        (old_seconds, old_result), (new_seconds, new_result) = before[name], after[name]
+        match = old_result == new_result
+        ok = ok and match
+        print(f"{name:24s} {old_seconds * 1000:12.1f} {new_seconds * 1000:12.1f} "
+              f"{old_seconds / max(new_seconds, 1e-9):8.1f}x  {'yes' if match else 'NO'}")
+
+    if not args.keep:
+        os.remove(args.db)
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
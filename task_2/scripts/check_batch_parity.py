@@ -0,0 +1,130 @@
+import argparse
+import copy
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from monitoring.anomaly_detector import TransactionAnomalyDetector
+from monitoring.seasonal_baseline import SeasonalBaseline
+
+STATUS_COLUMNS = ['approved', 'failed', 'denied', 'reversed']
+
+
+def load_minutes(file_path):
+    df = pd.read_csv(file_path)
+    minutes = df.pivot_table(
+        index='timestamp', columns='status', values='count', aggfunc='sum', fill_value=0
+    ).reset_index()
+    for status in STATUS_COLUMNS:
+        if status not in minutes.columns:
+            minutes[status] = 0
+    minutes = minutes[['timestamp'] + STATUS_COLUMNS]
+    minutes['total'] = minutes[STATUS_COLUMNS].sum(axis=1)
+    return minutes.sort_values('timestamp').reset_index(drop=True)
+
+
+def inject_spikes(minutes, seed):
+    rng = np.random.default_rng(seed)
+    spiked = minutes.copy()
+    for status, low, high in [('failed', 20, 80), ('denied', 15, 60), ('reversed', 10, 40), ('approved', 200, 600)]:
+        rows = rng.choice(len(spiked), size=max(1, len(spiked) // 50), replace=False)
+        spiked.loc[rows, status] += rng.integers(low, high, size=len(rows))
+        runs = rng.choice(len(spiked) - 5, size=max(1, len(spiked) // 400), replace=False)
+        for start in runs:
+            spiked.loc[start:start + 4, status] += high
+    quiet = rng.choice(len(spiked), size=max(1, len(spiked) // 100), replace=False)
+    spiked.loc[quiet, STATUS_COLUMNS] = 0
+    spiked['total'] = spiked[STATUS_COLUMNS].sum(axis=1)
+    return spiked
+
+
+def stream(detector, minutes):
+    results = []
+    for row in minutes.to_dict(orient='records'):
+        status_counts = {status: int(row[status]) for status in STATUS_COLUMNS + ['total']}
+        results.append(detector.detect_anomalies(row['timestamp'], status_counts))
+    return results
+
+
+def compare(name, streaming_detector, batch_detector, minutes):
+    started = time.perf_counter()
+    expected = stream(streaming_detector, minutes)
+    stream_elapsed = time.perf_counter() - started
+
+    started = time.perf_counter()
+    batch = batch_detector.detect_batch(minutes)
+    batch_elapsed = time.perf_counter() - started
+    actual = batch_detector.batch_results_to_records(batch)
+
+    mismatches = [i for i, (a, b) in enumerate(zip(expected, actual)) if a != b]
+    state_matches = streaming_detector.get_state() == batch_detector.get_state()
+    alerts_match = streaming_detector.alerts_history == batch_detector.alerts_history
+
+    alerts = sum(1 for r in expected if r['should_alert'])
+    print(f"\n   {name}:")
+    print(f"      Minutes: {len(minutes)}  Alerts: {alerts}")
+    print(f"      Streaming: {stream_elapsed * 1000:.1f} ms  Batch: {batch_elapsed * 1000:.1f} ms")
+    print(f"      Result mismatches: {len(mismatches)}  State match: {state_matches}  Alert history match: {alerts_match}")
+
+    if mismatches:
+        i = mismatches[0]
+        print(f"      First mismatch at row {i}:")
+        print(f"         streaming: {expected[i]}")
+        print(f"         batch:     {actual[i]}")
+
+    return not mismatches and state_matches and alerts_match and len(expected) == len(actual)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--data", default="data/raw/transactions.csv")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    minutes = load_minutes(args.data)
+    split = len(minutes) // 3
+    history, replay = minutes.iloc[:split], minutes.iloc[split:].reset_index(drop=True)
+
+    print("=" * 60)
+    print("BATCH / STREAMING PARITY CHECK")
+    print("=" * 60)
+
+    scenarios = []
+
+    fitted = TransactionAnomalyDetector(window_size=60, z_threshold=3.0)
+    fitted.fit_from_historical(history)
+    scenarios.append(('Fitted detector, raw replay', fitted, replay))
+    scenarios.append(('Fitted detector, injected spikes', fitted, inject_spikes(replay, args.seed)))
+
+    short_training = TransactionAnomalyDetector(window_size=60, z_threshold=3.0, training_needed=5)
+    short_training.fit_from_historical(history)
+    short_training.consecutive_alerts['reversed'] = 2
+    scenarios.append(('Short training, carried consecutive state', short_training, inject_spikes(replay, args.seed + 1)))
+
+    online = TransactionAnomalyDetector(window_size=60, z_threshold=3.0, online_stats=True, half_life_minutes=120)
+    online.fit_from_historical(history)
+    scenarios.append(('Online baselines, injected spikes', online, inject_spikes(replay, args.seed + 2)))
+
+    seasonal = TransactionAnomalyDetector(window_size=60, z_threshold=3.0)
+    seasonal.fit_from_historical(history)
+    seasonal.set_seasonal_baseline(SeasonalBaseline(slot_minutes=60, min_samples=10).fit(history))
+    scenarios.append(('Hour-of-day baseline, injected spikes', seasonal, inject_spikes(replay, args.seed + 3)))
+
+    unfitted = TransactionAnomalyDetector(window_size=60, z_threshold=3.0)
+    scenarios.append(('Unfitted detector', unfitted, replay.iloc[:500]))
+
+    ok = True
+    for name, detector, data in scenarios:
+        ok &= compare(name, copy.deepcopy(detector), copy.deepcopy(detector), data)
+
+    print("\n   RESULT: " + ("PASS" if ok else "FAIL"))
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
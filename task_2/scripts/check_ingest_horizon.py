@@ -0,0 +1,78 @@
+import os
+import sys
+import tempfile
+from datetime import datetime
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src', 'api'))
+
+from monitoring.minute_ring import MinuteRingBuffer
+from monitoring.time_buckets import minute_bucketer
+
+FUTURE_TIMESTAMP = '2099-01-01 00:00:00'
+
+
+def check(name, passed, detail=''):
+    print(f"   {'PASS' if passed else 'FAIL'}  {name}" + (f" ({detail})" if detail else ''))
+    return passed
+
+
+def check_ring():
+    ring = MinuteRingBuffer(capacity=120, clock=lambda: 600.0, max_ahead_seconds=65.0)
+    ok = check('ring accepts the current minute', ring.add(10, {'approved': 1}))
+    ok &= check('ring refuses a minute past the horizon', not ring.add(10 ** 6, {'approved': 1}))
+    ok &= check('ring did not advance', ring.latest_minute == 10 and len(ring) == 1, f'latest={ring.latest_minute}')
+    ok &= check('ring still accepts the next minute', ring.add(11, {'failed': 2}))
+    return ok
+
+
+def check_api():
+    os.chdir(tempfile.mkdtemp())
+    import transaction_api as api
+
+    api.detector = api.create_detector()
+    client = api.app.test_client()
+    now = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    current_minute = minute_bucketer.epoch_minute(now)
+
+    response = client.post('/api/transaction', json={'timestamp': FUTURE_TIMESTAMP, 'status': 'approved'})
+    ok = check('single future event is rejected', response.status_code == 400, response.get_json().get('error'))
+
+    response = client.post('/api/transaction', json={'timestamp': now, 'status': 'approved'})
+    ok &= check('current event after it is accepted', response.status_code == 200, f'status={response.status_code}')
+
+    api.aggregator.add(minute_bucketer.epoch_minute(FUTURE_TIMESTAMP), {'approved': 1})
+    api.aggregator.flush()
+    ok &= check('buffer stays on the current minute', api.minute_buffer.latest_minute == current_minute,
+                f'latest={api.minute_buffer.latest_minute}')
+    ok &= check('future event reaching the aggregator is counted', api.aggregator.future_events == 1)
+
+    response = client.post('/api/transaction/batch', json=[
+        {'timestamp': FUTURE_TIMESTAMP, 'status': 'failed'},
+        {'timestamp': now, 'status': 'approved'}
+    ])
+    summary = response.get_json()
+    ok &= check('batch rejects only the future event', summary.get('accepted') == 1 and summary.get('rejected') == 1,
+                f"accepted={summary.get('accepted')} rejected={summary.get('rejected')}")
+    ok &= check('batch does not count it as expired', summary.get('expired', 0) == 0)
+
+    data = api.minute_buffer.get(current_minute)
+    ok &= check('current minute holds both accepted events', data is not None and data['total'] == 2,
+                f"total={data['total'] if data else None}")
+    return ok
+
+
+def main():
+    print("=" * 60)
+    print("INGEST HORIZON CHECK")
+    print("=" * 60)
+
+    ok = check_ring()
+    ok &= check_api()
+
+    print("\n   RESULT: " + ("PASS" if ok else "FAIL"))
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,168 @@
+import argparse
+import json
+import os
+import socketserver
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from monitoring.notifications import NotificationManager, NotificationDispatcher
+
+
+class StandInSMTPHandler(socketserver.StreamRequestHandler):
+    def reply(self, line):
+        self.wfile.write(f'{line}\r\n'.encode())
+
+    def handle(self):
+        self.server.connections += 1
+        self.reply('220 stand-in ESMTP')
+        in_data = False
+        message = []
+
+        for raw in self.rfile:
+            line = raw.decode('utf-8', 'replace').rstrip('\r\n')
+            if in_data:
+                if line == '.':
+                    in_data = False
+                    self.server.messages.append('\n'.join(message))
+                    message = []
+                    self.reply('250 OK')
+                else:
+                    message.append(line[1:] if line.startswith('..') else line)
+                continue
+
+            command = line.split(' ', 1)[0].upper()
+            if command in ('EHLO', 'HELO'):
+                self.reply('250 stand-in')
+            elif command == 'DATA':
+                in_data = True
+                self.reply('354 End data with <CR><LF>.<CR><LF>')
+            elif command == 'QUIT':
+                self.reply('221 Bye')
+                return
+            else:
+                self.reply('250 OK')
+
+
+class StandInSMTPServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, address):
+        super().__init__(address, StandInSMTPHandler)
+        self.connections = 0
+        self.messages = []
+
+
+class StandInWebhookHandler(BaseHTTPRequestHandler):
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        self.server.requests += 1
+
+        if self.server.fail_next > 0:
+            self.server.fail_next -= 1
+            self.send_response(503)
+        else:
+            self.server.posts.append(json.loads(body))
+            self.send_response(200)
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+    def log_message(self, format, *args):
+        pass
+
+
+def make_alert(i):
+    return {
+        'timestamp': f'2025-07-15 10:{i // 60:02d}:{i % 60:02d}',
+        'anomaly_score': 40 + i % 60,
+        'status_counts': {'approved': 90, 'failed': 30 + i, 'denied': 5, 'reversed': 1},
+        'anomalies': [{'message': f'Failed transactions spike #{i}'}],
+        'recommendation': 'INVESTIGATE'
+    }
+
+
+def wait_for(condition, timeout):
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.05)
+    return condition()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--alerts", type=int, default=200)
+    parser.add_argument("--digest-window", type=float, default=0.5)
+    parser.add_argument("--digest-max", type=int, default=20)
+    parser.add_argument("--failures", type=int, default=2)
+    args = parser.parse_args()
+
+    smtp = StandInSMTPServer(('127.0.0.1', 0))
+    webhook = ThreadingHTTPServer(('127.0.0.1', 0), StandInWebhookHandler)
+    webhook.requests = 0
+    webhook.posts = []
+    webhook.fail_next = args.failures
+    for server in (smtp, webhook):
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    os.environ.update({
+        'SLACK_WEBHOOK': f'http://127.0.0.1:{webhook.server_address[1]}/hook',
+        'SMTP_SERVER': '127.0.0.1',
+        'SMTP_PORT': str(smtp.server_address[1]),
+        'SMTP_STARTTLS': '0',
+        'ALERT_EMAIL': 'monitor@example.com',
+        'ALERT_RECIPIENTS': 'oncall@example.com'
+    })
+
+    dispatcher = NotificationDispatcher(
+        NotificationManager(),
+        workers={'slack': 2, 'email': 1},
+        digest_window=args.digest_window,
+        digest_max=args.digest_max,
+        retry_backoff=0.1
+    )
+    dispatcher.start()
+
+    started = time.perf_counter()
+    for i in range(args.alerts):
+        dispatcher.submit(make_alert(i))
+    submit_elapsed = time.perf_counter() - started
+
+    delivered = wait_for(
+        lambda: all(s['sent_alerts'] == args.alerts for s in dispatcher.get_stats().values()),
+        timeout=30
+    )
+    elapsed = time.perf_counter() - started
+    stats = dispatcher.get_stats()
+    dispatcher.stop()
+
+    slack_alerts = sum(len(post['attachments']) for post in webhook.posts)
+
+    print("=" * 60)
+    print("NOTIFICATION DISPATCH CHECK")
+    print("=" * 60)
+    print(f"   Alerts submitted:        {args.alerts} in {submit_elapsed * 1000:.1f} ms")
+    print(f"   Delivered:               {'yes' if delivered else 'NO'} after {elapsed:.2f}s")
+    print(f"   Slack messages / alerts: {len(webhook.posts)} / {slack_alerts} "
+          f"({webhook.requests} requests, {args.failures} injected failures)")
+    print(f"   Email messages:          {len(smtp.messages)} over {smtp.connections} SMTP connection(s)")
+    for channel, channel_stats in stats.items():
+        print(f"   {channel:6s} {channel_stats}")
+
+    ok = (
+        delivered
+        and slack_alerts == args.alerts
+        and len(webhook.posts) < args.alerts
+        and smtp.connections == 1
+    )
+    print(f"\n   Result: {'PASS' if ok else 'FAIL'}")
+    smtp.shutdown()
+    webhook.shutdown()
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
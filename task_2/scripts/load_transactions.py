@@ -1,59 +1,211 @@
 import sqlite3
-import pandas as pd
 import argparse
+import csv
 import os
+import sys
+import time
+import zlib
+from datetime import datetime
 
-def create_database(db_path):
-    os.makedirs(os.path.dirname(db_path), exist_ok=True)
-    conn = sqlite3.connect(db_path)
-    return conn
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
 
-def load_transactions(file_path, conn):
+from storage.connections import ConnectionManager
+from storage.minute_table import ensure_minute_table, refresh_minutes
+from storage.time_columns import ensure_time_columns, time_columns
+
+CHUNK_SIZE = 10000
+TAIL_BYTES = 4096
+
+TABLES = {
+    'transactions': ('status', 'TEXT'),
+    'auth_codes': ('auth_code', 'INTEGER')
+}
+
+LOAD_STATE_SCHEMA = """
+    CREATE TABLE IF NOT EXISTS load_state (
+        path TEXT PRIMARY KEY,
+        offset INTEGER NOT NULL,
+        mtime REAL NOT NULL,
+        tail_crc INTEGER NOT NULL,
+        updated_at REAL NOT NULL
+    )
+"""
+
+def create_database(conn):
+    conn.execute(LOAD_STATE_SCHEMA)
+    conn.commit()
+
+def create_table(conn, table):
+    key, key_type = TABLES[table]
+    conn.execute(f'CREATE TABLE IF NOT EXISTS "{table}" ("timestamp" TIMESTAMP, "{key}" {key_type}, "count" INTEGER, '
+                 f'"ts" INTEGER, "hour" INTEGER, "day" INTEGER)')
+    index = f'CREATE UNIQUE INDEX IF NOT EXISTS idx_{table}_timestamp_{key} ON "{table}" (timestamp, {key})'
     try:
-        df = pd.read_csv(file_path)
-        print(f"\nLoading {os.path.basename(file_path)}")
-        print(f"   Shape: {df.shape}")
+        conn.execute(index)
+    except sqlite3.IntegrityError:
+        conn.execute(f'DELETE FROM "{table}" WHERE rowid NOT IN (SELECT MAX(rowid) FROM "{table}" GROUP BY timestamp, {key})')
+        conn.execute(index)
+    conn.commit()
+    ensure_time_columns(conn, table)
+
+def upsert_statement(table):
+    key, _ = TABLES[table]
+    return f"""
+        INSERT INTO "{table}" (timestamp, {key}, count, ts, hour, day) VALUES (?, ?, ?, ?, ?, ?)
+        ON CONFLICT(timestamp, {key}) DO UPDATE SET count = excluded.count
+    """
+
+def tail_crc(f, offset):
+    start = max(0, offset - TAIL_BYTES)
+    f.seek(start)
+    return zlib.crc32(f.read(offset - start))
+
+def resume_offset(conn, f, path, stat, full):
+    state = conn.execute("SELECT offset, mtime, tail_crc FROM load_state WHERE path = ?", (path,)).fetchone()
+    if full or state is None:
+        return 0
+    
+    offset, mtime, crc = state
+    if offset == stat.st_size and mtime == stat.st_mtime:
+        return offset
+    if offset >= stat.st_size or tail_crc(f, offset) != crc:
+        print("   File was rewritten, rescanning from the start")
+        return 0
+    return offset
+
+def read_header(f):
+    f.seek(0)
+    line = f.readline()
+    if not line.endswith(b'\n'):
+        return None, 0
+    return next(csv.reader([line.decode('utf-8-sig')])), len(line)
+
+def normalize_timestamp(value):
+    return datetime.fromisoformat(value.strip()).strftime('%Y-%m-%d %H:%M:%S')
+
+def parse_row(fields, columns):
+    timestamp = normalize_timestamp(fields[columns[0]])
+    return (timestamp, fields[columns[1]].strip(), int(fields[columns[2]]), *time_columns(timestamp))
+
+def iter_chunks(f, columns, offset, chunk_size):
+    chunk = []
+    skipped = 0
+    while True:
+        line = f.readline()
+        if not line.endswith(b'\n'):
+            break
+        offset += len(line)
         
-        df['timestamp'] = pd.to_datetime(df['timestamp'])
-        df.to_sql('transactions', conn, if_exists='replace', index=False)
-        print(f"   Loaded {len(df)} records")
-        return True
-    except Exception as e:
-        print(f"   Error: {e}")
-        return False
+        text = line.decode('utf-8').strip()
+        if not text:
+            continue
+        try:
+            fields = next(csv.reader([text]))
+            chunk.append(parse_row(fields, columns))
+        except (ValueError, IndexError):
+            skipped += 1
+        
+        if len(chunk) >= chunk_size:
+            yield chunk, offset, skipped
+            chunk, skipped = [], 0
+    
+    yield chunk, offset, skipped
+
+def merge_spans(spans):
+    merged = []
+    for start, end in sorted(spans):
+        if merged and start // 60 <= merged[-1][1] // 60 + 1:
+            merged[-1][1] = max(merged[-1][1], end)
+        else:
+            merged.append([start, end])
+    return merged
 
-def load_auth_codes(file_path, conn):
+def load_csv(file_path, conn, table, chunk_size=CHUNK_SIZE, full=False):
+    key, _ = TABLES[table]
+    path = os.path.realpath(file_path)
+    stat = os.stat(path)
+    print(f"\nLoading {os.path.basename(file_path)}")
+    
     try:
-        df = pd.read_csv(file_path)
-        print(f"\nLoading {os.path.basename(file_path)}")
-        print(f"   Shape: {df.shape}")
+        create_table(conn, table)
+        if table == 'transactions':
+            ensure_minute_table(conn)
         
-        df['timestamp'] = pd.to_datetime(df['timestamp'])
-        df.to_sql('auth_codes', conn, if_exists='replace', index=False)
-        print(f"   Loaded {len(df)} records")
+        with open(path, 'rb') as f:
+            header, header_end = read_header(f)
+            if header is None or not {'timestamp', key, 'count'} <= set(header):
+                print(f"   Error: expected columns timestamp, {key}, count")
+                return False
+            columns = [header.index(name) for name in ('timestamp', key, 'count')]
+            
+            offset = max(resume_offset(conn, f, path, stat, full), header_end)
+            if offset == stat.st_size:
+                print("   No new rows since last load")
+                return True
+            print(f"   Resuming at byte {offset} of {stat.st_size}" if offset > header_end else f"   Size: {stat.st_size} bytes")
+            
+            f.seek(offset)
+            loaded = skipped = 0
+            spans = []
+            upsert = upsert_statement(table)
+            with conn:
+                for chunk, offset, chunk_skipped in iter_chunks(f, columns, offset, chunk_size):
+                    skipped += chunk_skipped
+                    if not chunk:
+                        continue
+                    conn.executemany(upsert, chunk)
+                    loaded += len(chunk)
+                    if table == 'transactions':
+                        timestamps = [row[3] for row in chunk]
+                        spans.append((min(timestamps), max(timestamps)))
+                
+                for start, end in merge_spans(spans):
+                    refresh_minutes(conn, start, end)
+                
+                conn.execute("""
+                    INSERT INTO load_state (path, offset, mtime, tail_crc, updated_at)
+                    VALUES (?, ?, ?, ?, ?)
+                    ON CONFLICT(path) DO UPDATE SET
+                        offset = excluded.offset,
+                        mtime = excluded.mtime,
+                        tail_crc = excluded.tail_crc,
+                        updated_at = excluded.updated_at
+                """, (path, offset, stat.st_mtime, tail_crc(f, offset), time.time()))
+        
+        print(f"   Loaded {loaded} records" + (f" ({skipped} malformed rows skipped)" if skipped else ""))
         return True
     except Exception as e:
         print(f"   Error: {e}")
         return False
 
+def load_transactions(file_path, conn, chunk_size=CHUNK_SIZE, full=False):
+    return load_csv(file_path, conn, 'transactions', chunk_size, full)
+
+def load_auth_codes(file_path, conn, chunk_size=CHUNK_SIZE, full=False):
+    return load_csv(file_path, conn, 'auth_codes', chunk_size, full)
+
 def main():
     parser = argparse.ArgumentParser()
     parser.add_argument("--data-dir", default="data/raw")
     parser.add_argument("--db", default="data/processed/transactions.db")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+    parser.add_argument("--full", action="store_true", help="ignore high-water marks and rescan every file")
     args = parser.parse_args()
     
-    conn = create_database(args.db)
-    
-    trans_file = os.path.join(args.data_dir, "transactions.csv")
-    if os.path.exists(trans_file):
-        load_transactions(trans_file, conn)
-    
-    auth_file = os.path.join(args.data_dir, "transactions_auth_codes.csv")
-    if os.path.exists(auth_file):
-        load_auth_codes(auth_file, conn)
+    database = ConnectionManager(args.db)
+    with database.connection() as conn:
+        create_database(conn)
+        
+        trans_file = os.path.join(args.data_dir, "transactions.csv")
+        if os.path.exists(trans_file):
+            load_transactions(trans_file, conn, args.chunk_size, args.full)
+        
+        auth_file = os.path.join(args.data_dir, "transactions_auth_codes.csv")
+        if os.path.exists(auth_file):
+            load_auth_codes(auth_file, conn, args.chunk_size, args.full)
     
-    conn.close()
+    database.close()
     print("\nDatabase created successfully")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
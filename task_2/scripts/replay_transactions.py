@@ -0,0 +1,286 @@
+import argparse
+import os
+import sys
+import time
+from collections import Counter
+from datetime import timedelta
+
+import pandas as pd
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from monitoring.anomaly_detector import TransactionAnomalyDetector
+from monitoring.seasonal_baseline import SeasonalBaseline
+from monitoring.time_buckets import MinuteBucketer, wall_clock_seconds
+
+STATUS_COLUMNS = ['approved', 'failed', 'denied', 'reversed']
+
+
+def load_minutes(file_path, chunksize=100000):
+    minutes = None
+    for chunk in pd.read_csv(file_path, chunksize=chunksize):
+        pivot = chunk.pivot_table(
+            index='timestamp', columns='status', values='count', aggfunc='sum', fill_value=0
+        )
+        minutes = pivot if minutes is None else minutes.add(pivot, fill_value=0)
+
+    minutes = minutes.fillna(0).astype('int64')
+    minutes['total'] = minutes.sum(axis=1)
+    for status in STATUS_COLUMNS:
+        if status not in minutes.columns:
+            minutes[status] = 0
+
+    minutes = minutes.sort_index().reset_index()
+    minutes['timestamp'] = pd.to_datetime(minutes['timestamp']).dt.strftime('%Y-%m-%d %H:%M:%S')
+    return minutes
+
+
+def build_detector(history, training_minutes, online_stats=False, half_life_minutes=None, seasonal=None):
+    detector = TransactionAnomalyDetector(
+        window_size=60,
+        z_threshold=3.0,
+        training_needed=training_minutes,
+        online_stats=online_stats,
+        half_life_minutes=half_life_minutes
+    )
+    if len(history):
+        detector.fit_from_historical(history)
+        if seasonal:
+            detector.set_seasonal_baseline(
+                SeasonalBaseline(slot_minutes=60, by_weekday=seasonal == 'dow_hour').fit(history)
+            )
+    return detector
+
+
+def replay_in_process(detector, minutes, engine):
+    started = time.perf_counter()
+
+    if engine == 'batch':
+        results = detector.batch_results_to_records(detector.detect_batch(minutes))
+    else:
+        results = []
+        for row in minutes.to_dict(orient='records'):
+            status_counts = {status: int(row[status]) for status in STATUS_COLUMNS + ['total']}
+            results.append(detector.detect_anomalies(row['timestamp'], status_counts))
+
+    return results, time.perf_counter() - started
+
+
+def expand_minute(row, ticks, epoch_minute):
+    minute = MinuteBucketer.to_datetime(epoch_minute)
+    per_tick = [[] for _ in range(ticks)]
+    for status in STATUS_COLUMNS:
+        for i in range(int(row[status])):
+            tick = i % ticks
+            second = int(tick * 60 / ticks)
+            per_tick[tick].append({
+                'timestamp': (minute + timedelta(seconds=second)).strftime('%Y-%m-%d %H:%M:%S'),
+                'status': status
+            })
+    return per_tick
+
+
+def api_get(session, api_url, path, **params):
+    response = session.get(f"{api_url.rstrip('/')}{path}", params=params, timeout=30)
+    response.raise_for_status()
+    return response.json()
+
+
+def api_uses_watermark(session, api_url):
+    return api_get(session, api_url, '/api/stats')['aggregation'].get('watermark_minute') is not None
+
+
+def wait_for_close(session, api_url, last_minute, timeout):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        stats = api_get(session, api_url, '/api/stats')
+        watermark = stats['aggregation'].get('watermark_minute')
+        if (watermark is None or watermark > last_minute) and not stats['api']['alerts_pending']:
+            return True
+        time.sleep(1.0)
+    return False
+
+
+def fetch_alerts(session, api_url, first_minute, last_minute):
+    params = {
+        'since': MinuteBucketer.format_minute(first_minute),
+        'until': MinuteBucketer.format_minute(last_minute),
+        'limit': 500
+    }
+    alerts = []
+    while True:
+        page = api_get(session, api_url, '/api/alerts', **params)
+        alerts.extend(page['alerts'])
+        if not page.get('next_cursor'):
+            return alerts
+        params['cursor'] = page['next_cursor']
+
+
+def replay_against_api(minutes, api_url, realtime_factor, ticks, close_timeout=180):
+    import requests
+
+    session = requests.Session()
+    url = f"{api_url.rstrip('/')}/api/transaction/batch"
+    watermark = api_uses_watermark(session, api_url)
+    if watermark and realtime_factor != 1:
+        raise SystemExit(
+            "The API closes minutes on its wall-clock watermark (DETECTION_MODE=tumbling), so replayed minutes "
+            "only close in real time. Use --realtime-factor 1, or start the API with DETECTION_MODE=continuous."
+        )
+
+    if watermark:
+        base_minute = int(wall_clock_seconds() // 60) + 1
+    else:
+        base_minute = int(wall_clock_seconds() // 60) - len(minutes) + 1
+    tick_seconds = 60.0 / realtime_factor / ticks
+    summaries = {}
+    sent = 0
+    started = time.perf_counter()
+    next_tick = started + (max(0.0, base_minute * 60 - wall_clock_seconds()) if watermark else 0.0)
+
+    for i, row in enumerate(minutes.to_dict(orient='records')):
+        epoch_minute = base_minute + i
+        for events in expand_minute(row, ticks, epoch_minute):
+            delay = next_tick - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            next_tick += tick_seconds
+
+            if events:
+                response = session.post(url, json=events, timeout=30)
+                summary = response.json() if response.ok else {}
+                sent += summary.get('accepted', 0)
+                for minute in summary.get('minutes', []):
+                    summaries[minute['minute']] = minute
+
+    last_minute = base_minute + len(minutes) - 1
+    if len(minutes) and not wait_for_close(session, api_url, last_minute, close_timeout):
+        print(f"   Warning: API did not close minute {MinuteBucketer.format_minute(last_minute)} "
+              f"within {close_timeout}s; late alerts are missing from the report")
+    elapsed = time.perf_counter() - started
+
+    alerts_by_minute = {}
+    for alert in fetch_alerts(session, api_url, base_minute, last_minute):
+        alerts_by_minute.setdefault(alert['timestamp'], []).append(alert)
+
+    results = []
+    for i, row in enumerate(minutes.to_dict(orient='records')):
+        key = MinuteBucketer.format_minute(base_minute + i)
+        alerts = alerts_by_minute.get(key, [])
+        summary = summaries.get(key, {})
+        top = max(alerts, key=lambda a: a['anomaly_score'], default=None)
+        results.append({
+            'timestamp': row['timestamp'],
+            'should_alert': bool(alerts) or bool(summary.get('detected')),
+            'anomaly_score': max(top['anomaly_score'] if top else 0, summary.get('score', 0)),
+            'recommendation': top['recommendation'] if top else summary.get('recommendation', 'NORMAL'),
+            'anomalies': [anomaly for alert in alerts for anomaly in alert['anomalies']]
+                         or (summary.get('anomalies', []) if summary.get('detected') else [])
+        })
+
+    return results, elapsed, sent
+
+
+def print_report(minutes, results, elapsed, events, timeline_limit):
+    alerts = [r for r in results if r['should_alert']]
+    by_type = Counter(a['type'] for r in alerts for a in r['anomalies'])
+    by_recommendation = Counter(r['recommendation'] for r in results)
+
+    print("\n" + "=" * 60)
+    print("REPLAY REPORT")
+    print("=" * 60)
+    print(f"   Minutes replayed: {len(minutes)}")
+    print(f"   Events replayed: {events}")
+    print(f"   Elapsed: {elapsed:.3f}s")
+    print(f"   Throughput: {events / elapsed if elapsed else 0:,.0f} events/s, "
+          f"{len(minutes) / elapsed if elapsed else 0:,.0f} minutes/s")
+    print(f"   Alerts: {len(alerts)}")
+
+    print("\n   Alerts by anomaly type:")
+    for anomaly_type, count in by_type.most_common():
+        print(f"      {anomaly_type}: {count}")
+
+    print("\n   Minutes by recommendation:")
+    for recommendation, count in by_recommendation.most_common():
+        print(f"      {recommendation}: {count}")
+
+    print(f"\n   Alert timeline (first {timeline_limit}):")
+    for r in alerts[:timeline_limit]:
+        types = ', '.join(a['type'] for a in r['anomalies'])
+        print(f"      {r['timestamp']}  score={r['anomaly_score']:>3}  {r['recommendation']:<16} {types}")
+
+
+def write_timeline(results, path):
+    rows = [
+        {
+            'timestamp': r['timestamp'],
+            'anomaly_score': r['anomaly_score'],
+            'recommendation': r['recommendation'],
+            'anomaly_types': '|'.join(a['type'] for a in r['anomalies'])
+        }
+        for r in results if r['should_alert']
+    ]
+    pd.DataFrame(rows).to_csv(path, index=False)
+    print(f"\n   Timeline written to {path}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay transactions.csv through the anomaly detector")
+    parser.add_argument("--data", default="data/raw/transactions.csv")
+    parser.add_argument("--engine", choices=['stream', 'batch'], default='stream',
+                        help="in-process engine: detect_anomalies per minute or detect_batch")
+    parser.add_argument("--fit-minutes", type=int, default=1440,
+                        help="leading minutes used to fit the detector before replaying the rest")
+    parser.add_argument("--training-minutes", type=int, default=0,
+                        help="minutes of post-fit training before alerts are raised")
+    parser.add_argument("--online-stats", action="store_true",
+                        help="update mean/std/p95/p99 online as each replayed minute is finalised")
+    parser.add_argument("--half-life", type=float, default=None,
+                        help="EWMA half-life in minutes for --online-stats (default: cumulative Welford)")
+    parser.add_argument("--seasonal", choices=['hour', 'dow_hour'], default=None,
+                        help="z-score against an hour-of-day (or weekday/hour) baseline fitted on the fit minutes")
+    parser.add_argument("--max-minutes", type=int, default=None, help="replay at most N minutes")
+    parser.add_argument("--realtime-factor", type=float, default=None,
+                        help="replay at N x wall-clock speed against a running API instead of in-process; "
+                             "timestamps are rebased onto the wall clock, and an API using the tumbling "
+                             "watermark needs N = 1")
+    parser.add_argument("--api-url", default="http://localhost:5000")
+    parser.add_argument("--ticks-per-minute", type=int, default=1,
+                        help="batches sent per replayed minute in API mode")
+    parser.add_argument("--timeline-limit", type=int, default=25)
+    parser.add_argument("--timeline-output", default=None, help="optional CSV path for the alert timeline")
+    args = parser.parse_args()
+
+    minutes = load_minutes(args.data)
+    history = minutes.iloc[:args.fit_minutes]
+    replay = minutes.iloc[args.fit_minutes:].reset_index(drop=True)
+    if args.max_minutes is not None:
+        replay = replay.iloc[:args.max_minutes]
+
+    print("=" * 60)
+    print("TRANSACTION REPLAY")
+    print("=" * 60)
+    print(f"   Source: {args.data}")
+    print(f"   Fit minutes: {len(history)}  Replay minutes: {len(replay)}")
+
+    if args.realtime_factor:
+        print(f"   Mode: API {args.api_url} at {args.realtime_factor}x")
+        results, elapsed, events = replay_against_api(
+            replay, args.api_url, args.realtime_factor, args.ticks_per_minute
+        )
+    else:
+        print(f"   Mode: in-process ({args.engine})")
+        detector = build_detector(
+            history, args.training_minutes, args.online_stats, args.half_life, args.seasonal
+        )
+        results, elapsed = replay_in_process(detector, replay, args.engine)
+        events = int(replay['total'].sum())
+
+    print_report(replay, results, elapsed, events, args.timeline_limit)
+
+    if args.timeline_output:
+        write_timeline(results, args.timeline_output)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,85 @@
 from flask import Flask, request, jsonify
-import sqlite3
 import pandas as pd
+import threading
+import os
+import sys
 from datetime import datetime
 
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from storage.connections import ConnectionManager
+from storage.minute_table import (
+    MINUTE_TABLE, MINUTE_TABLES, LIVE_TABLE, ensure_minute_table, bucket_query
+)
+
+STATUSES = ("failed", "denied", "reversed", "approved")
+
 app = Flask(__name__)
 
+database = ConnectionManager("data/processed/transactions.db")
+storage_lock = threading.Lock()
+
+
+def minute_storage_ready():
+    if not database.exists():
+        return False
+    if database.has_tables(*MINUTE_TABLES):
+        return True
+
+    with storage_lock, database.connection() as conn:
+        ready = ensure_minute_table(conn)
+    database.invalidate()
+    return ready
+
+
+def query_minutes(conn, start_date, end_date, status, limit):
+    if database.has_tables(LIVE_TABLE):
+        return query_buckets(conn, 1, start_date, end_date, status, limit)
+
+    columns = [
+        f"{s} as {s}" if status in (None, s) else f"0 as {s}" for s in STATUSES
+    ]
+    query = f"""
+        SELECT 
+            timestamp,
+            {", ".join(columns)},
+            {status or "total"} as total,
+            1 as minutes_count
+        FROM {MINUTE_TABLE}
+        WHERE 1=1
+    """
+
+    params = []
+
+    if start_date:
+        query += " AND minute >= CAST(strftime('%s', ?) AS INTEGER) / 60"
+        params.append(start_date)
+
+    if end_date:
+        query += " AND minute <= CAST(strftime('%s', ?) AS INTEGER) / 60"
+        params.append(end_date)
+
+    query += " ORDER BY minute DESC LIMIT ?"
+    params.append(limit)
+
+    return pd.read_sql_query(query, conn, params=params)
+
+
+def query_buckets(conn, interval, start_date, end_date, status, limit):
+    sources = [t for t in (MINUTE_TABLE, LIVE_TABLE) if database.has_tables(t)]
+    start_minute = int(pd.Timestamp(start_date).timestamp()) // 60 if start_date else None
+    end_minute = int(pd.Timestamp(end_date).timestamp()) // 60 if end_date else None
+
+    query, params = bucket_query(interval, sources, start_minute, end_minute)
+    df = pd.read_sql_query(query, conn, params=params + [limit])
+
+    if status:
+        df["total"] = df[status]
+        for s in STATUSES:
+            if s != status:
+                df[s] = 0
+    return df[["timestamp", *STATUSES, "total", "minutes_count"]]
+
 
 @app.route("/api/query/transactions", methods=["GET"])
 def query_transactions():
@@ -13,41 +88,21 @@ def query_transactions():
         end_date = request.args.get("end_date")
         status = request.args.get("status")
         limit = request.args.get("limit", 100, type=int)
+        interval = request.args.get("interval", 1, type=int)
 
-        conn = sqlite3.connect("data/processed/transactions.db")
-
-        query = """
-            SELECT 
-                timestamp,
-                SUM(CASE WHEN status = 'failed' THEN transaction_count ELSE 0 END) as failed,
-                SUM(CASE WHEN status = 'denied' THEN transaction_count ELSE 0 END) as denied,
-                SUM(CASE WHEN status = 'reversed' THEN transaction_count ELSE 0 END) as reversed,
-                SUM(CASE WHEN status = 'approved' THEN transaction_count ELSE 0 END) as approved,
-                SUM(transaction_count) as total,
-                COUNT(DISTINCT strftime('%Y-%m-%d %H:%M', timestamp)) as minutes_count
-            FROM transactions
-            WHERE 1=1
-        """
-
-        params = []
-
-        if start_date:
-            query += " AND timestamp >= ?"
-            params.append(start_date)
-
-        if end_date:
-            query += " AND timestamp <= ?"
-            params.append(end_date)
+        if status and status not in STATUSES:
+            return jsonify({"error": f"Unknown status: {status}"}), 400
+        if interval < 1:
+            return jsonify({"error": "interval must be a positive number of minutes"}), 400
 
-        if status:
-            query += " AND status = ?"
-            params.append(status)
+        if not minute_storage_ready():
+            return jsonify({"error": "No transactions table found"}), 404
 
-        query += " GROUP BY timestamp ORDER BY timestamp DESC LIMIT ?"
-        params.append(limit)
-
-        df = pd.read_sql_query(query, conn, params=params)
-        conn.close()
+        with database.connection(readonly=True) as conn:
+            if interval > 1:
+                df = query_buckets(conn, interval, start_date, end_date, status, limit)
+            else:
+                df = query_minutes(conn, start_date, end_date, status, limit)
 
         stats = {}
 
@@ -70,6 +125,7 @@ def query_transactions():
                     "end_date": end_date,
                     "status": status,
                     "limit": limit,
+                    "interval": interval,
                 },
                 "statistics": stats,
                 "data": df.to_dict(orient="records"),
@@ -84,19 +140,22 @@ def query_transactions():
 @app.route("/api/query/anomaly-patterns", methods=["GET"])
 def query_anomaly_patterns():
     try:
-        conn = sqlite3.connect("data/processed/transactions.db")
+        if not minute_storage_ready():
+            return jsonify({"error": "No transactions table found"}), 404
 
-        query_hourly = """
+        moments = ",\n".join(
+            f"""SUM({c}) * 1.0 / SUM(minutes) as avg_{c},
+                    SUM({c}_sq) * 1.0 / SUM(minutes) as meansq_{c}"""
+            for c in ("failed", "denied", "reversed", "total")
+        )
+        query_hourly = f"""
             WITH hourly_stats AS (
                 SELECT 
-                    strftime('%H', timestamp) as hour,
-                    AVG(CASE WHEN status = 'failed' THEN transaction_count ELSE 0 END) as avg_failed,
-                    AVG(CASE WHEN status = 'denied' THEN transaction_count ELSE 0 END) as avg_denied,
-                    AVG(CASE WHEN status = 'reversed' THEN transaction_count ELSE 0 END) as avg_reversed,
-                    AVG(transaction_count) as avg_total,
-                    COUNT(*) as samples
-                FROM transactions
-                GROUP BY strftime('%H', timestamp)
+                    printf('%02d', transaction_hours.hour % 24) as hour,
+                    {moments},
+                    SUM(minutes) as samples
+                FROM transaction_hours
+                GROUP BY transaction_hours.hour % 24
             )
             SELECT 
                 hour,
@@ -105,6 +164,10 @@ def query_anomaly_patterns():
                 avg_reversed,
                 avg_total,
                 samples,
+                meansq_failed - avg_failed * avg_failed as var_failed,
+                meansq_denied - avg_denied * avg_denied as var_denied,
+                meansq_reversed - avg_reversed * avg_reversed as var_reversed,
+                meansq_total - avg_total * avg_total as var_total,
                 (avg_failed / NULLIF(avg_total, 0)) * 100 as failed_rate_pct,
                 (avg_denied / NULLIF(avg_total, 0)) * 100 as denied_rate_pct,
                 (avg_reversed / NULLIF(avg_total, 0)) * 100 as reversed_rate_pct
@@ -114,22 +177,22 @@ def query_anomaly_patterns():
 
         query_daily = """
             SELECT 
-                date(timestamp) as day,
-                SUM(CASE WHEN status = 'failed' THEN transaction_count ELSE 0 END) as total_failed,
-                SUM(CASE WHEN status = 'denied' THEN transaction_count ELSE 0 END) as total_denied,
-                SUM(CASE WHEN status = 'reversed' THEN transaction_count ELSE 0 END) as total_reversed,
-                SUM(transaction_count) as total_transactions,
-                COUNT(*) as minutes_count
-            FROM transactions
-            GROUP BY date(timestamp)
+                date(day * 86400, 'unixepoch') as day,
+                failed as total_failed,
+                denied as total_denied,
+                reversed as total_reversed,
+                total as total_transactions,
+                minutes as minutes_count
+            FROM transaction_days
             ORDER BY total_failed DESC
             LIMIT 10
         """
 
-        df_hourly = pd.read_sql_query(query_hourly, conn)
-        df_daily = pd.read_sql_query(query_daily, conn)
-
-        conn.close()
+        with database.connection(readonly=True) as conn:
+            df_hourly = pd.read_sql_query(query_hourly, conn)
+            df_daily = pd.read_sql_query(query_daily, conn)
+        for c in ("failed", "denied", "reversed", "total"):
+            df_hourly[f"std_{c}"] = df_hourly.pop(f"var_{c}").clip(lower=0) ** 0.5
 
         return jsonify(
             {
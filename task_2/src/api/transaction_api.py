@@ -1,21 +1,37 @@
 # src/api/transaction_api.py
-from flask import Flask, request, jsonify
+from flask import Flask, Response, request, jsonify
 import sqlite3
 from datetime import datetime
 import threading
-import queue
 import pandas as pd
 import numpy as np
 import os
 import sys
 import json
 import time
+import atexit
 import logging
+import uuid
 
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 
 from monitoring.anomaly_detector import TransactionAnomalyDetector
 from monitoring.alert_system import AlertSystem, alert_system
+from monitoring.time_buckets import minute_bucketer, wall_clock_seconds, MINUTE_KEY_FORMAT
+from monitoring.minute_ring import MinuteRingBuffer
+from monitoring.aggregation import MinuteAggregator, StripedMinuteCounter
+from monitoring.keyed_detector import KeyedMinuteDetector
+from monitoring.auth_code_detector import AuthCodeDetector, normalize_auth_code, code_index
+from storage.live_writer import LiveTransactionWriter
+from storage.connections import ConnectionManager
+from storage.minute_table import MINUTE_TABLE, MINUTE_TABLES, LIVE_TABLE, ensure_minute_table, bucket_query
+from monitoring.detector_snapshot import save_detector_snapshot, load_detector_snapshot
+from monitoring.seasonal_baseline import SeasonalBaseline
+from monitoring.alert_store import AlertStore, SEVERITIES, CATEGORIES, alert_severity
+from monitoring.event_stream import EventBroadcaster
+from monitoring.notifications import NotificationManager, NotificationDispatcher
+from monitoring.incidents import IncidentTracker
+from monitoring.alert_queue import BoundedAlertQueue
 
 app = Flask(__name__)
 
@@ -23,19 +39,93 @@ log = logging.getLogger('werkzeug')
 log.setLevel(logging.ERROR)
 
 detector = None
-alert_queue = queue.Queue()
-alerts_history = []
-minute_buffer = {}
+detector_fingerprint = None
+live_writer = None
+database = None
+storage_lock = threading.Lock()
 alert_callbacks = []
 
 ALERT_HISTORY_LIMIT = 1000
+ALERT_PAGE_LIMIT = 500
+STREAM_MAX_CLIENTS = int(os.getenv('STREAM_MAX_CLIENTS', 100))
+STREAM_KEEPALIVE_SECONDS = 5.0
+STREAM_RECENT_ALERTS = 20
+SNAPSHOT_SERIES_MINUTES = 30
+SNAPSHOT_RECENT_ALERTS = 5
+SNAPSHOT_CACHE_SIZE = 16
+API_INSTANCE_ID = uuid.uuid4().hex[:12]
+INCIDENT_QUIET_MINUTES = int(os.getenv('INCIDENT_QUIET_MINUTES', 5))
+NOTIFY_DIGEST_SECONDS = float(os.getenv('NOTIFY_DIGEST_SECONDS', 10))
+NOTIFY_DIGEST_MAX = int(os.getenv('NOTIFY_DIGEST_MAX', 20))
+NOTIFY_MIN_SCORE = float(os.getenv('NOTIFY_MIN_SCORE', 0))
+NOTIFY_WORKERS = {
+    'slack': int(os.getenv('NOTIFY_SLACK_WORKERS', 2)),
+    'email': int(os.getenv('NOTIFY_EMAIL_WORKERS', 1))
+}
 MINUTE_BUFFER_LIMIT = 120
 ALERT_WORKER_SLEEP = 0.1
+ALERT_QUEUE_SIZE = int(os.getenv('ALERT_QUEUE_SIZE', 10000))
+ALERT_QUEUE_POLICY = os.getenv('ALERT_QUEUE_POLICY', 'drop_oldest')
+ALERT_QUEUE_BLOCK_SECONDS = float(os.getenv('ALERT_QUEUE_BLOCK_SECONDS', 0.05))
+ALERT_BATCH_SIZE = 100
+MAX_BATCH_SIZE = 50000
+BATCH_ERROR_LIMIT = 20
+NDJSON_MIMETYPES = ('application/x-ndjson', 'application/ndjson', 'application/jsonl')
+AGGREGATOR_STRIPES = 16
+AGGREGATOR_MERGE_INTERVAL = 0.05
+DETECTION_MODE = os.getenv('DETECTION_MODE', 'tumbling')
+WATERMARK_GRACE_SECONDS = float(os.getenv('WATERMARK_GRACE_SECONDS', 5))
+CLOCK_SKEW_SECONDS = float(os.getenv('CLOCK_SKEW_SECONDS', 60))
+EARLY_WARNING_ENABLED = os.getenv('EARLY_WARNING_ENABLED', '1') == '1'
+TUMBLING_TRAINING_MINUTES = 5
+PERSIST_LIVE_DATA = os.getenv('PERSIST_LIVE_DATA', '1') == '1'
+PERSIST_RAW_EVENTS = os.getenv('PERSIST_RAW_EVENTS', '0') == '1'
+LIVE_FLUSH_INTERVAL = 1.0
+LIVE_FLUSH_SIZE = 5000
+DETECTOR_SNAPSHOT_PATH = os.getenv('DETECTOR_SNAPSHOT_PATH')
+DETECTOR_FIT_SNAPSHOT_PATH = os.getenv('DETECTOR_FIT_SNAPSHOT_PATH')
+SNAPSHOT_INTERVAL = 60
+ONLINE_STATS = os.getenv('ONLINE_STATS', '1') == '1'
+STATS_HALF_LIFE_MINUTES = float(os.getenv('STATS_HALF_LIFE_MINUTES', 720))
+SEASONAL_BASELINE = os.getenv('SEASONAL_BASELINE', 'hour')
+SEASONAL_BASELINE_PATH = os.getenv('SEASONAL_BASELINE_PATH')
+SEASONAL_MIN_SAMPLES = 30
+MAX_ENTITY_KEYS = int(os.getenv('MAX_ENTITY_KEYS', 200000))
+ENTITY_IDLE_MINUTES = 60
+MAX_ENTITY_KEY_LENGTH = 128
 
 VALID_STATUSES = ['approved', 'failed', 'denied', 'reversed']
 
+minute_buffer = MinuteRingBuffer(
+    capacity=MINUTE_BUFFER_LIMIT,
+    statuses=VALID_STATUSES,
+    clock=wall_clock_seconds,
+    max_ahead_seconds=WATERMARK_GRACE_SECONDS + CLOCK_SKEW_SECONDS
+)
+minute_results = {}
+minute_results_version = 0
+early_warned_minutes = set()
+entity_counter = StripedMinuteCounter(stripes=AGGREGATOR_STRIPES)
+keyed_detector = KeyedMinuteDetector(max_keys=MAX_ENTITY_KEYS, idle_minutes=ENTITY_IDLE_MINUTES)
+last_entity_eviction = None
+auth_code_counter = StripedMinuteCounter(stripes=AGGREGATOR_STRIPES)
+auth_code_detector = AuthCodeDetector()
+
 # Initialize alert system
 alert_system = AlertSystem()
+alert_queue = BoundedAlertQueue(maxsize=ALERT_QUEUE_SIZE, policy=ALERT_QUEUE_POLICY, block_timeout=ALERT_QUEUE_BLOCK_SECONDS)
+alert_store = AlertStore(capacity=ALERT_HISTORY_LIMIT)
+incident_tracker = IncidentTracker(quiet_minutes=INCIDENT_QUIET_MINUTES, format_minute=minute_bucketer.format_minute)
+notification_dispatcher = NotificationDispatcher(
+    NotificationManager(smtp_pool_size=NOTIFY_WORKERS['email']),
+    workers=NOTIFY_WORKERS,
+    digest_window=NOTIFY_DIGEST_SECONDS,
+    digest_max=NOTIFY_DIGEST_MAX,
+    min_score=NOTIFY_MIN_SCORE
+)
+event_stream = EventBroadcaster(max_clients=STREAM_MAX_CLIENTS, keepalive=STREAM_KEEPALIVE_SECONDS)
+last_stream_stats = None
+dashboard_snapshot_cache = {}
 
 def get_database_path():
     possible_paths = [
@@ -50,42 +140,63 @@ def get_database_path():
     os.makedirs("data/processed", exist_ok=True)
     return "data/processed/transactions.db"
 
-def load_historical_data():
-    db_path = get_database_path()
+def get_database():
+    global database
     
-    if not os.path.exists(db_path):
-        return None
+    if database is None:
+        database = ConnectionManager(get_database_path())
+    return database
+
+def get_data_path(configured, filename):
+    if configured:
+        return configured
+    return os.path.join(os.path.dirname(get_database().db_path), filename)
+
+def detector_snapshot_path():
+    return get_data_path(DETECTOR_SNAPSHOT_PATH, 'detector_snapshot.npz')
+
+def detector_fit_snapshot_path():
+    return get_data_path(DETECTOR_FIT_SNAPSHOT_PATH, 'detector_fit.npz')
+
+def seasonal_baseline_path():
+    return get_data_path(SEASONAL_BASELINE_PATH, 'seasonal_baseline.npz')
+
+def minute_storage_ready(db):
+    if not db.exists():
+        return False
+    if db.has_tables(*MINUTE_TABLES):
+        return True
+    
+    with storage_lock, db.connection() as conn:
+        ready = ensure_minute_table(conn)
+    db.invalidate()
+    return ready
+
+def load_historical_data():
+    db = get_database()
     
     try:
-        conn = sqlite3.connect(db_path)
-        cursor = conn.cursor()
-        cursor.execute("SELECT name FROM sqlite_master WHERE type='table'")
-        tables = [row[0] for row in cursor.fetchall()]
-        
-        if 'transactions' in tables:
-            cursor.execute("PRAGMA table_info(transactions)")
-            columns = [col[1] for col in cursor.fetchall()]
-            
-            if 'status' in columns and 'count' in columns:
-                query = """
-                    SELECT 
-                        timestamp,
-                        SUM(CASE WHEN status = 'failed' THEN count ELSE 0 END) as failed,
-                        SUM(CASE WHEN status = 'denied' THEN count ELSE 0 END) as denied,
-                        SUM(CASE WHEN status = 'reversed' THEN count ELSE 0 END) as reversed,
-                        SUM(CASE WHEN status = 'approved' THEN count ELSE 0 END) as approved,
-                        SUM(count) as total
-                    FROM transactions
-                    GROUP BY timestamp
-                    ORDER BY timestamp
-                """
-                df = pd.read_sql_query(query, conn)
-                conn.close()
-                return df
+        if not minute_storage_ready(db):
+            return None
         
-        conn.close()
+        query = f"""
+            SELECT timestamp, failed, denied, reversed, approved, total
+            FROM {MINUTE_TABLE}
+            ORDER BY minute
+        """
+        with db.connection(readonly=True) as conn:
+            return pd.read_sql_query(query, conn)
+    except Exception:
         return None
-            
+
+def load_auth_code_history():
+    db = get_database()
+    
+    try:
+        if not db.has_tables('auth_codes'):
+            return None
+        with db.connection(readonly=True) as conn:
+            return pd.read_sql_query("SELECT timestamp, auth_code, count FROM auth_codes", conn)
     except Exception:
         return None
 
@@ -113,46 +224,160 @@ def create_synthetic_training_data():
 
 def alert_worker():
     while True:
-        try:
-            alert_data = alert_queue.get(timeout=ALERT_WORKER_SLEEP)
-            
-            if 'timestamp' not in alert_data:
-                alert_data['timestamp'] = datetime.now().isoformat()
-            
-            alert_system.process_alert(alert_data)
-            alerts_history.append(alert_data)
-            
-            if len(alerts_history) > ALERT_HISTORY_LIMIT:
-                alerts_history.pop(0)
-            
-            alert_queue.task_done()
-            
-        except queue.Empty:
+        batch = alert_queue.get_batch(ALERT_BATCH_SIZE, timeout=ALERT_WORKER_SLEEP)
+        if not batch:
             continue
+        
+        for alert_data in batch:
+            try:
+                if 'timestamp' not in alert_data:
+                    alert_data['timestamp'] = datetime.now().isoformat()
+                
+                alert_system.process_alert(alert_data)
+                alert_store.add(alert_data)
+                notification_dispatcher.submit(alert_data)
+                event_stream.publish('alert', format_alert(alert_data, alert_severity(alert_data)))
+            except Exception:
+                continue
+        
+        try:
+            publish_stats()
         except Exception:
             continue
 
-def initialize_detector():
-    global detector
+def get_historical_fingerprint():
+    db = get_database()
     
-    detector = TransactionAnomalyDetector(window_size=60, z_threshold=3.0)
+    if not db.has_tables('transactions'):
+        return None
     
-    historical_df = load_historical_data()
+    try:
+        with db.connection(readonly=True) as conn:
+            last_rowid = conn.execute("SELECT MAX(rowid) FROM transactions").fetchone()[0]
+            marks = []
+            if db.has_tables('load_state'):
+                marks = conn.execute("SELECT path, offset, mtime FROM load_state ORDER BY path").fetchall()
+    except sqlite3.Error:
+        return None
     
-    if historical_df is not None and not historical_df.empty:
-        detector.fit_from_historical(historical_df)
-    else:
-        synthetic_df = create_synthetic_training_data()
-        detector.fit_from_historical(synthetic_df)
+    if last_rowid is None:
+        return None
+    
+    return '|'.join([str(last_rowid)] + ['{}:{}:{}'.format(*mark) for mark in marks])
+
+def create_detector():
+    if DETECTION_MODE == 'tumbling':
+        return TransactionAnomalyDetector(
+            window_size=60,
+            z_threshold=3.0,
+            training_needed=TUMBLING_TRAINING_MINUTES,
+            online_stats=ONLINE_STATS,
+            half_life_minutes=STATS_HALF_LIFE_MINUTES
+        )
+    return TransactionAnomalyDetector(
+        window_size=60,
+        z_threshold=3.0,
+        online_stats=ONLINE_STATS,
+        half_life_minutes=STATS_HALF_LIFE_MINUTES
+    )
+
+def restore_detector(fingerprint, warm_start):
+    if fingerprint is None:
+        return None
+    
+    paths = [detector_snapshot_path(), detector_fit_snapshot_path()] if warm_start else [detector_fit_snapshot_path()]
+    
+    for path in paths:
+        state = load_detector_snapshot(path, fingerprint)
+        if state is not None:
+            restored = create_detector()
+            restored.load_state(state)
+            return restored
+    
+    return None
+
+def create_seasonal_baseline(fingerprint, warm_start, historical_df=None):
+    if SEASONAL_BASELINE not in ('hour', 'dow_hour'):
+        return None
+    
+    baseline = SeasonalBaseline(
+        slot_minutes=60,
+        by_weekday=SEASONAL_BASELINE == 'dow_hour',
+        min_samples=SEASONAL_MIN_SAMPLES
+    )
+    
+    if fingerprint is not None and warm_start and baseline.load(seasonal_baseline_path(), fingerprint):
+        return baseline
+    
+    if historical_df is None:
+        historical_df = load_historical_data()
+    
+    if historical_df is None or historical_df.empty:
+        return None
+    
+    baseline.fit(historical_df)
+    if fingerprint is not None:
+        baseline.save(seasonal_baseline_path(), fingerprint)
+    return baseline
+
+def initialize_detector(warm_start=False):
+    global detector, detector_fingerprint, minute_results_version
+    
+    fingerprint = get_historical_fingerprint()
+    new_detector = restore_detector(fingerprint, warm_start)
+    historical_df = None
+    
+    if new_detector is None:
+        new_detector = create_detector()
+        
+        historical_df = load_historical_data()
+        
+        if historical_df is not None and not historical_df.empty:
+            new_detector.fit_from_historical(historical_df)
+            if fingerprint is not None:
+                save_detector_snapshot(new_detector.get_state(), detector_fit_snapshot_path(), fingerprint)
+        else:
+            fingerprint = None
+            synthetic_df = create_synthetic_training_data()
+            new_detector.fit_from_historical(synthetic_df)
+    
+    new_detector.set_seasonal_baseline(create_seasonal_baseline(fingerprint, warm_start, historical_df))
+    
+    auth_code_history = load_auth_code_history()
+    
+    with aggregator.merge_lock:
+        detector = new_detector
+        detector_fingerprint = fingerprint
+        minute_results.clear()
+        minute_results_version += 1
+        early_warned_minutes.clear()
+        if auth_code_history is not None and not auth_code_history.empty:
+            auth_code_detector.fit(auth_code_history)
     
     return True
 
+def save_runtime_snapshot():
+    if detector is None or detector_fingerprint is None:
+        return None
+    
+    with aggregator.merge_lock:
+        state = detector.get_state()
+        fingerprint = detector_fingerprint
+        if detector.seasonal is not None:
+            detector.seasonal.save(seasonal_baseline_path(), fingerprint)
+    
+    return save_detector_snapshot(state, detector_snapshot_path(), fingerprint)
+
+def snapshot_worker():
+    while True:
+        time.sleep(SNAPSHOT_INTERVAL)
+        try:
+            save_runtime_snapshot()
+        except Exception:
+            continue
+
 def get_minute_key(timestamp):
-    try:
-        dt = pd.to_datetime(timestamp)
-        return dt.floor('1min').strftime('%Y-%m-%d %H:%M:%S')
-    except:
-        return str(timestamp)
+    return minute_bucketer.epoch_minute(timestamp)
 
 @app.route('/health', methods=['GET'])
 def health_check():
@@ -161,13 +386,336 @@ def health_check():
         'timestamp': datetime.now().isoformat(),
         'detector_initialized': detector is not None,
         'alerts_pending': alert_queue.qsize(),
-        'alerts_history': len(alerts_history),
-        'minutes_in_buffer': len(minute_buffer)
+        'alerts_history': len(alert_store),
+        'minutes_in_buffer': aggregator.snapshot['minutes_in_buffer']
+    })
+
+def get_minute_data(minute_key):
+    data = minute_buffer.get(minute_key)
+    if data is None:
+        data = {status: 0 for status in VALID_STATUSES}
+        data['total'] = 0
+    data['timestamp'] = minute_bucketer.format_minute(minute_key)
+    return data
+
+def run_detection(minute_key, minute_data):
+    minute_data['timestamp'] = minute_bucketer.format_minute(minute_key)
+    result = detector.detect_anomalies(
+        minute_data['timestamp'],
+        minute_data.copy()
+    )
+    
+    if result['should_alert']:
+        raise_alert(minute_key, result)
+    
+    remember_result(minute_key, result)
+    
+    if detector.seasonal is not None:
+        detector.seasonal.observe(minute_key, minute_data)
+    
+    if live_writer is not None:
+        live_writer.record_minute(minute_key, minute_data['timestamp'], minute_data)
+    
+    publish_stats()
+    
+    return result
+
+def run_early_warning(minute_key, minute_data):
+    if minute_key in early_warned_minutes:
+        return minute_results.get(minute_key)
+    
+    result = detector.early_warning(
+        minute_bucketer.format_minute(minute_key),
+        minute_data
+    )
+    
+    if result['should_alert']:
+        early_warned_minutes.add(minute_key)
+        raise_alert(minute_key, result)
+    
+    remember_result(minute_key, result)
+    
+    return result
+
+def remember_result(minute_key, result):
+    global minute_results_version
+    
+    minute_results[minute_key] = result
+    minute_results_version += 1
+    oldest = minute_buffer.oldest_minute
+    if len(minute_results) > MINUTE_BUFFER_LIMIT and oldest is not None:
+        for expired in [m for m in minute_results if m < oldest]:
+            del minute_results[expired]
+            early_warned_minutes.discard(expired)
+
+def format_detection(result):
+    if result is None:
+        return None
+    
+    return {
+        'detected': result['should_alert'],
+        'score': round(result['anomaly_score'], 2),
+        'recommendation': result.get('recommendation', 'NORMAL'),
+        'anomalies': result['anomalies'][:3]
+    }
+
+def merge_entities(watermark_minute):
+    global last_entity_eviction
+    
+    pending = entity_counter.drain()
+    alerts = keyed_detector.ingest(pending) if pending else []
+    alerts.extend(keyed_detector.close_minutes(watermark_minute))
+    
+    if last_entity_eviction != watermark_minute:
+        last_entity_eviction = watermark_minute
+        keyed_detector.evict_idle(watermark_minute)
+    
+    for alert in alerts:
+        minute_key = alert.pop('minute')
+        alert['timestamp'] = minute_bucketer.format_minute(minute_key)
+        raise_alert(minute_key, alert)
+
+def merge_auth_codes(watermark_minute):
+    pending = auth_code_counter.drain()
+    if pending:
+        auth_code_detector.ingest(pending)
+    
+    for alert in auth_code_detector.close_minutes(watermark_minute):
+        alert['timestamp'] = minute_bucketer.format_minute(alert['minute'])
+        raise_alert(alert['minute'], alert)
+
+def merge_breakdowns(watermark_minute):
+    merge_entities(watermark_minute)
+    merge_auth_codes(watermark_minute)
+    close_incidents(watermark_minute)
+
+def raise_alert(minute_key, alert):
+    alert, closed = incident_tracker.observe(minute_key, alert)
+    if closed is not None:
+        publish_incident_closed(closed)
+    if alert is not None:
+        alert_queue.put(alert, block=False)
+
+def publish_incident_closed(incident):
+    alert_system.log_incident_closed(incident)
+    event_stream.publish('incident', {
+        'incident_id': incident['incident_id'],
+        'incident_status': 'closed',
+        'occurrences': incident['occurrences'],
+        'peak_score': incident['peak_score'],
+        'first_seen': incident['first_seen'],
+        'last_seen': incident['last_seen']
     })
 
+def close_incidents(watermark_minute):
+    for incident in incident_tracker.close_idle(watermark_minute):
+        publish_incident_closed(incident)
+
+def format_alert(alert, severity):
+    return {
+        'id': alert['id'],
+        'timestamp': alert.get('timestamp'),
+        'severity': severity,
+        'anomaly_score': round(alert.get('anomaly_score', 0), 2),
+        'recommendation': alert.get('recommendation', 'NORMAL'),
+        'entity': alert.get('entity'),
+        'incident_id': alert.get('incident_id'),
+        'incident_status': alert.get('incident_status'),
+        'occurrences': alert.get('occurrences', 1),
+        'peak_score': alert.get('peak_score'),
+        'last_seen': alert.get('last_seen'),
+        'anomalies': alert.get('anomalies', [])
+    }
+
+def build_current_status(snapshot):
+    if not snapshot['minutes_in_buffer']:
+        return {
+            'current_minute': None,
+            'current_minute_data': {
+                'approved': 0, 'failed': 0, 'denied': 0, 'reversed': 0, 'total': 0
+            },
+            'statistics': {
+                'total_transactions': 0,
+                'success_rate': 0,
+                'minutes_in_buffer': 0
+            }
+        }
+    
+    current_minute = minute_bucketer.format_minute(snapshot['current_minute'])
+    current_data = dict(snapshot['current_minute_data'], timestamp=current_minute)
+    
+    totals = snapshot['totals']
+    total_tx = totals['total']
+    total_approved = totals['approved']
+    success_rate = (total_approved / total_tx * 100) if total_tx > 0 else 0
+    
+    return {
+        'current_minute': current_minute,
+        'current_minute_data': current_data,
+        'statistics': {
+            'total_transactions': total_tx,
+            'success_rate': round(success_rate, 2),
+            'minutes_in_buffer': snapshot['minutes_in_buffer']
+        }
+    }
+
+def build_stream_stats():
+    stats = {
+        'alerts_history': len(alert_store),
+        'minutes_in_buffer': aggregator.snapshot['minutes_in_buffer']
+    }
+    if detector is not None:
+        total_stats = detector.status_stats.get('total', {})
+        stats.update({
+            'mean': total_stats.get('mean', 0),
+            'std': total_stats.get('std', 0),
+            'z_threshold': detector.z_threshold,
+            'training_complete': detector.training_complete
+        })
+    return stats
+
+def build_stream_snapshot():
+    page, _ = alert_store.query(limit=STREAM_RECENT_ALERTS)
+    return {
+        'status': build_current_status(aggregator.snapshot),
+        'alerts': [format_alert(alert, severity) for alert, severity in page],
+        'stats': build_stream_stats()
+    }
+
+def build_minute_series(minutes):
+    with aggregator.merge_lock:
+        latest = minute_buffer.latest_minute
+        items = minute_buffer.items()
+        results = {m: minute_results[m] for m, _ in items if m in minute_results}
+    
+    if latest is None:
+        return []
+    
+    series = []
+    for minute_key, data in items:
+        if minute_key <= latest - minutes:
+            continue
+        result = results.get(minute_key)
+        series.append(dict(
+            data,
+            timestamp=minute_bucketer.format_minute(minute_key),
+            anomaly_score=round(result['anomaly_score'], 2) if result is not None else None
+        ))
+    return series
+
+def build_dashboard_snapshot(version, minutes, alert_limit):
+    page, _ = alert_store.query(limit=alert_limit)
+    return {
+        'version': version,
+        'generated_at': datetime.now().isoformat(),
+        'status': build_current_status(aggregator.snapshot),
+        'series': build_minute_series(minutes),
+        'alerts': {
+            'counts': alert_store.counts(),
+            'recent': [format_alert(alert, severity) for alert, severity in page]
+        },
+        'stats': build_stream_stats()
+    }
+
+def publish_minute(snapshot):
+    event_stream.publish('minute', build_current_status(snapshot))
+
+def publish_stats():
+    global last_stream_stats
+    
+    stats = build_stream_stats()
+    if stats != last_stream_stats:
+        last_stream_stats = stats
+        event_stream.publish('stats', stats)
+
+if DETECTION_MODE == 'tumbling':
+    aggregator = MinuteAggregator(
+        minute_buffer,
+        on_minute=run_early_warning if EARLY_WARNING_ENABLED else None,
+        on_minute_close=run_detection,
+        on_merge=merge_breakdowns,
+        on_snapshot=publish_minute,
+        grace_seconds=WATERMARK_GRACE_SECONDS,
+        stripes=AGGREGATOR_STRIPES,
+        merge_interval=AGGREGATOR_MERGE_INTERVAL
+    )
+else:
+    aggregator = MinuteAggregator(
+        minute_buffer,
+        on_minute=run_detection,
+        on_merge=merge_breakdowns,
+        on_snapshot=publish_minute,
+        grace_seconds=WATERMARK_GRACE_SECONDS,
+        stripes=AGGREGATOR_STRIPES,
+        merge_interval=AGGREGATOR_MERGE_INTERVAL
+    )
+
+def validate_transaction(data):
+    if not isinstance(data, dict):
+        return None, None, 'Event must be a JSON object'
+    
+    timestamp = data.get('timestamp')
+    status = str(data.get('status') or '').lower()
+    
+    if not timestamp or not status:
+        return None, None, 'Missing timestamp or status'
+    
+    if status not in VALID_STATUSES:
+        return None, None, f'Invalid status. Must be one of: {VALID_STATUSES}'
+    
+    return timestamp, status, None
+
+def get_entity_key(data):
+    entity = data.get('entity')
+    
+    if entity is None or entity == '':
+        return None, None
+    
+    if isinstance(entity, bool) or not isinstance(entity, (str, int)):
+        return None, 'Invalid entity key'
+    
+    entity = str(entity)
+    if len(entity) > MAX_ENTITY_KEY_LENGTH:
+        return None, f'Entity key longer than {MAX_ENTITY_KEY_LENGTH} characters'
+    
+    return entity, None
+
+def get_auth_code_index(data):
+    auth_code = data.get('auth_code')
+    
+    if auth_code is None or auth_code == '':
+        return None, None
+    
+    auth_code = normalize_auth_code(auth_code)
+    if auth_code is None:
+        return None, 'Invalid auth code. Must be a 2-character alphanumeric response code'
+    
+    return code_index(auth_code), None
+
+def parse_batch_payload(req):
+    body = req.get_data(as_text=True)
+    
+    if req.mimetype in NDJSON_MIMETYPES:
+        events = []
+        for line in body.splitlines():
+            line = line.strip()
+            if line:
+                events.append(json.loads(line))
+        return events
+    
+    payload = json.loads(body) if body.strip() else None
+    
+    if isinstance(payload, dict):
+        payload = payload.get('events')
+    
+    if not isinstance(payload, list):
+        raise ValueError('Expected a JSON array of events')
+    
+    return payload
+
 @app.route('/api/transaction', methods=['POST'])
 def receive_transaction():
-    global minute_buffer, detector
+    global detector
     
     try:
         if detector is None:
@@ -178,93 +726,180 @@ def receive_transaction():
         if not data:
             return jsonify({'error': 'No data provided'}), 400
         
-        timestamp = data.get('timestamp')
-        status = data.get('status', '').lower()
+        timestamp, status, error = validate_transaction(data)
         
-        if not timestamp or not status:
-            return jsonify({'error': 'Missing timestamp or status'}), 400
+        if not error:
+            entity, error = get_entity_key(data)
         
-        if status not in VALID_STATUSES:
-            return jsonify({'error': f'Invalid status. Must be one of: {VALID_STATUSES}'}), 400
+        if not error:
+            auth_index, error = get_auth_code_index(data)
         
-        minute_key = get_minute_key(timestamp)
+        if error:
+            return jsonify({'error': error}), 400
         
-        if minute_key not in minute_buffer:
-            minute_buffer[minute_key] = {
-                'timestamp': minute_key,
-                'approved': 0,
-                'failed': 0,
-                'denied': 0,
-                'reversed': 0,
-                'total': 0
-            }
+        try:
+            minute_key = get_minute_key(timestamp)
+        except ValueError:
+            return jsonify({'error': 'Invalid timestamp'}), 400
         
-        minute_buffer[minute_key][status] += 1
-        minute_buffer[minute_key]['total'] += 1
+        if aggregator.is_future(minute_key):
+            return jsonify({'error': 'Timestamp is too far in the future'}), 400
         
-        if len(minute_buffer) > MINUTE_BUFFER_LIMIT:
-            oldest = sorted(minute_buffer.keys())[0]
-            del minute_buffer[oldest]
+        if aggregator.is_expired(minute_key):
+            return jsonify({'error': 'Timestamp is older than the minute buffer window'}), 400
         
-        result = detector.detect_anomalies(
-            minute_key,
-            minute_buffer[minute_key].copy()
-        )
+        aggregator.add(minute_key, {status: 1})
+        
+        if entity is not None:
+            entity_counter.add((entity, minute_key), {status: 1})
+        
+        if auth_index is not None:
+            auth_code_counter.add(minute_key, {auth_index: 1})
         
-        if result['should_alert']:
-            alert_queue.put(result)
+        if live_writer is not None:
+            live_writer.record_events([(minute_key, timestamp, status)])
         
         return jsonify({
-            'status': 'processed',
+            'status': 'accepted',
             'transaction': {
                 'timestamp': timestamp,
-                'status': status
+                'status': status,
+                'entity': entity,
+                'auth_code': normalize_auth_code(data.get('auth_code')) if auth_index is not None else None
             },
-            'minute': minute_buffer[minute_key],
-            'anomaly_detection': {
-                'detected': result['should_alert'],
-                'score': round(result['anomaly_score'], 2),
-                'recommendation': result.get('recommendation', 'NORMAL'),
-                'anomalies': result['anomalies'][:3]
-            }
+            'minute': get_minute_data(minute_key),
+            'anomaly_detection': format_detection(minute_results.get(minute_key))
         }), 200
         
     except Exception:
         return jsonify({'error': 'Internal server error'}), 500
 
-@app.route('/api/status/current', methods=['GET'])
-def get_current_status():
+@app.route('/api/transaction/batch', methods=['POST'])
+def receive_transaction_batch():
     try:
-        if not minute_buffer:
-            return jsonify({
-                'current_minute': None,
-                'current_minute_data': {
-                    'approved': 0, 'failed': 0, 'denied': 0, 'reversed': 0, 'total': 0
-                },
-                'statistics': {
-                    'total_transactions': 0,
-                    'success_rate': 0,
-                    'minutes_in_buffer': 0
-                }
-            }), 200
-        
-        recent_minutes = sorted(minute_buffer.keys(), reverse=True)
-        current_minute = recent_minutes[0]
-        current_data = minute_buffer[current_minute]
-        
-        total_tx = sum(m.get('total', 0) for m in minute_buffer.values())
-        total_approved = sum(m.get('approved', 0) for m in minute_buffer.values())
-        success_rate = (total_approved / total_tx * 100) if total_tx > 0 else 0
+        if detector is None:
+            return jsonify({'error': 'Detector not initialized'}), 503
         
-        return jsonify({
-            'current_minute': current_minute,
-            'current_minute_data': current_data,
-            'statistics': {
-                'total_transactions': total_tx,
-                'success_rate': round(success_rate, 2),
-                'minutes_in_buffer': len(minute_buffer)
+        try:
+            events = parse_batch_payload(request)
+        except ValueError as e:
+            return jsonify({'error': f'Invalid batch payload: {e}'}), 400
+        
+        if not events:
+            return jsonify({'error': 'No data provided'}), 400
+        
+        if len(events) > MAX_BATCH_SIZE:
+            return jsonify({'error': f'Batch too large. Maximum is {MAX_BATCH_SIZE} events'}), 413
+        
+        minutes = {}
+        entity_minutes = {}
+        auth_code_minutes = {}
+        errors = []
+        rejected = 0
+        raw_events = []
+        
+        for index, event in enumerate(events):
+            timestamp, status, error = validate_transaction(event)
+            
+            if not error:
+                entity, error = get_entity_key(event)
+            
+            if not error:
+                auth_index, error = get_auth_code_index(event)
+            
+            if not error:
+                try:
+                    minute_key = get_minute_key(timestamp)
+                except ValueError:
+                    error = 'Invalid timestamp'
+            
+            if not error and aggregator.is_future(minute_key):
+                error = 'Timestamp is too far in the future'
+            
+            if error:
+                rejected += 1
+                if len(errors) < BATCH_ERROR_LIMIT:
+                    errors.append({'index': index, 'error': error})
+                continue
+            
+            counts = minutes.setdefault(minute_key, {})
+            counts[status] = counts.get(status, 0) + 1
+            raw_events.append((minute_key, timestamp, status))
+            
+            if entity is not None:
+                entity_counts = entity_minutes.setdefault((entity, minute_key), {})
+                entity_counts[status] = entity_counts.get(status, 0) + 1
+            
+            if auth_index is not None:
+                code_counts = auth_code_minutes.setdefault(minute_key, {})
+                code_counts[auth_index] = code_counts.get(auth_index, 0) + 1
+        
+        summaries = []
+        alerts_raised = 0
+        expired = 0
+        
+        for minute_key in sorted(minutes):
+            if aggregator.is_expired(minute_key):
+                expired += sum(minutes[minute_key].values())
+                continue
+            aggregator.add(minute_key, minutes[minute_key])
+        
+        for entity_minute, entity_counts in entity_minutes.items():
+            if not aggregator.is_expired(entity_minute[1]):
+                entity_counter.add(entity_minute, entity_counts)
+        
+        for minute_key, code_counts in auth_code_minutes.items():
+            if not aggregator.is_expired(minute_key):
+                auth_code_counter.add(minute_key, code_counts)
+        
+        if live_writer is not None:
+            live_writer.record_events(raw_events)
+        
+        aggregator.flush()
+        
+        for minute_key in sorted(minutes):
+            if minute_key not in minute_buffer:
+                continue
+            
+            result = minute_results.get(minute_key)
+            
+            if result is not None and result['should_alert']:
+                alerts_raised += 1
+            
+            summary = {
+                'minute': minute_bucketer.format_minute(minute_key),
+                'received': minutes[minute_key],
+                'counts': get_minute_data(minute_key)
             }
-        }), 200
+            if result is not None:
+                summary.update({
+                    'detected': result['should_alert'],
+                    'score': round(result['anomaly_score'], 2),
+                    'recommendation': result.get('recommendation', 'NORMAL'),
+                    'anomalies': result['anomalies']
+                })
+            summaries.append(summary)
+        
+        return jsonify({
+            'status': 'processed',
+            'received': len(events),
+            'accepted': len(events) - rejected,
+            'rejected': rejected,
+            'expired': expired,
+            'errors': errors,
+            'minutes': summaries,
+            'entities': len({entity for entity, _ in entity_minutes}),
+            'auth_coded': sum(sum(c.values()) for c in auth_code_minutes.values()),
+            'alerts_raised': alerts_raised
+        }), 200 if rejected < len(events) else 400
+        
+    except Exception:
+        return jsonify({'error': 'Internal server error'}), 500
+
+@app.route('/api/status/current', methods=['GET'])
+def get_current_status():
+    try:
+        return jsonify(build_current_status(aggregator.snapshot)), 200
         
     except Exception:
         return jsonify({'error': 'Internal server error'}), 500
@@ -272,56 +907,142 @@ def get_current_status():
 @app.route('/api/alerts', methods=['GET'])
 def get_alerts():
     try:
-        limit = min(request.args.get('limit', 50, type=int), 500)
-        recent_alerts = alerts_history[-limit:] if alerts_history else []
-        
-        formatted_alerts = []
-        for alert in recent_alerts:
-            formatted_alerts.append({
-                'timestamp': alert.get('timestamp'),
-                'anomaly_score': round(alert.get('anomaly_score', 0), 2),
-                'recommendation': alert.get('recommendation', 'NORMAL'),
-                'anomalies': alert.get('anomalies', [])[:2]
-            })
+        limit = max(1, min(request.args.get('limit', 50, type=int), ALERT_PAGE_LIMIT))
+        severity = request.args.get('severity')
+        category = request.args.get('category')
+        
+        if severity is not None:
+            severity = severity.upper()
+            if severity not in SEVERITIES:
+                return jsonify({'error': f'Invalid severity. Must be one of: {SEVERITIES}'}), 400
+        if category is not None:
+            category = category.lower()
+            if category not in CATEGORIES:
+                return jsonify({'error': f'Invalid category. Must be one of: {CATEGORIES}'}), 400
+        
+        since = request.args.get('since')
+        until = request.args.get('until')
+        try:
+            since = pd.Timestamp(since).strftime(MINUTE_KEY_FORMAT) if since else None
+            until = pd.Timestamp(until).strftime(MINUTE_KEY_FORMAT) if until else None
+        except ValueError:
+            return jsonify({'error': 'Invalid since/until timestamp'}), 400
+        
+        try:
+            page, next_cursor = alert_store.query(
+                limit=limit,
+                cursor=request.args.get('cursor'),
+                severity=severity,
+                category=category,
+                anomaly_type=request.args.get('type'),
+                min_score=request.args.get('min_score', type=float),
+                since=since,
+                until=until
+            )
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        
+        formatted_alerts = [format_alert(alert, severity) for alert, severity in page]
+        counts = alert_store.counts()
         
         return jsonify({
-            'total_alerts': len(alerts_history),
-            'alerts': formatted_alerts
+            'total_alerts': counts['total'],
+            'counts': counts,
+            'alerts': formatted_alerts,
+            'next_cursor': next_cursor
         }), 200
         
     except Exception:
         return jsonify({'error': 'Internal server error'}), 500
 
+@app.route('/api/alerts/clear', methods=['POST'])
+def clear_alerts():
+    cleared = len(alert_store)
+    alert_store.clear()
+    
+    event_stream.publish('snapshot', build_stream_snapshot())
+    
+    return jsonify({'message': 'Alerts cleared', 'cleared': cleared}), 200
+
+@app.route('/api/dashboard/snapshot', methods=['GET'])
+def get_dashboard_snapshot():
+    minutes = max(1, min(request.args.get('minutes', SNAPSHOT_SERIES_MINUTES, type=int), MINUTE_BUFFER_LIMIT))
+    alert_limit = max(0, min(request.args.get('alerts', SNAPSHOT_RECENT_ALERTS, type=int), ALERT_PAGE_LIMIT))
+    
+    version = f'{event_stream.last_id}.{minute_results_version}'
+    etag = f'{API_INSTANCE_ID}-{version}-{minutes}-{alert_limit}'
+    headers = {'Cache-Control': 'no-cache'}
+    
+    if request.if_none_match.contains(etag):
+        response = Response(status=304, headers=headers)
+        response.set_etag(etag)
+        return response
+    
+    cached = dashboard_snapshot_cache.get((minutes, alert_limit))
+    if cached is None or cached[0] != version:
+        body = json.dumps(build_dashboard_snapshot(version, minutes, alert_limit), default=str)
+        if len(dashboard_snapshot_cache) >= SNAPSHOT_CACHE_SIZE:
+            dashboard_snapshot_cache.clear()
+        dashboard_snapshot_cache[(minutes, alert_limit)] = (version, body)
+    else:
+        body = cached[1]
+    
+    response = Response(body, mimetype='application/json', headers=headers)
+    response.set_etag(etag)
+    return response
+
+@app.route('/api/stream', methods=['GET'])
+def stream_events():
+    last_event_id = request.headers.get('Last-Event-ID') or request.args.get('last_event_id')
+    try:
+        last_event_id = int(last_event_id) if last_event_id else None
+    except ValueError:
+        last_event_id = None
+    
+    subscription, resumed = event_stream.subscribe(last_event_id)
+    if subscription is None:
+        return jsonify({'error': 'Too many stream clients'}), 503
+    
+    return Response(
+        event_stream.stream(subscription, resumed, build_stream_snapshot),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
 @app.route('/api/query/transactions', methods=['GET'])
 def query_transactions():
     try:
         limit = request.args.get('limit', 100, type=int)
-        db_path = get_database_path()
-        conn = sqlite3.connect(db_path)
+        interval = request.args.get('interval', 1, type=int)
+        if interval < 1:
+            return jsonify({'error': 'interval must be a positive number of minutes'}), 400
         
-        cursor = conn.cursor()
-        cursor.execute("SELECT name FROM sqlite_master WHERE type='table'")
-        tables = [row[0] for row in cursor.fetchall()]
+        db = get_database()
+        has_minutes = minute_storage_ready(db)
+        has_live = db.has_tables(LIVE_TABLE)
+        if not has_minutes and not db.has_tables('transactions'):
+            return jsonify({'error': 'No transactions table found'}), 404
         
-        if 'transactions' in tables:
-            cursor.execute("PRAGMA table_info(transactions)")
-            columns = [col[1] for col in cursor.fetchall()]
-            
-            if 'status' in columns and 'count' in columns:
-                query = """
-                    SELECT 
-                        timestamp,
-                        SUM(CASE WHEN status = 'failed' THEN count ELSE 0 END) as failed,
-                        SUM(CASE WHEN status = 'denied' THEN count ELSE 0 END) as denied,
-                        SUM(CASE WHEN status = 'reversed' THEN count ELSE 0 END) as reversed,
-                        SUM(CASE WHEN status = 'approved' THEN count ELSE 0 END) as approved,
-                        SUM(count) as total
-                    FROM transactions
-                    GROUP BY timestamp
-                    ORDER BY timestamp DESC
-                    LIMIT ?
+        with db.connection(readonly=True) as conn:
+            if has_minutes and interval > 1:
+                sources = [MINUTE_TABLE, LIVE_TABLE] if has_live else [MINUTE_TABLE]
+                query, params = bucket_query(interval, sources)
+                df = pd.read_sql_query(query, conn, params=params + [limit])
+            elif has_minutes:
+                query = f"""
+                    SELECT minute, timestamp, failed, denied, reversed, approved, total
+                    FROM {MINUTE_TABLE}
                 """
-                df = pd.read_sql_query(query, conn, params=(limit,))
+                
+                if has_live:
+                    query += """
+                        UNION ALL
+                        SELECT minute, timestamp, failed, denied, reversed, approved, total
+                        FROM live_minutes
+                    """
+                
+                query += " ORDER BY minute DESC LIMIT ?"
+                df = pd.read_sql_query(query, conn, params=(limit,)).drop(columns='minute')
             else:
                 query = "SELECT timestamp, count as total FROM transactions ORDER BY timestamp DESC LIMIT ?"
                 df = pd.read_sql_query(query, conn, params=(limit,))
@@ -329,11 +1050,6 @@ def query_transactions():
                 df['denied'] = df['total'] * 0.10
                 df['reversed'] = df['total'] * 0.05
                 df['approved'] = df['total'] * 0.70
-        else:
-            conn.close()
-            return jsonify({'error': 'No transactions table found'}), 404
-        
-        conn.close()
         
         stats = {}
         if not df.empty:
@@ -364,42 +1080,137 @@ def get_system_stats():
     stats.update({
         'api': {
             'alerts_pending': alert_queue.qsize(),
-            'alerts_history': len(alerts_history),
-            'minutes_in_buffer': len(minute_buffer),
-            'total_transactions': sum(m['total'] for m in minute_buffer.values())
-        }
+            'alerts_history': len(alert_store),
+            'minutes_in_buffer': aggregator.snapshot['minutes_in_buffer'],
+            'total_transactions': aggregator.snapshot['totals']['total']
+        },
+        'aggregation': aggregator.get_stats(),
+        'entities': keyed_detector.get_stats(),
+        'auth_codes': auth_code_detector.get_stats(),
+        'alert_log': alert_system.log_writer.get_stats(),
+        'stream': event_stream.get_stats(),
+        'notifications': notification_dispatcher.get_stats(),
+        'incidents': incident_tracker.get_stats(),
+        'alert_queue': dict(alert_queue.get_stats(), coalesced=incident_tracker.alerts_coalesced),
+        'persistence': live_writer.get_stats() if live_writer is not None else None,
+        'database': database.get_stats() if database is not None else None
     })
     
     return jsonify(stats)
 
+@app.route('/api/entities/<path:entity>', methods=['GET'])
+def get_entity_status(entity):
+    with aggregator.merge_lock:
+        data = keyed_detector.get_entity(entity)
+    
+    if data is None:
+        return jsonify({'error': 'Unknown entity'}), 404
+    
+    for field in ('current_minute', 'last_seen_minute'):
+        if data[field] is not None:
+            data[field] = minute_bucketer.format_minute(data[field])
+    
+    return jsonify(data), 200
+
+@app.route('/api/auth-codes', methods=['GET'])
+def get_auth_code_status():
+    limit = request.args.get('limit', 20, type=int)
+    
+    with aggregator.merge_lock:
+        baseline = auth_code_detector.get_baseline(limit)
+        last_result = auth_code_detector.last_result
+        stats = auth_code_detector.get_stats()
+    
+    last_minute = None
+    if last_result is not None:
+        last_minute = {
+            'minute': minute_bucketer.format_minute(last_result['minute']),
+            'total': last_result['status_counts']['total'],
+            'auth_codes': last_result['auth_codes'],
+            'chi_square': last_result['chi_square'],
+            'divergence': last_result['divergence'],
+            'should_alert': last_result['should_alert']
+        }
+    
+    return jsonify({
+        'baseline': baseline,
+        'last_minute': last_minute,
+        'stats': stats
+    }), 200
+
 @app.route('/api/reset', methods=['POST'])
 def reset_system():
-    global minute_buffer, alerts_history, detector
-    
-    minute_buffer = {}
-    alerts_history = []
+    global detector
     
-    while not alert_queue.empty():
-        try:
-            alert_queue.get_nowait()
-            alert_queue.task_done()
-        except queue.Empty:
-            break
+    with aggregator.merge_lock:
+        aggregator.reset()
+        entity_counter.drain()
+        keyed_detector.reset()
+        auth_code_counter.drain()
+        auth_code_detector.reset()
+        alert_store.clear()
+        incident_tracker.reset()
+        
+        alert_queue.clear()
+        
+        initialize_detector()
     
-    initialize_detector()
+    event_stream.publish('snapshot', build_stream_snapshot())
     
     return jsonify({'message': 'System reset successfully'}), 200
 
+def start_live_writer():
+    global live_writer
+    
+    if not PERSIST_LIVE_DATA:
+        return None
+    
+    db = get_database()
+    live_writer = LiveTransactionWriter(
+        db.db_path,
+        raw_events=PERSIST_RAW_EVENTS,
+        flush_interval=LIVE_FLUSH_INTERVAL,
+        flush_size=LIVE_FLUSH_SIZE,
+        connections=db
+    )
+    live_writer.start()
+    atexit.register(live_writer.stop)
+    
+    return live_writer
+
+def stop_aggregation():
+    aggregator.stop()
+    
+    try:
+        save_runtime_snapshot()
+    except Exception:
+        pass
+    
+    if live_writer is not None:
+        for minute_key in sorted(aggregator.open_minutes):
+            minute_data = get_minute_data(minute_key)
+            live_writer.record_minute(minute_key, minute_data['timestamp'], minute_data)
+
 def start_api(host='0.0.0.0', port=5000):
     print("\n" + "=" * 60)
     print("TRANSACTION MONITORING API")
     print("=" * 60)
     
-    initialize_detector()
+    initialize_detector(warm_start=True)
+    
+    start_live_writer()
+    aggregator.start()
+    atexit.register(stop_aggregation)
     
     worker_thread = threading.Thread(target=alert_worker, daemon=True)
     worker_thread.start()
     
+    notification_dispatcher.start()
+    atexit.register(notification_dispatcher.stop)
+    
+    snapshot_thread = threading.Thread(target=snapshot_worker, daemon=True)
+    snapshot_thread.start()
+    
     print("\nServer running on http://{}:{}".format(host, port))
     print("=" * 60 + "\n")
     
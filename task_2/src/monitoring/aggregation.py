@@ -0,0 +1,239 @@
+import itertools
+import threading
+import time
+
+from monitoring.time_buckets import wall_clock_seconds
+
+
+class StripedMinuteCounter:
+    def __init__(self, stripes=16):
+        self.stripes = stripes
+        self._locks = [threading.Lock() for _ in range(stripes)]
+        self._pending = [{} for _ in range(stripes)]
+        self._next_stripe = itertools.count()
+        self._local = threading.local()
+
+    def _stripe(self):
+        stripe = getattr(self._local, 'stripe', None)
+        if stripe is None:
+            stripe = next(self._next_stripe) % self.stripes
+            self._local.stripe = stripe
+        return stripe
+
+    def add(self, minute, status_counts):
+        stripe = self._stripe()
+        with self._locks[stripe]:
+            minute_counts = self._pending[stripe].setdefault(minute, {})
+            for status, count in status_counts.items():
+                minute_counts[status] = minute_counts.get(status, 0) + count
+
+    def drain(self):
+        merged = {}
+        for stripe in range(self.stripes):
+            with self._locks[stripe]:
+                pending = self._pending[stripe]
+                if not pending:
+                    continue
+                self._pending[stripe] = {}
+
+            for minute, status_counts in pending.items():
+                minute_counts = merged.setdefault(minute, {})
+                for status, count in status_counts.items():
+                    minute_counts[status] = minute_counts.get(status, 0) + count
+        return merged
+
+    def pending_events(self):
+        total = 0
+        for stripe in range(self.stripes):
+            with self._locks[stripe]:
+                total += sum(sum(c.values()) for c in self._pending[stripe].values())
+        return total
+
+
+class MinuteAggregator:
+    def __init__(self, ring, on_minute=None, on_minute_close=None, on_merge=None, on_snapshot=None,
+                 grace_seconds=5.0, clock=wall_clock_seconds, stripes=16, merge_interval=0.05):
+        self.ring = ring
+        self.counter = StripedMinuteCounter(stripes=stripes)
+        self.on_minute = on_minute
+        self.on_minute_close = on_minute_close
+        self.on_merge = on_merge
+        self.on_snapshot = on_snapshot
+        self.grace_seconds = grace_seconds
+        self.clock = clock
+        self.merge_interval = merge_interval
+        self.open_minutes = set()
+        self.closed_minutes = set()
+        self.minutes_closed = 0
+        self.late_events = 0
+        self.merge_lock = threading.RLock()
+        self.generation = 0
+        self.merged_events = 0
+        self.expired_events = 0
+        self.future_events = 0
+        self.handler_errors = 0
+        self.snapshot = self._build_snapshot()
+        self._merged = threading.Condition()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def add(self, minute, status_counts):
+        self.counter.add(minute, status_counts)
+
+    def is_expired(self, minute):
+        oldest = self.ring.oldest_minute
+        return oldest is not None and minute < oldest
+
+    def is_future(self, minute):
+        horizon = self.ring.horizon_minute()
+        return horizon is not None and minute > horizon
+
+    def start(self):
+        if self.is_running():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name='minute-aggregator', daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout=2.0):
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+        self._thread = None
+
+    def is_running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def flush(self, timeout=2.0):
+        if not self.is_running():
+            self.merge_once()
+            return True
+
+        deadline = time.monotonic() + timeout
+        with self._merged:
+            target = self.generation + 2
+            while self.generation < target:
+                self._wake.set()
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                self._merged.wait(remaining)
+        return True
+
+    def reset(self):
+        with self.merge_lock:
+            self.counter.drain()
+            self.ring.clear()
+            self.open_minutes.clear()
+            self.closed_minutes.clear()
+            self.snapshot = self._build_snapshot()
+
+    def merge_once(self):
+        try:
+            with self.merge_lock:
+                pending = self.counter.drain()
+                for minute in sorted(pending):
+                    status_counts = pending[minute]
+                    events = sum(status_counts.values())
+
+                    if self.is_future(minute):
+                        self.future_events += events
+                        continue
+
+                    if not self.ring.add(minute, status_counts):
+                        self.expired_events += events
+                        continue
+
+                    self.merged_events += events
+
+                    if self.on_minute_close is not None:
+                        if minute in self.closed_minutes:
+                            self.late_events += events
+                            continue
+                        self.open_minutes.add(minute)
+
+                    self._call(self.on_minute, minute)
+
+                if self.on_minute_close is not None:
+                    self._close_minutes()
+
+                if self.on_merge is not None:
+                    try:
+                        self.on_merge(self.watermark_minute())
+                    except Exception:
+                        self.handler_errors += 1
+
+                if pending:
+                    self.snapshot = self._build_snapshot()
+                    if self.on_snapshot is not None:
+                        try:
+                            self.on_snapshot(self.snapshot)
+                        except Exception:
+                            self.handler_errors += 1
+        finally:
+            with self._merged:
+                self.generation += 1
+                self._merged.notify_all()
+
+    def watermark_minute(self):
+        return int((self.clock() - self.grace_seconds) // 60)
+
+    def _close_minutes(self):
+        watermark = self.watermark_minute()
+        for minute in sorted(m for m in self.open_minutes if m < watermark):
+            self.open_minutes.discard(minute)
+            self.closed_minutes.add(minute)
+            self.minutes_closed += 1
+            self._call(self.on_minute_close, minute)
+
+        oldest = self.ring.oldest_minute
+        if oldest is not None and len(self.closed_minutes) > self.ring.capacity:
+            self.closed_minutes = {m for m in self.closed_minutes if m >= oldest}
+
+    def _call(self, handler, minute):
+        if handler is None:
+            return
+        minute_data = self.ring.get(minute)
+        if minute_data is None:
+            return
+        try:
+            handler(minute, minute_data)
+        except Exception:
+            self.handler_errors += 1
+
+    def get_stats(self):
+        return {
+            'stripes': self.counter.stripes,
+            'pending_events': self.counter.pending_events(),
+            'merged_events': self.merged_events,
+            'expired_events': self.expired_events,
+            'future_events': self.future_events,
+            'handler_errors': self.handler_errors,
+            'open_minutes': len(self.open_minutes),
+            'minutes_closed': self.minutes_closed,
+            'late_events': self.late_events,
+            'watermark_minute': self.watermark_minute() if self.on_minute_close is not None else None,
+            'merge_generation': self.generation,
+            'running': self.is_running()
+        }
+
+    def _run(self):
+        while not self._stop.is_set():
+            self._wake.wait(self.merge_interval)
+            self._wake.clear()
+            try:
+                self.merge_once()
+            except Exception:
+                continue
+        self.merge_once()
+
+    def _build_snapshot(self):
+        current_minute, current_data = self.ring.current()
+        return {
+            'current_minute': current_minute,
+            'current_minute_data': current_data,
+            'totals': self.ring.totals(),
+            'minutes_in_buffer': len(self.ring)
+        }
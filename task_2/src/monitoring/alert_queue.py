@@ -0,0 +1,168 @@
+import heapq
+import itertools
+import threading
+import time
+from collections import deque
+
+from monitoring.online_stats import P2Quantile
+
+OVERFLOW_POLICIES = ('drop_oldest', 'drop_lowest', 'block')
+
+
+class BoundedAlertQueue:
+    def __init__(self, maxsize=10000, policy='drop_oldest', block_timeout=0.05, clock=time.monotonic):
+        if policy not in OVERFLOW_POLICIES:
+            raise ValueError(f'policy must be one of {OVERFLOW_POLICIES}')
+
+        self.maxsize = maxsize
+        self.policy = policy
+        self.block_timeout = block_timeout
+        self.clock = clock
+        self._items = deque()
+        self._lowest = []
+        self._size = 0
+        self._seq = itertools.count()
+        self._lock = threading.Lock()
+        self._not_empty = threading.Condition(self._lock)
+        self._not_full = threading.Condition(self._lock)
+        self.reset_stats()
+
+    def reset_stats(self):
+        self.enqueued = 0
+        self.dequeued = 0
+        self.dropped = 0
+        self.dropped_by_policy = {policy: 0 for policy in OVERFLOW_POLICIES}
+        self.block_fallbacks = 0
+        self.high_water = 0
+        self.batches = 0
+        self.latency_p50 = P2Quantile(0.5)
+        self.latency_p99 = P2Quantile(0.99)
+        self.latency_max = 0.0
+        self.latency_last = 0.0
+
+    def put(self, alert, block=True):
+        with self._lock:
+            if self._size >= self.maxsize and not self._make_room(alert, block):
+                self.dropped += 1
+                self.dropped_by_policy[self.policy] += 1
+                return False
+
+            score = alert.get('anomaly_score', 0)
+            entry = [score, next(self._seq), self.clock(), alert, True]
+            self._items.append(entry)
+            if self.policy == 'drop_lowest':
+                heapq.heappush(self._lowest, entry)
+            self._size += 1
+            self.high_water = max(self.high_water, self._size)
+            self.enqueued += 1
+            self._compact()
+            self._not_empty.notify()
+            return True
+
+    def _make_room(self, alert, block):
+        if self.policy == 'drop_lowest':
+            lowest = self._peek_lowest()
+            if lowest[0] >= alert.get('anomaly_score', 0):
+                return False
+            heapq.heappop(self._lowest)
+            self._discard(lowest)
+        elif self.policy == 'block' and block:
+            deadline = self.clock() + self.block_timeout
+            while self._size >= self.maxsize:
+                remaining = deadline - self.clock()
+                if remaining <= 0:
+                    return False
+                self._not_full.wait(remaining)
+            return True
+        else:
+            if self.policy == 'block':
+                self.block_fallbacks += 1
+            self._discard(self._pop_live())
+
+        self.dropped += 1
+        self.dropped_by_policy[self.policy] += 1
+        return True
+
+    def _peek_lowest(self):
+        while not self._lowest[0][4]:
+            heapq.heappop(self._lowest)
+        return self._lowest[0]
+
+    def _pop_live(self):
+        while True:
+            entry = self._items.popleft()
+            if entry[4]:
+                return entry
+
+    def _discard(self, entry):
+        entry[4] = False
+        self._size -= 1
+
+    def _compact(self):
+        if len(self._items) > 2 * self._size + 64:
+            self._items = deque(entry for entry in self._items if entry[4])
+        if len(self._lowest) > 2 * self._size + 64:
+            self._lowest = [entry for entry in self._lowest if entry[4]]
+            heapq.heapify(self._lowest)
+
+    def get_batch(self, max_items=100, timeout=0.1):
+        with self._lock:
+            if not self._size:
+                self._not_empty.wait(timeout)
+            if not self._size:
+                return []
+
+            now = self.clock()
+            batch = []
+            while self._size and len(batch) < max_items:
+                entry = self._pop_live()
+                self._discard(entry)
+                _, _, enqueued_at, alert, _ = entry
+                latency = now - enqueued_at
+                self.latency_p50.update(latency)
+                self.latency_p99.update(latency)
+                self.latency_max = max(self.latency_max, latency)
+                self.latency_last = latency
+                batch.append(alert)
+
+            self.dequeued += len(batch)
+            self.batches += 1
+            self._not_full.notify_all()
+            return batch
+
+    def clear(self):
+        with self._lock:
+            cleared = self._size
+            for entry in self._items:
+                entry[4] = False
+            self._items.clear()
+            self._lowest = []
+            self._size = 0
+            self._not_full.notify_all()
+            return cleared
+
+    def qsize(self):
+        return self._size
+
+    def empty(self):
+        return not self._size
+
+    def get_stats(self):
+        return {
+            'size': self._size,
+            'maxsize': self.maxsize,
+            'policy': self.policy,
+            'high_water': self.high_water,
+            'enqueued': self.enqueued,
+            'dequeued': self.dequeued,
+            'dropped': self.dropped,
+            'dropped_by_policy': dict(self.dropped_by_policy),
+            'block_fallbacks': self.block_fallbacks,
+            'batches': self.batches,
+            'latency_ms': {
+                'last': round(self.latency_last * 1000, 3),
+                'p50': round(self.latency_p50.value * 1000, 3),
+                'p99': round(self.latency_p99.value * 1000, 3),
+                'max': round(self.latency_max * 1000, 3)
+            }
+        }
@@ -0,0 +1,188 @@
+import base64
+import threading
+from bisect import bisect_left
+from collections import defaultdict
+
+SEVERITIES = ('CRITICAL', 'WARNING')
+CATEGORIES = ('failed', 'denied', 'reversed', 'statistical', 'entity', 'auth_code')
+
+
+def alert_severity(alert):
+    return 'CRITICAL' if alert.get('anomaly_score', 0) >= 70 else 'WARNING'
+
+
+def alert_categories(alert):
+    categories = set()
+    for anomaly in alert.get('anomalies', []):
+        anomaly_type = anomaly.get('type', '')
+        for status in ('failed', 'denied', 'reversed'):
+            if status in anomaly_type:
+                categories.add(status)
+        if 'outlier' in anomaly_type or 'statistical' in anomaly_type or 'spike' in anomaly_type:
+            categories.add('statistical')
+    if alert.get('entity') is not None:
+        categories.add('entity')
+    if 'auth_codes' in alert:
+        categories.add('auth_code')
+    return categories
+
+
+def encode_cursor(alert_id):
+    return base64.urlsafe_b64encode(f'a{alert_id}'.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode()
+        if not raw.startswith('a'):
+            raise ValueError
+        return int(raw[1:])
+    except (ValueError, UnicodeDecodeError):
+        raise ValueError('Invalid cursor')
+
+
+class PostingList:
+    def __init__(self):
+        self.ids = []
+        self.head = 0
+
+    def append(self, alert_id):
+        self.ids.append(alert_id)
+
+    def trim(self, min_id):
+        ids = self.ids
+        while self.head < len(ids) and ids[self.head] < min_id:
+            self.head += 1
+        if self.head > 1024 and self.head * 2 > len(ids):
+            del ids[:self.head]
+            self.head = 0
+
+    def newest_before(self, before=None):
+        ids = self.ids
+        end = len(ids) if before is None else bisect_left(ids, before, self.head)
+        for i in range(end - 1, self.head - 1, -1):
+            yield ids[i]
+
+    def __len__(self):
+        return len(self.ids) - self.head
+
+
+class AlertStore:
+    def __init__(self, capacity=1000):
+        self.capacity = capacity
+        self._lock = threading.Lock()
+        self.clear()
+
+    def clear(self):
+        with self._lock:
+            self._alerts = {}
+            self._all = PostingList()
+            self._by_severity = defaultdict(PostingList)
+            self._by_category = defaultdict(PostingList)
+            self._by_type = defaultdict(PostingList)
+            self._severity_counts = defaultdict(int)
+            self._category_counts = defaultdict(int)
+            self._oldest_id = 1
+            self._next_id = 1
+
+    def add(self, alert):
+        severity = alert_severity(alert)
+        categories = alert_categories(alert)
+        types = {anomaly.get('type', '') for anomaly in alert.get('anomalies', [])}
+
+        with self._lock:
+            alert_id = self._next_id
+            self._next_id += 1
+            alert['id'] = alert_id
+            self._alerts[alert_id] = (alert, severity, categories, types)
+
+            self._all.append(alert_id)
+            self._by_severity[severity].append(alert_id)
+            self._severity_counts[severity] += 1
+            for category in categories:
+                self._by_category[category].append(alert_id)
+                self._category_counts[category] += 1
+            for anomaly_type in types:
+                self._by_type[anomaly_type].append(alert_id)
+
+            while len(self._alerts) > self.capacity:
+                self._evict_oldest()
+
+        return alert_id
+
+    def _evict_oldest(self):
+        while self._oldest_id not in self._alerts:
+            self._oldest_id += 1
+        _, severity, categories, types = self._alerts.pop(self._oldest_id)
+        self._oldest_id += 1
+
+        self._severity_counts[severity] -= 1
+        self._by_severity[severity].trim(self._oldest_id)
+        for category in categories:
+            self._category_counts[category] -= 1
+            self._by_category[category].trim(self._oldest_id)
+        for anomaly_type in types:
+            postings = self._by_type[anomaly_type]
+            postings.trim(self._oldest_id)
+            if not postings:
+                del self._by_type[anomaly_type]
+        self._all.trim(self._oldest_id)
+
+    def query(self, limit=50, cursor=None, severity=None, category=None, anomaly_type=None,
+              min_score=None, since=None, until=None):
+        before = decode_cursor(cursor) if cursor else None
+
+        with self._lock:
+            candidates = [self._all]
+            if severity is not None:
+                candidates.append(self._by_severity.get(severity, PostingList()))
+            if category is not None:
+                candidates.append(self._by_category.get(category, PostingList()))
+            if anomaly_type is not None:
+                candidates.append(self._by_type.get(anomaly_type, PostingList()))
+            postings = min(candidates, key=len)
+
+            page = []
+            next_cursor = None
+            for alert_id in postings.newest_before(before):
+                record = self._alerts.get(alert_id)
+                if record is None:
+                    break
+                alert, record_severity, categories, types = record
+
+                if severity is not None and record_severity != severity:
+                    continue
+                if category is not None and category not in categories:
+                    continue
+                if anomaly_type is not None and anomaly_type not in types:
+                    continue
+                if min_score is not None and alert.get('anomaly_score', 0) < min_score:
+                    continue
+                timestamp = str(alert.get('timestamp', ''))
+                if since is not None and timestamp < since:
+                    continue
+                if until is not None and timestamp > until:
+                    continue
+
+                if len(page) == limit:
+                    next_cursor = encode_cursor(page[-1][0]['id'])
+                    break
+                page.append(record)
+
+        return [(alert, record_severity) for alert, record_severity, _, _ in page], next_cursor
+
+    def get(self, alert_id):
+        with self._lock:
+            record = self._alerts.get(alert_id)
+        return record[0] if record is not None else None
+
+    def counts(self):
+        with self._lock:
+            return {
+                'total': len(self._alerts),
+                'severity': {s: self._severity_counts.get(s, 0) for s in SEVERITIES},
+                'category': {c: self._category_counts.get(c, 0) for c in CATEGORIES}
+            }
+
+    def __len__(self):
+        return len(self._alerts)
@@ -1,14 +1,17 @@
-import json
-import os
+import atexit
 import logging
 from datetime import datetime
 
+from storage.alert_log import AlertLogWriter
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 class AlertSystem:
-    def __init__(self):
+    def __init__(self, log_dir='outputs/alerts'):
         self.alert_history = []
+        self.log_writer = AlertLogWriter(directory=log_dir)
+        atexit.register(self.log_writer.stop)
     
     def log_alert_to_file(self, alert_data):
         log_entry = {
@@ -17,15 +20,24 @@ class AlertSystem:
             'score': alert_data.get('anomaly_score'),
             'recommendation': alert_data.get('recommendation'),
             'status_counts': alert_data.get('status_counts'),
-            'anomalies': alert_data.get('anomalies', [])
+            'anomalies': alert_data.get('anomalies', []),
+            'incident_id': alert_data.get('incident_id'),
+            'incident_status': alert_data.get('incident_status')
         }
         
-        os.makedirs('outputs/alerts', exist_ok=True)
-        date_str = datetime.now().strftime('%Y-%m-%d')
-        filename = f'outputs/alerts/alerts_{date_str}.json'
-        
-        with open(filename, 'a') as f:
-            f.write(json.dumps(log_entry) + '\n')
+        self.log_writer.write(log_entry)
+    
+    def log_incident_closed(self, incident_data):
+        self.log_writer.write({
+            'timestamp': datetime.now().isoformat(),
+            'event': 'incident_closed',
+            'incident_id': incident_data.get('incident_id'),
+            'fingerprint': incident_data.get('fingerprint'),
+            'occurrences': incident_data.get('occurrences'),
+            'peak_score': incident_data.get('peak_score'),
+            'first_seen': incident_data.get('first_seen'),
+            'last_seen': incident_data.get('last_seen')
+        })
     
     def process_alert(self, alert_data):
         self.log_alert_to_file(alert_data)
@@ -2,17 +2,25 @@ import numpy as np
 import pandas as pd
 from collections import defaultdict, deque
 
+from monitoring.online_stats import OnlineStatusStats
+from monitoring.time_buckets import minute_bucketer
+
 class TransactionAnomalyDetector:
-    def __init__(self, window_size=60, z_threshold=3.0):
+    def __init__(self, window_size=60, z_threshold=3.0, training_needed=50,
+                 online_stats=False, half_life_minutes=None):
         self.window_size = window_size
         self.z_threshold = z_threshold
         self.history = defaultdict(lambda: deque(maxlen=window_size))
         self.status_stats = {}
         self.training_complete = False
         self.training_samples = 0
-        self.training_needed = 50
+        self.training_needed = training_needed
         self.min_training_samples = 30
         self.consecutive_alerts = defaultdict(int)
+        self.online_stats = online_stats
+        self.half_life_minutes = half_life_minutes
+        self.online = {}
+        self.seasonal = None
         
         self.rules = {
             'failed_ratio_threshold': 0.20,
@@ -35,17 +43,21 @@ class TransactionAnomalyDetector:
         if df.empty or len(df) < self.min_training_samples:
             return False
         
+        self.online = {}
+        
         for status in ['failed', 'denied', 'reversed', 'approved', 'total']:
             if status in df.columns:
                 values = df[status].values
                 non_zero = values[values > 0]
                 
                 if len(non_zero) >= 10:
+                    sample = non_zero
                     mean_val = np.mean(non_zero)
                     std_val = max(np.std(non_zero), 2.0)
                     p95 = np.percentile(non_zero, 95)
                     p99 = np.percentile(non_zero, 99)
                 else:
+                    sample = values
                     mean_val = max(np.mean(values), 5.0)
                     std_val = max(np.std(values), 2.0)
                     p95 = np.percentile(values, 95) if len(values) > 0 else mean_val * 2
@@ -58,8 +70,19 @@ class TransactionAnomalyDetector:
                     'p99': float(p99)
                 }
                 
+                if self.online_stats:
+                    online = OnlineStatusStats(self.half_life_minutes, nonzero_only=sample is non_zero)
+                    online.seed(sample, mean_val, np.std(sample))
+                    self.online[status] = online
+                
                 self.history[status].extend(values[-self.window_size:])
         
+        self._apply_percentile_rules()
+        
+        self.training_complete = True
+        return True
+    
+    def _apply_percentile_rules(self):
         failed_p95 = self.status_stats.get('failed', {}).get('p95', 25)
         denied_p95 = self.status_stats.get('denied', {}).get('p95', 20)
         reversed_p95 = self.status_stats.get('reversed', {}).get('p95', 12)
@@ -67,9 +90,36 @@ class TransactionAnomalyDetector:
         self.rules['failed_absolute_threshold'] = max(int(failed_p95), 20)
         self.rules['denied_absolute_threshold'] = max(int(denied_p95), 15)
         self.rules['reversed_absolute_threshold'] = max(int(reversed_p95), 10)
+    
+    def _update_online_stats(self, status_counts):
+        updated = False
+        for status, online in self.online.items():
+            if online.update(status_counts.get(status, 0)):
+                self.status_stats[status] = online.to_dict()
+                updated = True
         
-        self.training_complete = True
-        return True
+        if updated:
+            self._apply_percentile_rules()
+    
+    def set_seasonal_baseline(self, baseline):
+        self.seasonal = baseline
+    
+    def _seasonal_minutes(self, timestamps):
+        minutes = np.empty(len(timestamps), dtype=np.int64)
+        for i, timestamp in enumerate(timestamps):
+            try:
+                minutes[i] = minute_bucketer.epoch_minute(timestamp)
+            except ValueError:
+                minutes[i] = -1
+        return minutes
+    
+    def _seasonal_expected(self, timestamp):
+        if self.seasonal is None:
+            return None
+        try:
+            return self.seasonal.expected(minute_bucketer.epoch_minute(timestamp))
+        except ValueError:
+            return None
     
     def detect_anomalies(self, timestamp, status_counts):
         anomalies = []
@@ -88,6 +138,8 @@ class TransactionAnomalyDetector:
                 if status in self.history:
                     self.history[status].append(status_counts.get(status, 0))
             
+            self._update_online_stats(status_counts)
+            
             return {
                 'timestamp': timestamp,
                 'status_counts': status_counts,
@@ -162,12 +214,17 @@ class TransactionAnomalyDetector:
         else:
             self.consecutive_alerts['reversed'] = 0
         
+        seasonal = self._seasonal_expected(timestamp)
+        
         for status in ['failed', 'denied', 'reversed']:
             if status in self.status_stats and status in status_counts:
                 value = status_counts[status]
                 mean = self.status_stats[status].get('mean', 10)
                 std = self.status_stats[status].get('std', 5)
                 
+                if seasonal is not None and status in seasonal:
+                    mean, std = seasonal[status]
+                
                 if std > 2.0 and mean > 5 and value > mean * 1.5:
                     z_score = (value - mean) / std
                     
@@ -221,6 +278,8 @@ class TransactionAnomalyDetector:
             if status in self.history:
                 self.history[status].append(status_counts.get(status, 0))
         
+        self._update_online_stats(status_counts)
+        
         consecutive_threshold = 3
         for key, count in self.consecutive_alerts.items():
             if count >= consecutive_threshold:
@@ -262,6 +321,335 @@ class TransactionAnomalyDetector:
         
         return result
     
+    def _baseline_snapshot(self):
+        snapshot = []
+        for status in ['failed', 'denied', 'reversed']:
+            stats = self.status_stats.get(status, {})
+            snapshot += [
+                self.rules[f'{status}_absolute_threshold'],
+                stats.get('p95', 999),
+                stats.get('mean', 10),
+                stats.get('std', 5)
+            ]
+        return snapshot
+    
+    def _batch_baselines(self, counts, updates):
+        n = len(updates)
+        snapshot = self._baseline_snapshot()
+        
+        if not self.online:
+            table = np.tile(np.array(snapshot, dtype=np.float64), (n, 1))
+        else:
+            columns = {status: counts[status].tolist() if status in counts else [0] * n for status in self.online}
+            rows = []
+            for i, update in enumerate(updates.tolist()):
+                rows.append(snapshot)
+                if update:
+                    self._update_online_stats({status: values[i] for status, values in columns.items()})
+                    snapshot = self._baseline_snapshot()
+            table = np.array(rows, dtype=np.float64).reshape(n, len(snapshot))
+        
+        return {
+            status: dict(zip(['threshold', 'p95', 'mean', 'std'], table[:, 4 * k:4 * k + 4].T))
+            for k, status in enumerate(['failed', 'denied', 'reversed'])
+        }
+    
+    def detect_batch(self, df):
+        n = len(df)
+        timestamps = df['timestamp'].tolist() if 'timestamp' in df.columns else list(df.index)
+        counts = {
+            status: (df[status].to_numpy(dtype=np.int64) if status in df.columns else np.zeros(n, dtype=np.int64))
+            for status in ['approved', 'failed', 'denied', 'reversed', 'total']
+        }
+        total = counts['total']
+        rows = np.arange(n)
+        
+        if not self.training_complete:
+            n_training = n
+        else:
+            n_training = int(np.clip(self.training_needed - self.training_samples, 0, n))
+        
+        training = rows < n_training
+        evaluated = ~training & (total >= self.rules['min_volume_threshold'])
+        low_volume = ~training & ~evaluated
+        baselines = self._batch_baselines(counts, training | evaluated)
+        
+        anomaly_lists = [[] for _ in range(n)]
+        score = np.zeros(n, dtype=np.int64)
+        
+        safe_total = np.where(total > 0, total, 1)
+        threshold_rules = [
+            ('failed', 'high_failed_volume', 35, True),
+            ('denied', 'high_denied_volume', 25, False),
+            ('reversed', 'high_reversed_volume', 40, True)
+        ]
+        fired = {}
+        
+        for status, anomaly_type, points, p95_severity in threshold_rules:
+            values = counts[status]
+            ratio = np.where(total > 0, values / safe_total, 0.0)
+            threshold = baselines[status]['threshold']
+            ratio_threshold = self.rules[f'{status}_ratio_threshold']
+            mask = evaluated & (values >= threshold) & (ratio >= ratio_threshold)
+            fired[status] = mask
+            score += np.where(mask, points, 0)
+            
+            p95 = baselines[status]['p95']
+            label = status.capitalize()
+            for i in np.flatnonzero(mask):
+                severity = 'CRITICAL' if p95_severity and values[i] > p95[i] else 'WARNING'
+                anomaly_lists[i].append({
+                    'type': anomaly_type,
+                    'severity': severity,
+                    'message': f'{label}: {int(values[i])} (threshold: {int(threshold[i])}, rate: {float(ratio[i]):.1%})',
+                    'value': int(values[i]),
+                    'threshold': int(threshold[i]),
+                    'ratio': float(ratio[i]),
+                    'ratio_threshold': ratio_threshold
+                })
+        
+        if self.seasonal is not None:
+            seasonal_minutes = self._seasonal_minutes(timestamps)
+            seasonal_mean, seasonal_std, seasonal_ready = self.seasonal.expected_many(seasonal_minutes)
+            seasonal_ready = seasonal_ready & (seasonal_minutes >= 0)
+        
+        for status in ['failed', 'denied', 'reversed']:
+            if status not in self.status_stats:
+                continue
+            values = counts[status]
+            mean = baselines[status]['mean']
+            std = baselines[status]['std']
+            
+            if self.seasonal is not None and status in self.seasonal.status_index:
+                j = self.seasonal.status_index[status]
+                mean = np.where(seasonal_ready, seasonal_mean[:, j], mean)
+                std = np.where(seasonal_ready, seasonal_std[:, j], std)
+            
+            usable = (std > 2.0) & (mean > 5)
+            if not usable.any():
+                continue
+            
+            z_scores = np.divide(values - mean, std, out=np.zeros(n), where=usable)
+            candidates = evaluated & usable & (values > mean * 1.5)
+            critical = candidates & (z_scores > self.rules['critical_zscore'])
+            warning = candidates & ~critical & (z_scores > self.z_threshold)
+            score += np.where(critical, 50, 0) + np.where(warning, 30, 0)
+            
+            for i in np.flatnonzero(critical | warning):
+                value = int(values[i])
+                z_score = float(z_scores[i])
+                if critical[i]:
+                    anomaly_lists[i].append({
+                        'type': f'{status}_severe_spike',
+                        'severity': 'CRITICAL',
+                        'message': f'Critical {status} spike: {value} (z-score: {z_score:.2f})',
+                        'value': value,
+                        'z_score': z_score
+                    })
+                else:
+                    anomaly_lists[i].append({
+                        'type': f'{status}_spike',
+                        'severity': 'WARNING',
+                        'message': f'{status} spike: {value} (z-score: {z_score:.2f})',
+                        'value': value,
+                        'z_score': z_score
+                    })
+        
+        initial_totals = self.history['total'] if 'total' in self.history else ()
+        appends_total = evaluated | (training & ('total' in self.history))
+        last_appended = np.maximum.accumulate(np.where(appends_total, rows, -1))
+        prev_index = np.concatenate(([-1], last_appended[:-1])) if n else last_appended
+        has_prev = (prev_index >= 0) | (len(initial_totals) > 0)
+        initial_prev = initial_totals[-1] if len(initial_totals) > 0 else 0
+        prev_total = np.where(prev_index >= 0, total[np.maximum(prev_index, 0)], initial_prev)
+        
+        check_change = evaluated & has_prev & (prev_total > 0)
+        change_pct = np.divide(
+            total - prev_total, prev_total,
+            out=np.zeros(n, dtype=np.float64), where=check_change
+        )
+        spike = check_change & (change_pct > self.rules['sudden_spike_threshold'])
+        drop = check_change & ~spike & (change_pct < -self.rules['sudden_drop_threshold'])
+        score += np.where(spike, 45, 0) + np.where(drop, 30, 0)
+        
+        for i in np.flatnonzero(spike | drop):
+            previous = prev_total[i] if prev_index[i] >= 0 else initial_prev
+            if spike[i]:
+                anomaly_lists[i].append({
+                    'type': 'sudden_volume_spike',
+                    'severity': 'CRITICAL',
+                    'message': f'Sudden volume spike: {change_pct[i]:.1%} increase',
+                    'value': int(total[i]),
+                    'previous': previous,
+                    'change_pct': float(change_pct[i])
+                })
+            else:
+                anomaly_lists[i].append({
+                    'type': 'sudden_volume_drop',
+                    'severity': 'WARNING',
+                    'message': f'Sudden volume drop: {abs(change_pct[i]):.1%} decrease',
+                    'value': int(total[i]),
+                    'previous': previous,
+                    'change_pct': float(change_pct[i])
+                })
+        
+        eval_rows = np.flatnonzero(evaluated)
+        steps = np.arange(len(eval_rows))
+        consecutive_keys = list(self.consecutive_alerts)
+        if len(eval_rows):
+            consecutive_keys += [s for s in ['failed', 'denied', 'reversed'] if s not in self.consecutive_alerts]
+        
+        runs = {}
+        for key in consecutive_keys:
+            start = self.consecutive_alerts.get(key, 0)
+            if key in fired:
+                active = fired[key][eval_rows]
+                last_reset = np.maximum.accumulate(np.where(active, -1, steps)) if len(steps) else steps
+                run = np.where(active, np.where(last_reset < 0, steps + 1 + start, steps - last_reset), 0)
+            else:
+                run = np.full(len(eval_rows), start, dtype=np.int64)
+            runs[key] = run
+            
+            consecutive_threshold = 3
+            flagged = run >= consecutive_threshold
+            score[eval_rows[flagged]] += 50
+            for row, count in zip(eval_rows[flagged], run[flagged]):
+                anomaly_lists[row].append({
+                    'type': f'consecutive_{key}_alerts',
+                    'severity': 'CRITICAL',
+                    'message': f'Consecutive {key} alerts: {int(count)} in a row',
+                    'count': int(count),
+                    'threshold': consecutive_threshold
+                })
+        
+        score = np.minimum(score, 100)
+        recommendation = np.select(
+            [score >= 70, score >= 50, score >= 30],
+            ['IMMEDIATE_ACTION', 'INVESTIGATE', 'MONITOR'],
+            default='NORMAL'
+        ).astype(object)
+        recommendation[training] = 'TRAINING'
+        recommendation[low_volume] = 'LOW_VOLUME'
+        has_anomalies = np.array([len(a) > 0 for a in anomaly_lists], dtype=bool)
+        should_alert = evaluated & has_anomalies & (score >= 40)
+        
+        results = pd.DataFrame({
+            'timestamp': timestamps,
+            'approved': counts['approved'],
+            'failed': counts['failed'],
+            'denied': counts['denied'],
+            'reversed': counts['reversed'],
+            'total': total,
+            'anomaly_score': np.where(evaluated, score, 0),
+            'recommendation': recommendation,
+            'should_alert': should_alert,
+            'anomalies': anomaly_lists
+        })
+        
+        self.training_samples += n_training
+        for status in ['failed', 'denied', 'reversed', 'total']:
+            if status in self.history:
+                self.history[status].extend(counts[status][training | evaluated].tolist())
+            elif status == 'total' and len(eval_rows):
+                self.history[status].extend(total[evaluated].tolist())
+        
+        for key, run in runs.items():
+            if len(run):
+                self.consecutive_alerts[key] = int(run[-1])
+        
+        if should_alert.any():
+            for row in results[should_alert].to_dict(orient='records'):
+                self.alerts_history.append(self._batch_row_to_result(row))
+            if len(self.alerts_history) > 1000:
+                self.alerts_history = self.alerts_history[-1000:]
+        
+        return results
+    
+    def batch_results_to_records(self, results):
+        return [self._batch_row_to_result(row) for row in results.to_dict(orient='records')]
+    
+    def _batch_row_to_result(self, row):
+        return {
+            'timestamp': row['timestamp'],
+            'status_counts': {
+                status: int(row[status]) for status in ['approved', 'failed', 'denied', 'reversed', 'total']
+            },
+            'anomalies': row['anomalies'],
+            'anomaly_score': int(row['anomaly_score']),
+            'recommendation': row['recommendation'],
+            'should_alert': bool(row['should_alert'])
+        }
+    
+    def get_state(self):
+        return {
+            'status_stats': {status: dict(stats) for status, stats in self.status_stats.items()},
+            'rules': dict(self.rules),
+            'history': {status: list(values) for status, values in self.history.items()},
+            'training_complete': self.training_complete,
+            'training_samples': self.training_samples,
+            'consecutive_alerts': dict(self.consecutive_alerts),
+            'online_stats': {status: online.get_state() for status, online in self.online.items()}
+        }
+    
+    def load_state(self, state):
+        self.status_stats = {status: dict(stats) for status, stats in state['status_stats'].items()}
+        self.rules.update(state['rules'])
+        self.history.clear()
+        for status, values in state['history'].items():
+            self.history[status].extend(values)
+        self.training_complete = bool(state['training_complete'])
+        self.training_samples = int(state['training_samples'])
+        self.consecutive_alerts.clear()
+        self.consecutive_alerts.update(state['consecutive_alerts'])
+        
+        self.online = {}
+        if self.online_stats:
+            saved = state.get('online_stats') or {}
+            for status, stats in self.status_stats.items():
+                online = OnlineStatusStats(self.half_life_minutes)
+                if status in saved:
+                    online.load_state(saved[status])
+                elif len(self.history.get(status, ())) >= 5:
+                    online.seed(list(self.history[status]), stats['mean'], stats['std'])
+                else:
+                    continue
+                self.online[status] = online
+    
+    def early_warning(self, timestamp, status_counts):
+        anomalies = []
+        anomaly_score = 0
+        total = status_counts.get('total', 0)
+        
+        in_training = not self.training_complete or self.training_samples < self.training_needed
+        
+        if not in_training and total >= self.rules['min_volume_threshold']:
+            for status, score in (('failed', 35), ('denied', 25), ('reversed', 40)):
+                count = status_counts.get(status, 0)
+                ratio = count / total
+                threshold = self.rules[f'{status}_absolute_threshold']
+                ratio_threshold = self.rules[f'{status}_ratio_threshold']
+                
+                if count >= threshold and ratio >= ratio_threshold:
+                    anomalies.append({
+                        'type': f'early_high_{status}_volume',
+                        'severity': 'WARNING',
+                        'message': f'Early warning - {status.capitalize()}: {count} in open minute (threshold: {threshold}, rate: {ratio:.1%})',
+                        'value': count,
+                        'threshold': threshold,
+                        'ratio': ratio,
+                        'ratio_threshold': ratio_threshold
+                    })
+                    anomaly_score += score
+        
+        return {
+            'timestamp': timestamp,
+            'status_counts': dict(status_counts),
+            'anomalies': anomalies,
+            'anomaly_score': min(100, anomaly_score),
+            'recommendation': 'EARLY_WARNING' if anomalies else 'NORMAL',
+            'should_alert': len(anomalies) > 0
+        }
+    
     def get_stats(self):
         return {
             'mean': self.status_stats.get('total', {}).get('mean', 0),
@@ -270,6 +658,9 @@ class TransactionAnomalyDetector:
             'alerts_count': len(self.alerts_history),
             'training_complete': self.training_complete,
             'training_samples': self.training_samples,
+            'online_stats': bool(self.online),
+            'seasonal_baseline': self.seasonal.get_stats() if self.seasonal is not None else None,
+            'baseline_samples': self.online['total'].stats.count if 'total' in self.online else None,
             'thresholds': {
                 'failed': self.rules['failed_absolute_threshold'],
                 'denied': self.rules['denied_absolute_threshold'],
@@ -0,0 +1,226 @@
+import numpy as np
+import pandas as pd
+
+CODE_ALPHABET = '0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ'
+CODE_SLOTS = len(CODE_ALPHABET) ** 2
+NO_MINUTE = -1
+SIGNIFICANCE_Z = 3.719
+
+
+def normalize_auth_code(value):
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, (int, np.integer)):
+        return f'{int(value):02d}' if 0 <= value <= 99 else None
+    if not isinstance(value, str):
+        return None
+
+    code = value.strip().upper()
+    if len(code) == 1:
+        code = '0' + code
+    if len(code) != 2 or any(c not in CODE_ALPHABET for c in code):
+        return None
+    return code
+
+
+def code_index(code):
+    return CODE_ALPHABET.index(code[0]) * len(CODE_ALPHABET) + CODE_ALPHABET.index(code[1])
+
+
+def code_label(index):
+    return CODE_ALPHABET[index // len(CODE_ALPHABET)] + CODE_ALPHABET[index % len(CODE_ALPHABET)]
+
+
+def js_divergence(rows, baseline):
+    rows = np.atleast_2d(np.asarray(rows, dtype=np.float64))
+    totals = rows.sum(axis=1, keepdims=True)
+    q = np.divide(rows, totals, out=np.zeros_like(rows), where=totals > 0)
+    p = np.broadcast_to(baseline, q.shape)
+    m = 0.5 * (q + p)
+
+    q_terms = np.where(q > 0, q * np.log2(np.divide(q, m, out=np.ones_like(q), where=q > 0)), 0.0)
+    p_terms = np.where(p > 0, p * np.log2(np.divide(p, m, out=np.ones_like(q), where=p > 0)), 0.0)
+    return 0.5 * q_terms.sum(axis=1) + 0.5 * p_terms.sum(axis=1)
+
+
+def chi_square(rows, baseline):
+    rows = np.atleast_2d(np.asarray(rows, dtype=np.float64))
+    expected = rows.sum(axis=1, keepdims=True) * baseline
+    seen = baseline > 0
+    return (((rows[:, seen] - expected[:, seen]) ** 2) / expected[:, seen]).sum(axis=1)
+
+
+def chi_square_critical(dof, z=SIGNIFICANCE_Z):
+    dof = max(dof, 1)
+    return float(dof * (1 - 2 / (9 * dof) + z * np.sqrt(2 / (9 * dof))) ** 3)
+
+
+class AuthCodeDetector:
+    def __init__(self, approved_codes=('00',), min_volume=20, min_code_count=5,
+                 min_divergence=0.01, top_codes=3):
+        self.min_volume = min_volume
+        self.min_code_count = min_code_count
+        self.min_divergence = min_divergence
+        self.top_codes = top_codes
+        self.approved = np.zeros(CODE_SLOTS, dtype=bool)
+        for code in approved_codes:
+            self.approved[code_index(normalize_auth_code(code))] = True
+
+        self.baseline = None
+        self.threshold = None
+        self.dispersion = 1.0
+        self.baseline_minutes = 0
+        self.reset()
+
+    def reset(self):
+        self.open_minutes = {}
+        self.last_closed = NO_MINUTE
+        self.last_result = None
+        self.minutes_evaluated = 0
+        self.late_events = 0
+        self.alerts_raised = 0
+
+    def fit(self, df):
+        codes = df['auth_code'].map(normalize_auth_code)
+        valid = codes.notna().to_numpy()
+        if not valid.any():
+            return False
+
+        indexes = codes[valid].map(code_index).to_numpy(dtype=np.int64)
+        counts = df['count'].to_numpy(dtype=np.float64)[valid]
+        minutes, _ = pd.factorize(df['timestamp'][valid])
+
+        totals = np.bincount(indexes, weights=counts, minlength=CODE_SLOTS)
+        if totals.sum() <= 0:
+            return False
+        self.baseline = totals / totals.sum()
+
+        used = np.flatnonzero(totals)
+        matrix = np.zeros((minutes.max() + 1, len(used)), dtype=np.float64)
+        np.add.at(matrix, (minutes, np.searchsorted(used, indexes)), counts)
+        volume_ok = matrix.sum(axis=1) >= self.min_volume
+
+        dof = len(used) - 1
+        self.dispersion = 1.0
+        if volume_ok.any() and dof > 0:
+            historical = chi_square(matrix[volume_ok], self.baseline[used])
+            self.dispersion = max(1.0, float(np.median(historical)) / chi_square_critical(dof, z=0.0))
+        self.threshold = float(self.dispersion * chi_square_critical(dof))
+        self.baseline_minutes = int(volume_ok.sum())
+        return True
+
+    def ingest(self, pending):
+        for minute, code_counts in pending.items():
+            if minute <= self.last_closed:
+                self.late_events += sum(code_counts.values())
+                continue
+            vector = self.open_minutes.get(minute)
+            if vector is None:
+                vector = self.open_minutes[minute] = np.zeros(CODE_SLOTS, dtype=np.int64)
+            for index, count in code_counts.items():
+                vector[index] += count
+
+    def close_minutes(self, watermark_minute):
+        alerts = []
+        for minute in sorted(m for m in self.open_minutes if m < watermark_minute):
+            result = self._evaluate(minute, self.open_minutes.pop(minute))
+            self.last_closed = max(self.last_closed, minute)
+            if result is not None and result['should_alert']:
+                alerts.append(result)
+        return alerts
+
+    def _evaluate(self, minute, counts):
+        total = int(counts.sum())
+        if self.baseline is None or total < self.min_volume:
+            return None
+
+        divergence = float(js_divergence(counts, self.baseline)[0])
+        statistic = float(chi_square(counts, self.baseline)[0])
+        expected = total * self.baseline
+        excess = counts - expected
+        candidates = np.flatnonzero(~self.approved & (counts >= self.min_code_count) & (excess > 0))
+        drivers = candidates[np.argsort(-excess[candidates], kind='stable')][:self.top_codes]
+
+        unseen = bool(np.any(self.baseline[drivers] == 0))
+        significant = statistic >= self.threshold or unseen
+        should_alert = significant and divergence >= self.min_divergence and len(drivers) > 0
+        score = 100 if unseen else min(100, int(round(40 * statistic / self.threshold)))
+        self.minutes_evaluated += 1
+
+        codes = [
+            {
+                'code': code_label(i),
+                'count': int(counts[i]),
+                'expected': round(float(expected[i]), 2),
+                'share': float(counts[i] / total),
+                'baseline_share': float(self.baseline[i])
+            }
+            for i in drivers.tolist()
+        ]
+
+        anomalies = []
+        if should_alert:
+            self.alerts_raised += 1
+            anomalies.append({
+                'type': 'auth_code_distribution_shift',
+                'severity': 'CRITICAL' if score >= 70 else 'WARNING',
+                'message': f'Auth code mix diverged from baseline (chi-square: {statistic:.1f}, threshold: {self.threshold:.1f}, '
+                           f'JS: {divergence:.3f}), driven by {", ".join(c["code"] for c in codes)}',
+                'value': statistic,
+                'threshold': self.threshold,
+                'divergence': divergence,
+                'codes': codes
+            })
+            for c in codes:
+                baseline_note = f'{c["baseline_share"]:.1%} baseline' if c['baseline_share'] > 0 else 'not in baseline'
+                anomalies.append({
+                    'type': 'auth_code_spike',
+                    'severity': 'WARNING',
+                    'message': f'Auth code {c["code"]}: {c["count"]} of {total} ({c["share"]:.1%}, {baseline_note})',
+                    'code': c['code'],
+                    'value': c['count'],
+                    'expected': c['expected']
+                })
+
+        if not should_alert:
+            recommendation = 'NORMAL'
+        elif score >= 70:
+            recommendation = 'IMMEDIATE_ACTION'
+        elif score >= 50:
+            recommendation = 'INVESTIGATE'
+        else:
+            recommendation = 'MONITOR'
+
+        result = {
+            'minute': minute,
+            'status_counts': {'total': total},
+            'auth_codes': {code_label(i): int(counts[i]) for i in np.flatnonzero(counts).tolist()},
+            'chi_square': statistic,
+            'divergence': divergence,
+            'anomalies': anomalies,
+            'anomaly_score': score if should_alert else 0,
+            'recommendation': recommendation,
+            'should_alert': should_alert
+        }
+        self.last_result = result
+        return result
+
+    def get_baseline(self, limit=20):
+        if self.baseline is None:
+            return {}
+        top = np.flatnonzero(self.baseline)
+        top = top[np.argsort(-self.baseline[top], kind='stable')][:limit]
+        return {code_label(i): float(self.baseline[i]) for i in top.tolist()}
+
+    def get_stats(self):
+        return {
+            'code_slots': CODE_SLOTS,
+            'baseline_codes': int(np.count_nonzero(self.baseline)) if self.baseline is not None else 0,
+            'baseline_minutes': self.baseline_minutes,
+            'threshold': self.threshold,
+            'dispersion': self.dispersion,
+            'open_minutes': len(self.open_minutes),
+            'minutes_evaluated': self.minutes_evaluated,
+            'late_events': self.late_events,
+            'alerts_raised': self.alerts_raised
+        }
@@ -0,0 +1,68 @@
+import io
+import json
+import os
+
+import numpy as np
+
+SNAPSHOT_VERSION = 1
+
+
+def save_detector_snapshot(state, path, fingerprint):
+    meta = {
+        'version': SNAPSHOT_VERSION,
+        'fingerprint': fingerprint,
+        'status_stats': state['status_stats'],
+        'rules': state['rules'],
+        'training_complete': state['training_complete'],
+        'training_samples': state['training_samples'],
+        'consecutive_alerts': state['consecutive_alerts'],
+        'online_stats': state.get('online_stats', {}),
+        'history_keys': sorted(state['history'])
+    }
+
+    arrays = {'meta': np.frombuffer(json.dumps(meta).encode('utf-8'), dtype=np.uint8)}
+    for i, status in enumerate(meta['history_keys']):
+        arrays[f'history_{i}'] = np.asarray(state['history'][status])
+
+    buffer = io.BytesIO()
+    np.savez_compressed(buffer, **arrays)
+
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    tmp_path = f'{path}.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(buffer.getvalue())
+    os.replace(tmp_path, path)
+    return len(buffer.getvalue())
+
+
+def load_detector_snapshot(path, fingerprint=None):
+    if not os.path.exists(path):
+        return None
+
+    try:
+        with np.load(path, allow_pickle=False) as data:
+            meta = json.loads(data['meta'].tobytes().decode('utf-8'))
+            if meta.get('version') != SNAPSHOT_VERSION:
+                return None
+            if fingerprint is not None and meta.get('fingerprint') != fingerprint:
+                return None
+
+            history = {
+                status: data[f'history_{i}'].tolist()
+                for i, status in enumerate(meta['history_keys'])
+            }
+    except (OSError, ValueError, KeyError):
+        return None
+
+    return {
+        'status_stats': meta['status_stats'],
+        'rules': meta['rules'],
+        'history': history,
+        'training_complete': meta['training_complete'],
+        'training_samples': meta['training_samples'],
+        'consecutive_alerts': meta['consecutive_alerts'],
+        'online_stats': meta.get('online_stats', {})
+    }
@@ -0,0 +1,127 @@
+import json
+import queue
+import threading
+from collections import deque
+
+KEEPALIVE_FRAME = b': keepalive\n\n'
+
+
+def format_event(event_id, event, payload):
+    return f'id: {event_id}\nevent: {event}\ndata: {payload}\n\n'.encode('utf-8')
+
+
+class Subscription:
+    def __init__(self, max_queue):
+        self.queue = queue.Queue(maxsize=max_queue)
+        self.lagged = False
+
+    def clear(self):
+        while True:
+            try:
+                self.queue.get_nowait()
+            except queue.Empty:
+                return
+
+
+class EventBroadcaster:
+    def __init__(self, max_clients=100, max_queue=256, replay=512, keepalive=5.0, retry_ms=2000):
+        self.max_clients = max_clients
+        self.max_queue = max_queue
+        self.keepalive = keepalive
+        self.retry_ms = retry_ms
+        self._lock = threading.Lock()
+        self._subscribers = set()
+        self._replay = deque(maxlen=replay)
+        self.last_id = 0
+        self.events_published = 0
+        self.frames_dropped = 0
+        self.resyncs = 0
+        self.rejected_clients = 0
+
+    def publish(self, event, data):
+        payload = json.dumps(data, separators=(',', ':'), default=str)
+
+        with self._lock:
+            self.last_id += 1
+            event_id = self.last_id
+            frame = format_event(event_id, event, payload)
+            self._replay.append((event_id, frame))
+            self.events_published += 1
+            subscribers = list(self._subscribers)
+
+        for subscription in subscribers:
+            if subscription.lagged:
+                continue
+            try:
+                subscription.queue.put_nowait((event_id, frame))
+            except queue.Full:
+                subscription.lagged = True
+                self.frames_dropped += 1
+        return event_id
+
+    def subscribe(self, last_event_id=None):
+        with self._lock:
+            if len(self._subscribers) >= self.max_clients:
+                self.rejected_clients += 1
+                return None, False
+
+            subscription = Subscription(self.max_queue)
+            resumed = False
+            if last_event_id is not None and self._replay and self._replay[0][0] <= last_event_id + 1:
+                missed = [(event_id, frame) for event_id, frame in self._replay if event_id > last_event_id]
+                if len(missed) <= self.max_queue:
+                    for item in missed:
+                        subscription.queue.put_nowait(item)
+                    resumed = True
+
+            self._subscribers.add(subscription)
+        return subscription, resumed
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            self._subscribers.discard(subscription)
+
+    def stream(self, subscription, resumed, snapshot):
+        try:
+            yield f'retry: {self.retry_ms}\n\n'.encode('utf-8')
+            snapshot_id = 0
+            if not resumed:
+                snapshot_id, frame = self._snapshot_frame(snapshot)
+                yield frame
+
+            while True:
+                if subscription.lagged:
+                    subscription.clear()
+                    subscription.lagged = False
+                    self.resyncs += 1
+                    snapshot_id, frame = self._snapshot_frame(snapshot)
+                    yield frame
+                    continue
+
+                try:
+                    event_id, frame = subscription.queue.get(timeout=self.keepalive)
+                except queue.Empty:
+                    yield KEEPALIVE_FRAME
+                    continue
+                if event_id <= snapshot_id:
+                    continue
+                yield frame
+        finally:
+            self.unsubscribe(subscription)
+
+    def _snapshot_frame(self, snapshot):
+        with self._lock:
+            event_id = self.last_id
+            data = snapshot()
+        payload = json.dumps(data, separators=(',', ':'), default=str)
+        return event_id, format_event(event_id, 'snapshot', payload)
+
+    def get_stats(self):
+        return {
+            'clients': len(self._subscribers),
+            'last_event_id': self.last_id,
+            'events_published': self.events_published,
+            'frames_dropped': self.frames_dropped,
+            'resyncs': self.resyncs,
+            'rejected_clients': self.rejected_clients
+        }
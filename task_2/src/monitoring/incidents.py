@@ -0,0 +1,128 @@
+import itertools
+import threading
+
+STATUS_SIGNALS = ('failed', 'denied', 'reversed', 'approved')
+SEVERITY_BANDS = ((70, 2), (50, 1))
+
+
+def anomaly_signal(anomaly_type):
+    if anomaly_type.startswith('consecutive_'):
+        return None
+    for status in STATUS_SIGNALS:
+        if status in anomaly_type:
+            return status
+    if 'volume' in anomaly_type:
+        return 'volume'
+    if anomaly_type.startswith('auth_code'):
+        return 'auth_code'
+    return anomaly_type
+
+
+def alert_fingerprint(alert):
+    signals = {anomaly_signal(a.get('type', '')) for a in alert.get('anomalies', [])}
+    signals.discard(None)
+    entity = alert.get('entity')
+    return f"{entity if entity is not None else '*'}|{'+'.join(sorted(signals)) or 'unknown'}"
+
+
+def severity_band(score):
+    for threshold, band in SEVERITY_BANDS:
+        if score >= threshold:
+            return band
+    return 0
+
+
+class Incident:
+    def __init__(self, incident_id, fingerprint, minute, record):
+        self.incident_id = incident_id
+        self.fingerprint = fingerprint
+        self.first_minute = minute
+        self.last_minute = minute
+        self.occurrences = 1
+        self.peak_score = record.get('anomaly_score', 0)
+        self.record = record
+
+
+class IncidentTracker:
+    def __init__(self, quiet_minutes=5, format_minute=str):
+        self.quiet_minutes = quiet_minutes
+        self.format_minute = format_minute
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.open_incidents = {}
+            self.incidents_opened = 0
+            self.incidents_closed = 0
+            self.alerts_coalesced = 0
+            self.escalations = 0
+
+    def observe(self, minute, alert):
+        fingerprint = alert_fingerprint(alert)
+        score = alert.get('anomaly_score', 0)
+        closed = None
+
+        with self._lock:
+            incident = self.open_incidents.get(fingerprint)
+            if incident is not None and minute - incident.last_minute > self.quiet_minutes:
+                closed = self._close(incident)
+                incident = None
+
+            if incident is None:
+                incident = Incident(f'INC-{next(self._ids):06d}', fingerprint, minute, dict(alert))
+                self.open_incidents[fingerprint] = incident
+                self.incidents_opened += 1
+                self._annotate(incident, incident.record, 'opened')
+                return dict(incident.record), closed
+
+            incident.occurrences += 1
+            incident.last_minute = max(incident.last_minute, minute)
+            escalated = severity_band(score) > severity_band(incident.peak_score)
+            incident.peak_score = max(incident.peak_score, score)
+
+            if escalated:
+                self.escalations += 1
+                incident.record = dict(alert)
+                self._annotate(incident, incident.record, 'escalated')
+                return dict(incident.record), closed
+
+            self.alerts_coalesced += 1
+            self._annotate(incident, incident.record, incident.record['incident_status'])
+            return None, closed
+
+    def close_idle(self, watermark_minute):
+        closed = []
+        with self._lock:
+            for incident in list(self.open_incidents.values()):
+                if watermark_minute - incident.last_minute > self.quiet_minutes:
+                    closed.append(self._close(incident))
+        return closed
+
+    def _close(self, incident):
+        del self.open_incidents[incident.fingerprint]
+        self.incidents_closed += 1
+        self._annotate(incident, incident.record, 'closed')
+        return dict(incident.record)
+
+    def _annotate(self, incident, record, status):
+        record.update({
+            'incident_id': incident.incident_id,
+            'fingerprint': incident.fingerprint,
+            'incident_status': status,
+            'occurrences': incident.occurrences,
+            'peak_score': incident.peak_score,
+            'first_seen': self.format_minute(incident.first_minute),
+            'last_seen': self.format_minute(incident.last_minute)
+        })
+
+    def get_stats(self):
+        return {
+            'quiet_minutes': self.quiet_minutes,
+            'open_incidents': len(self.open_incidents),
+            'incidents_opened': self.incidents_opened,
+            'incidents_closed': self.incidents_closed,
+            'alerts_coalesced': self.alerts_coalesced,
+            'escalations': self.escalations
+        }
@@ -0,0 +1,296 @@
+import numpy as np
+
+STATUSES = ('approved', 'failed', 'denied', 'reversed')
+WATCHED = ('failed', 'denied', 'reversed')
+NO_MINUTE = -1
+
+ARRAY_FIELDS = {
+    'current_minute': (np.int32, (), NO_MINUTE),
+    'last_seen': (np.int32, (), NO_MINUTE),
+    'counts': (np.int32, (len(STATUSES),), 0),
+    'prev_total': (np.int32, (), 0),
+    'samples': (np.int32, (), 0),
+    'mean': (np.float32, (len(WATCHED),), 0),
+    'var': (np.float32, (len(WATCHED),), 0),
+    'consecutive': (np.int16, (len(WATCHED),), 0)
+}
+
+
+class KeyedMinuteDetector:
+    def __init__(self, max_keys=200000, initial_capacity=1024, idle_minutes=60,
+                 min_volume=10, ratio_thresholds=None, absolute_thresholds=None,
+                 z_threshold=3.0, min_samples=15, half_life_minutes=30):
+        self.max_keys = max_keys
+        self.idle_minutes = idle_minutes
+        self.min_volume = min_volume
+        self.ratio_thresholds = ratio_thresholds or {'failed': 0.20, 'denied': 0.15, 'reversed': 0.08}
+        self.absolute_thresholds = absolute_thresholds or {'failed': 5, 'denied': 5, 'reversed': 3}
+        self.z_threshold = z_threshold
+        self.min_samples = min_samples
+        self.alpha = 1.0 - 0.5 ** (1.0 / half_life_minutes)
+        self.status_index = {status: i for i, status in enumerate(STATUSES)}
+        self.watched_index = [self.status_index[s] for s in WATCHED]
+
+        self.initial_capacity = initial_capacity
+        self.reset()
+
+    def reset(self):
+        self.key_ids = {}
+        self.keys = []
+        self.free_ids = []
+        self.capacity = 0
+        self.late_events = 0
+        self.rejected_events = 0
+        self.evicted_keys = 0
+        self.minutes_evaluated = 0
+        self._allocate(self.initial_capacity)
+
+    def _allocate(self, capacity):
+        old = self.capacity
+        for name, (dtype, shape, fill) in ARRAY_FIELDS.items():
+            array = np.full((capacity,) + shape, fill, dtype=dtype)
+            if old:
+                array[:old] = getattr(self, name)
+            setattr(self, name, array)
+        self.keys.extend([None] * (capacity - old))
+        self.free_ids.extend(range(capacity - 1, old - 1, -1))
+        self.capacity = capacity
+
+    def __len__(self):
+        return len(self.key_ids)
+
+    def _key_id(self, key, minute):
+        key_id = self.key_ids.get(key)
+        if key_id is not None:
+            return key_id
+
+        if not self.free_ids:
+            if self.capacity < self.max_keys:
+                self._allocate(min(self.capacity * 2, self.max_keys))
+            else:
+                self.evict_idle(minute)
+                if not self.free_ids:
+                    return None
+
+        key_id = self.free_ids.pop()
+        self.key_ids[key] = key_id
+        self.keys[key_id] = key
+        self._reset_slot(key_id)
+        return key_id
+
+    def _reset_slot(self, key_id):
+        self.current_minute[key_id] = NO_MINUTE
+        self.last_seen[key_id] = NO_MINUTE
+        self.counts[key_id] = 0
+        self.prev_total[key_id] = 0
+        self.samples[key_id] = 0
+        self.mean[key_id] = 0
+        self.var[key_id] = 0
+        self.consecutive[key_id] = 0
+
+    def ingest(self, pending):
+        by_minute = {}
+        for (key, minute), status_counts in pending.items():
+            by_minute.setdefault(minute, []).append((key, status_counts))
+
+        results = []
+        for minute in sorted(by_minute):
+            entries = []
+            for key, status_counts in by_minute[minute]:
+                key_id = self._key_id(key, minute)
+                if key_id is None:
+                    self.rejected_events += sum(status_counts.values())
+                    continue
+                entries.append((key_id, status_counts))
+
+            ids = np.fromiter((key_id for key_id, _ in entries), dtype=np.int64, count=len(entries))
+            current = self.current_minute[ids]
+            results.extend(self._evaluate(ids[(current != NO_MINUTE) & (current < minute)]))
+
+            for key_id, status_counts in entries:
+                current_minute = self.current_minute[key_id]
+                if current_minute == NO_MINUTE:
+                    late = minute <= self.last_seen[key_id]
+                else:
+                    late = minute < current_minute
+                if late:
+                    self.late_events += sum(status_counts.values())
+                    continue
+                self.current_minute[key_id] = minute
+                self.last_seen[key_id] = minute
+                row = self.counts[key_id]
+                for status, count in status_counts.items():
+                    row[self.status_index[status]] += count
+
+        return results
+
+    def close_minutes(self, watermark_minute):
+        ids = np.flatnonzero((self.current_minute != NO_MINUTE) & (self.current_minute < watermark_minute))
+        return self._evaluate(ids)
+
+    def evict_idle(self, watermark_minute):
+        idle = np.flatnonzero(
+            (self.last_seen != NO_MINUTE)
+            & (self.last_seen < watermark_minute - self.idle_minutes)
+            & (self.current_minute == NO_MINUTE)
+        )
+        for key_id in idle.tolist():
+            del self.key_ids[self.keys[key_id]]
+            self.keys[key_id] = None
+            self._reset_slot(key_id)
+            self.free_ids.append(key_id)
+        self.evicted_keys += len(idle)
+        return len(idle)
+
+    def _evaluate(self, ids):
+        if len(ids) == 0:
+            return []
+
+        counts = self.counts[ids].astype(np.int64)
+        totals = counts.sum(axis=1)
+        watched = counts[:, self.watched_index]
+        eligible = totals >= self.min_volume
+        safe_totals = np.maximum(totals, 1)[:, None]
+
+        ratios = watched / safe_totals
+        absolute = np.array([self.absolute_thresholds[s] for s in WATCHED])
+        ratio_limits = np.array([self.ratio_thresholds[s] for s in WATCHED])
+        threshold_fired = eligible[:, None] & (watched >= absolute) & (ratios >= ratio_limits)
+
+        mean = self.mean[ids].astype(np.float64)
+        std = np.sqrt(self.var[ids].astype(np.float64))
+        warmed = (self.samples[ids] >= self.min_samples)[:, None]
+        z_scores = np.divide(watched - mean, std, out=np.zeros_like(mean), where=std > 0)
+        z_fired = eligible[:, None] & warmed & (std > 0) & (watched > mean * 1.5) & (z_scores > self.z_threshold)
+
+        consecutive = np.where(threshold_fired, self.consecutive[ids] + 1, 0)
+
+        prev = self.prev_total[ids]
+        check_change = eligible & (self.samples[ids] > 0) & (prev > 0)
+        change = np.divide(totals - prev, prev, out=np.zeros(len(ids)), where=check_change)
+        spike = check_change & (change > 2.5)
+        drop = check_change & (change < -0.5)
+
+        score = (
+            threshold_fired @ np.array([35, 25, 40])
+            + z_fired.any(axis=1) * 30
+            + spike * 45 + drop * 30
+            + (consecutive >= 3).any(axis=1) * 50
+        )
+        score = np.minimum(score, 100)
+        should_alert = eligible & (score >= 40)
+
+        delta = watched - mean
+        new_mean = mean + self.alpha * delta
+        new_var = (1 - self.alpha) * (self.var[ids] + self.alpha * delta ** 2)
+        first = self.samples[ids] == 0
+        new_mean[first] = watched[first]
+        new_var[first] = 0
+
+        self.mean[ids] = new_mean
+        self.var[ids] = new_var
+        self.consecutive[ids] = np.minimum(consecutive, np.iinfo(np.int16).max)
+        self.prev_total[ids] = totals
+        self.samples[ids] += 1
+        self.counts[ids] = 0
+        closed_minutes = self.current_minute[ids].copy()
+        self.current_minute[ids] = NO_MINUTE
+        self.minutes_evaluated += len(ids)
+
+        alerts = []
+        for i in np.flatnonzero(should_alert).tolist():
+            alerts.append(self._build_alert(
+                ids[i], int(closed_minutes[i]), counts[i], int(totals[i]), int(score[i]),
+                threshold_fired[i], z_fired[i], z_scores[i], consecutive[i],
+                bool(spike[i]), bool(drop[i]), float(change[i])
+            ))
+        return alerts
+
+    def _build_alert(self, key_id, minute, counts, total, score, threshold_fired, z_fired,
+                     z_scores, consecutive, spike, drop, change):
+        key = self.keys[key_id]
+        anomalies = []
+        for j, status in enumerate(WATCHED):
+            value = int(counts[self.watched_index[j]])
+            if threshold_fired[j]:
+                anomalies.append({
+                    'type': f'entity_high_{status}_volume',
+                    'severity': 'CRITICAL' if consecutive[j] >= 3 else 'WARNING',
+                    'message': f'{key}: {status} {value} of {total} ({value / total:.1%})',
+                    'value': value,
+                    'ratio': value / total,
+                    'consecutive': int(consecutive[j])
+                })
+            if z_fired[j]:
+                anomalies.append({
+                    'type': f'entity_{status}_spike',
+                    'severity': 'WARNING',
+                    'message': f'{key}: {status} spike {value} (z-score: {z_scores[j]:.2f})',
+                    'value': value,
+                    'z_score': float(z_scores[j])
+                })
+        if spike or drop:
+            anomalies.append({
+                'type': 'entity_sudden_volume_spike' if spike else 'entity_sudden_volume_drop',
+                'severity': 'CRITICAL' if spike else 'WARNING',
+                'message': f'{key}: volume change {change:.1%}',
+                'value': total,
+                'change_pct': change
+            })
+
+        if score >= 70:
+            recommendation = 'IMMEDIATE_ACTION'
+        elif score >= 50:
+            recommendation = 'INVESTIGATE'
+        else:
+            recommendation = 'MONITOR'
+
+        status_counts = {status: int(counts[i]) for i, status in enumerate(STATUSES)}
+        status_counts['total'] = total
+
+        return {
+            'entity': key,
+            'minute': minute,
+            'status_counts': status_counts,
+            'anomalies': anomalies,
+            'anomaly_score': score,
+            'recommendation': recommendation,
+            'should_alert': True
+        }
+
+    def get_entity(self, key):
+        key_id = self.key_ids.get(key)
+        if key_id is None:
+            return None
+        return {
+            'entity': key,
+            'current_minute': int(self.current_minute[key_id]) if self.current_minute[key_id] != NO_MINUTE else None,
+            'last_seen_minute': int(self.last_seen[key_id]),
+            'current_counts': {status: int(self.counts[key_id, i]) for i, status in enumerate(STATUSES)},
+            'minutes_evaluated': int(self.samples[key_id]),
+            'baseline': {
+                status: {
+                    'mean': float(self.mean[key_id, j]),
+                    'std': float(np.sqrt(self.var[key_id, j]))
+                }
+                for j, status in enumerate(WATCHED)
+            },
+            'consecutive_alerts': {status: int(self.consecutive[key_id, j]) for j, status in enumerate(WATCHED)}
+        }
+
+    def memory_bytes(self):
+        return sum(getattr(self, name).nbytes for name in ARRAY_FIELDS)
+
+    def get_stats(self):
+        array_bytes = self.memory_bytes()
+        return {
+            'active_keys': len(self.key_ids),
+            'capacity': self.capacity,
+            'max_keys': self.max_keys,
+            'array_bytes': array_bytes,
+            'array_bytes_per_key': round(array_bytes / self.capacity, 1) if self.capacity else 0,
+            'minutes_evaluated': self.minutes_evaluated,
+            'late_events': self.late_events,
+            'rejected_events': self.rejected_events,
+            'evicted_keys': self.evicted_keys
+        }
@@ -0,0 +1,113 @@
+import numpy as np
+
+STATUSES = ('approved', 'failed', 'denied', 'reversed')
+
+
+class MinuteRingBuffer:
+    def __init__(self, capacity=120, statuses=STATUSES, clock=None, max_ahead_seconds=0.0):
+        self.capacity = capacity
+        self.clock = clock
+        self.max_ahead_seconds = max_ahead_seconds
+        self.statuses = tuple(statuses)
+        self.status_index = {status: i for i, status in enumerate(self.statuses)}
+        self.counts = np.zeros((capacity, len(self.statuses)), dtype=np.int64)
+        self.minutes = np.full(capacity, -1, dtype=np.int64)
+        self.status_totals = np.zeros(len(self.statuses), dtype=np.int64)
+        self.latest_minute = None
+        self.occupied = 0
+
+    def __len__(self):
+        return self.occupied
+
+    def __contains__(self, minute):
+        return self.minutes[minute % self.capacity] == minute
+
+    def clear(self):
+        self.counts[:] = 0
+        self.minutes[:] = -1
+        self.status_totals[:] = 0
+        self.latest_minute = None
+        self.occupied = 0
+
+    @property
+    def total(self):
+        return int(self.status_totals.sum())
+
+    @property
+    def oldest_minute(self):
+        if self.latest_minute is None:
+            return None
+        return self.latest_minute - self.capacity + 1
+
+    def horizon_minute(self):
+        if self.clock is None:
+            return None
+        return int((self.clock() + self.max_ahead_seconds) // 60)
+
+    def increment(self, minute, status, count=1):
+        return self.add(minute, {status: count})
+
+    def add(self, minute, status_counts):
+        if self.latest_minute is None or minute > self.latest_minute:
+            horizon = self.horizon_minute()
+            if horizon is not None and minute > horizon:
+                return False
+            self._advance(minute)
+        elif minute <= self.latest_minute - self.capacity:
+            return False
+
+        slot = minute % self.capacity
+        if self.minutes[slot] != minute:
+            self.minutes[slot] = minute
+            self.occupied += 1
+
+        row = self.counts[slot]
+        for status, count in status_counts.items():
+            i = self.status_index[status]
+            row[i] += count
+            self.status_totals[i] += count
+
+        return True
+
+    def get(self, minute):
+        if minute not in self:
+            return None
+        return self._row_to_dict(self.counts[minute % self.capacity])
+
+    def current(self):
+        if self.latest_minute is None or self.latest_minute not in self:
+            return None, None
+        return self.latest_minute, self.get(self.latest_minute)
+
+    def totals(self):
+        return self._row_to_dict(self.status_totals)
+
+    def items(self):
+        if self.latest_minute is None:
+            return []
+        result = []
+        for minute in range(self.oldest_minute, self.latest_minute + 1):
+            if minute in self:
+                result.append((minute, self.get(minute)))
+        return result
+
+    def _advance(self, minute):
+        if self.latest_minute is None or minute - self.latest_minute >= self.capacity:
+            self.clear()
+        else:
+            for expired in range(self.latest_minute + 1, minute + 1):
+                self._evict(expired % self.capacity)
+        self.latest_minute = minute
+
+    def _evict(self, slot):
+        if self.minutes[slot] < 0:
+            return
+        self.status_totals -= self.counts[slot]
+        self.counts[slot] = 0
+        self.minutes[slot] = -1
+        self.occupied -= 1
+
+    def _row_to_dict(self, row):
+        data = {status: int(row[i]) for i, status in enumerate(self.statuses)}
+        data['total'] = int(row.sum())
+        return data
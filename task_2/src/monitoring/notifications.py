@@ -1,79 +1,369 @@
 import requests
 import smtplib
 import json
+import heapq
+import itertools
+import queue
+import threading
+import time
 from email.mime.text import MIMEText
 from datetime import datetime
+from requests.adapters import HTTPAdapter
 import os
 
+class SMTPConnectionPool:
+    def __init__(self, server, port, sender=None, password=None, starttls=True, size=2,
+                 idle_check_seconds=30.0, timeout=10.0):
+        self.server = server
+        self.port = port
+        self.sender = sender
+        self.password = password
+        self.starttls = starttls
+        self.idle_check_seconds = idle_check_seconds
+        self.timeout = timeout
+        self._idle = queue.LifoQueue(maxsize=size)
+        self.connections_opened = 0
+    
+    def _connect(self):
+        connection = smtplib.SMTP(self.server, self.port, timeout=self.timeout)
+        if self.starttls:
+            connection.starttls()
+        if self.sender and self.password:
+            connection.login(self.sender, self.password)
+        self.connections_opened += 1
+        return connection
+    
+    def acquire(self):
+        while True:
+            try:
+                connection, released_at = self._idle.get_nowait()
+            except queue.Empty:
+                return self._connect()
+            
+            if time.monotonic() - released_at < self.idle_check_seconds:
+                return connection
+            try:
+                if connection.noop()[0] == 250:
+                    return connection
+            except OSError:
+                pass
+            self.discard(connection)
+    
+    def release(self, connection):
+        try:
+            self._idle.put_nowait((connection, time.monotonic()))
+        except queue.Full:
+            self.discard(connection)
+    
+    def discard(self, connection):
+        try:
+            connection.quit()
+        except Exception:
+            try:
+                connection.close()
+            except Exception:
+                pass
+    
+    def send(self, msg):
+        connection = self.acquire()
+        try:
+            connection.send_message(msg)
+        except (smtplib.SMTPServerDisconnected, ConnectionError):
+            self.discard(connection)
+            connection = self._connect()
+            try:
+                connection.send_message(msg)
+            except Exception:
+                self.discard(connection)
+                raise
+        except Exception:
+            self.discard(connection)
+            raise
+        self.release(connection)
+    
+    def close(self):
+        while True:
+            try:
+                connection, _ = self._idle.get_nowait()
+            except queue.Empty:
+                return
+            self.discard(connection)
+
 class NotificationManager:
-    def __init__(self):
+    def __init__(self, http_pool_size=4, smtp_pool_size=2, timeout=5.0):
         self.slack_webhook = os.getenv('SLACK_WEBHOOK')
         self.email_config = {
             'smtp_server': os.getenv('SMTP_SERVER', 'smtp.gmail.com'),
             'smtp_port': int(os.getenv('SMTP_PORT', 587)),
+            'starttls': os.getenv('SMTP_STARTTLS', '1') == '1',
             'sender': os.getenv('ALERT_EMAIL'),
             'password': os.getenv('EMAIL_PASSWORD'),
-            'recipients': os.getenv('ALERT_RECIPIENTS', '').split(',')
+            'recipients': [r for r in os.getenv('ALERT_RECIPIENTS', '').split(',') if r]
+        }
+        self.timeout = timeout
+        
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=http_pool_size)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        
+        self.smtp_pool = SMTPConnectionPool(
+            self.email_config['smtp_server'],
+            self.email_config['smtp_port'],
+            sender=self.email_config['sender'],
+            password=self.email_config['password'],
+            starttls=self.email_config['starttls'],
+            size=smtp_pool_size,
+            timeout=timeout
+        )
+    
+    def channels(self):
+        channels = []
+        if self.slack_webhook:
+            channels.append('slack')
+        if self.email_config['sender'] and self.email_config['recipients']:
+            channels.append('email')
+        return channels
+    
+    def send(self, channel, alerts):
+        if channel == 'slack':
+            self.send_slack(alerts)
+        elif channel == 'email':
+            self.send_email(alerts)
+        else:
+            raise ValueError(f'Unknown notification channel: {channel}')
+    
+    def send_slack(self, alerts):
+        response = self.session.post(self.slack_webhook, json=self.format_slack(alerts), timeout=self.timeout)
+        response.raise_for_status()
+    
+    def send_email(self, alerts):
+        self.smtp_pool.send(self.format_email(alerts))
+    
+    def format_slack(self, alerts):
+        if len(alerts) == 1:
+            return {"attachments": [self._slack_attachment(alerts[0])]}
+        
+        top_score = max(a.get('anomaly_score', 0) for a in alerts)
+        return {
+            "text": f"🚨 {len(alerts)} transaction anomalies between {alerts[0].get('timestamp', '')[-8:]} "
+                    f"and {alerts[-1].get('timestamp', '')[-8:]} (max score {top_score})",
+            "attachments": [self._slack_attachment(alert) for alert in alerts]
         }
     
+    def _slack_attachment(self, alert):
+        status_counts = alert.get('status_counts', {})
+        title = "🚨 Transaction Anomaly Detected"
+        if alert.get('entity') is not None:
+            title += f" ({alert['entity']})"
+        
+        return {
+            "color": "danger" if alert['anomaly_score'] >= 70 else "warning",
+            "title": title,
+            "fields": [
+                {"title": "Score", "value": alert['anomaly_score'], "short": True},
+                {"title": "Time", "value": alert['timestamp'][-8:], "short": True},
+                {"title": "Status Counts", "value":
+                 f"✅ {status_counts.get('approved',0)} "
+                 f"❌ {status_counts.get('failed',0)} "
+                 f"⛔ {status_counts.get('denied',0)} "
+                 f"↩️ {status_counts.get('reversed',0)}",
+                 "short": False},
+                {"title": "Anomalies", "value":
+                 "\n".join([a['message'] for a in alert['anomalies'][:3]]),
+                 "short": False}
+            ]
+        }
+    
+    def format_email(self, alerts):
+        sections = []
+        for alert in alerts:
+            status_counts = alert.get('status_counts', {})
+            sections.append(f"""
+            Anomaly Score: {alert['anomaly_score']}
+            Time: {alert['timestamp']}
+            
+            Status Counts:
+            - Approved: {status_counts.get('approved', 0)}
+            - Failed: {status_counts.get('failed', 0)}
+            - Denied: {status_counts.get('denied', 0)}
+            - Reversed: {status_counts.get('reversed', 0)}
+            
+            Anomalies:
+            {chr(10).join(['- ' + a['message'] for a in alert['anomalies'][:5]])}
+            
+            Recommendation: {alert.get('recommendation', 'NORMAL')}
+            """)
+        
+        msg = MIMEText(("\n" + "-" * 40 + "\n").join(sections))
+        
+        top_score = max(a['anomaly_score'] for a in alerts)
+        if len(alerts) == 1:
+            msg['Subject'] = f"[ALERT] Transaction Anomaly - Score: {top_score}"
+        else:
+            msg['Subject'] = f"[ALERT] {len(alerts)} Transaction Anomalies - Max Score: {top_score}"
+        msg['From'] = self.email_config['sender']
+        msg['To'] = ', '.join(self.email_config['recipients'])
+        return msg
+    
     def send_slack_alert(self, alert):
         if not self.slack_webhook:
             return
         
-        message = {
-            "attachments": [{
-                "color": "danger" if alert['anomaly_score'] >= 70 else "warning",
-                "title": f"🚨 Transaction Anomaly Detected",
-                "fields": [
-                    {"title": "Score", "value": alert['anomaly_score'], "short": True},
-                    {"title": "Time", "value": alert['timestamp'][-8:], "short": True},
-                    {"title": "Status Counts", "value": 
-                     f"✅ {alert['status_counts'].get('approved',0)} "
-                     f"❌ {alert['status_counts'].get('failed',0)} "
-                     f"⛔ {alert['status_counts'].get('denied',0)} "
-                     f"↩️ {alert['status_counts'].get('reversed',0)}", 
-                     "short": False},
-                    {"title": "Anomalies", "value": 
-                     "\n".join([a['message'] for a in alert['anomalies'][:3]]), 
-                     "short": False}
-                ]
-            }]
-        }
-        
         try:
-            requests.post(self.slack_webhook, json=message, timeout=2)
+            self.send_slack([alert])
         except:
             pass
     
     def send_email_alert(self, alert):
-        if not all([self.email_config['sender'], self.email_config['password']]):
+        if 'email' not in self.channels():
             return
         
         try:
-            msg = MIMEText(f"""
-            Anomaly Score: {alert['anomaly_score']}
-            Time: {alert['timestamp']}
+            self.send_email([alert])
+        except:
+            pass
+    
+    def close(self):
+        self.session.close()
+        self.smtp_pool.close()
+
+class NotificationChannel:
+    def __init__(self, name, workers, max_queue, max_retries):
+        self.name = name
+        self.workers = workers
+        self.alerts = queue.Queue(maxsize=max_queue)
+        self.batches = queue.Queue()
+        self.retries = []
+        self.max_retries = max_retries
+        self.lock = threading.Lock()
+        self.sent_messages = 0
+        self.sent_alerts = 0
+        self.dropped_alerts = 0
+        self.retried = 0
+        self.failed_batches = 0
+
+class NotificationDispatcher:
+    def __init__(self, manager, channels=None, workers=None, digest_window=10.0, digest_max=20,
+                 max_queue=1000, max_retries=3, max_retry_batches=100, retry_backoff=2.0, min_score=0):
+        self.manager = manager
+        self.digest_window = digest_window
+        self.digest_max = digest_max
+        self.max_retry_batches = max_retry_batches
+        self.retry_backoff = retry_backoff
+        self.min_score = min_score
+        workers = workers or {}
+        self.channels = {
+            name: NotificationChannel(name, workers.get(name, 1), max_queue, max_retries)
+            for name in (channels if channels is not None else manager.channels())
+        }
+        self._sequence = itertools.count()
+        self._stop = threading.Event()
+        self._threads = []
+    
+    def start(self):
+        if self._threads:
+            return
+        self._stop.clear()
+        for channel in self.channels.values():
+            self._spawn(self._batch_loop, channel, f'notify-{channel.name}-batcher')
+            for i in range(channel.workers):
+                self._spawn(self._send_loop, channel, f'notify-{channel.name}-{i}')
+    
+    def _spawn(self, target, channel, name):
+        thread = threading.Thread(target=target, args=(channel,), name=name, daemon=True)
+        thread.start()
+        self._threads.append(thread)
+    
+    def stop(self, timeout=5.0):
+        self._stop.set()
+        deadline = time.monotonic() + timeout
+        for thread in self._threads:
+            thread.join(max(0.0, deadline - time.monotonic()))
+        self._threads = []
+        self.manager.close()
+    
+    def submit(self, alert):
+        if alert.get('anomaly_score', 0) < self.min_score:
+            return False
+        
+        accepted = False
+        for channel in self.channels.values():
+            try:
+                channel.alerts.put_nowait(alert)
+                accepted = True
+            except queue.Full:
+                channel.dropped_alerts += 1
+        return accepted
+    
+    def _batch_loop(self, channel):
+        while not self._stop.is_set():
+            self._schedule_retries(channel)
             
-            Status Counts:
-            - Approved: {alert['status_counts'].get('approved', 0)}
-            - Failed: {alert['status_counts'].get('failed', 0)}
-            - Denied: {alert['status_counts'].get('denied', 0)}
-            - Reversed: {alert['status_counts'].get('reversed', 0)}
+            try:
+                first = channel.alerts.get(timeout=min(self.digest_window, 0.5))
+            except queue.Empty:
+                continue
             
-            Anomalies:
-            {chr(10).join(['- ' + a['message'] for a in alert['anomalies'][:5]])}
+            batch = [first]
+            deadline = time.monotonic() + self.digest_window
+            while len(batch) < self.digest_max:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or self._stop.is_set():
+                    break
+                try:
+                    batch.append(channel.alerts.get(timeout=remaining))
+                except queue.Empty:
+                    break
             
-            Recommendation: {alert['recommendation']}
-            """)
+            channel.batches.put((batch, 0))
+        
+        for _ in range(channel.workers):
+            channel.batches.put(None)
+    
+    def _schedule_retries(self, channel):
+        now = time.monotonic()
+        with channel.lock:
+            while channel.retries and channel.retries[0][0] <= now:
+                _, _, batch, attempt = heapq.heappop(channel.retries)
+                channel.batches.put((batch, attempt))
+    
+    def _send_loop(self, channel):
+        while True:
+            item = channel.batches.get()
+            if item is None:
+                return
+            batch, attempt = item
             
-            msg['Subject'] = f"[ALERT] Transaction Anomaly - Score: {alert['anomaly_score']}"
-            msg['From'] = self.email_config['sender']
-            msg['To'] = ', '.join(self.email_config['recipients'])
+            try:
+                self.manager.send(channel.name, batch)
+                channel.sent_messages += 1
+                channel.sent_alerts += len(batch)
+            except Exception:
+                self._retry(channel, batch, attempt + 1)
+    
+    def _retry(self, channel, batch, attempt):
+        with channel.lock:
+            if attempt > channel.max_retries or len(channel.retries) >= self.max_retry_batches:
+                channel.failed_batches += 1
+                channel.dropped_alerts += len(batch)
+                return
             
-            server = smtplib.SMTP(self.email_config['smtp_server'], self.email_config['smtp_port'])
-            server.starttls()
-            server.login(self.email_config['sender'], self.email_config['password'])
-            server.send_message(msg)
-            server.quit()
-        except:
-            pass
\ No newline at end of file
+            channel.retried += 1
+            due = time.monotonic() + self.retry_backoff * 2 ** (attempt - 1)
+            heapq.heappush(channel.retries, (due, next(self._sequence), batch, attempt))
+    
+    def get_stats(self):
+        return {
+            name: {
+                'queued_alerts': channel.alerts.qsize(),
+                'pending_batches': channel.batches.qsize(),
+                'retry_batches': len(channel.retries),
+                'sent_messages': channel.sent_messages,
+                'sent_alerts': channel.sent_alerts,
+                'retried': channel.retried,
+                'failed_batches': channel.failed_batches,
+                'dropped_alerts': channel.dropped_alerts
+            }
+            for name, channel in self.channels.items()
+        }
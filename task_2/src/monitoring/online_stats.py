@@ -0,0 +1,186 @@
+import math
+
+import numpy as np
+
+
+class RunningStats:
+    def __init__(self, half_life=None):
+        self.half_life = half_life
+        self.alpha = 1.0 - 0.5 ** (1.0 / half_life) if half_life else None
+        self.count = 0
+        self.mean = 0.0
+        self.var = 0.0
+
+    def seed(self, mean, var, count):
+        self.mean = float(mean)
+        self.var = float(var)
+        self.count = int(count)
+
+    def update(self, value):
+        value = float(value)
+        self.count += 1
+
+        if self.count == 1:
+            self.mean = value
+            self.var = 0.0
+            return
+
+        delta = value - self.mean
+        if self.alpha is None:
+            self.mean += delta / self.count
+            self.var += (delta * (value - self.mean) - self.var) / self.count
+        else:
+            self.mean += self.alpha * delta
+            self.var = (1.0 - self.alpha) * (self.var + self.alpha * delta * delta)
+
+    @property
+    def std(self):
+        return math.sqrt(self.var) if self.var > 0 else 0.0
+
+    def get_state(self):
+        return {'count': self.count, 'mean': self.mean, 'var': self.var}
+
+    def load_state(self, state):
+        self.seed(state['mean'], state['var'], state['count'])
+
+
+class P2Quantile:
+    def __init__(self, p):
+        self.p = p
+        self.increments = [0.0, p / 2, p, (1 + p) / 2, 1.0]
+        self.count = 0
+        self.heights = []
+        self.positions = [1, 2, 3, 4, 5]
+        self.desired = [1.0, 1 + 2 * p, 1 + 4 * p, 3 + 2 * p, 5.0]
+
+    def seed(self, values):
+        values = np.asarray(values, dtype=np.float64)
+        n = len(values)
+        if n < 5:
+            self.count = 0
+            self.heights = []
+            for value in values:
+                self.update(value)
+            return
+
+        self.heights = np.percentile(values, [q * 100 for q in self.increments]).tolist()
+        self.desired = [1 + (n - 1) * q for q in self.increments]
+        positions = [int(round(d)) for d in self.desired]
+        for i in range(1, 5):
+            positions[i] = max(positions[i], positions[i - 1] + 1)
+        for i in range(3, -1, -1):
+            positions[i] = min(positions[i], positions[i + 1] - 1)
+        self.positions = positions
+        self.count = n
+
+    def update(self, value):
+        value = float(value)
+        self.count += 1
+
+        if self.count <= 5:
+            self.heights.append(value)
+            self.heights.sort()
+            return
+
+        q = self.heights
+        n = self.positions
+
+        if value < q[0]:
+            q[0] = value
+            k = 0
+        elif value >= q[4]:
+            q[4] = value
+            k = 3
+        else:
+            k = 0
+            while value >= q[k + 1]:
+                k += 1
+
+        for i in range(k + 1, 5):
+            n[i] += 1
+        for i in range(5):
+            self.desired[i] += self.increments[i]
+
+        for i in range(1, 4):
+            d = self.desired[i] - n[i]
+            if (d >= 1 and n[i + 1] - n[i] > 1) or (d <= -1 and n[i - 1] - n[i] < -1):
+                d = 1 if d > 0 else -1
+                height = self._parabolic(i, d)
+                if not q[i - 1] < height < q[i + 1]:
+                    height = q[i] + d * (q[i + d] - q[i]) / (n[i + d] - n[i])
+                q[i] = height
+                n[i] += d
+
+    def _parabolic(self, i, d):
+        q = self.heights
+        n = self.positions
+        return q[i] + d / (n[i + 1] - n[i - 1]) * (
+            (n[i] - n[i - 1] + d) * (q[i + 1] - q[i]) / (n[i + 1] - n[i])
+            + (n[i + 1] - n[i] - d) * (q[i] - q[i - 1]) / (n[i] - n[i - 1])
+        )
+
+    @property
+    def value(self):
+        if self.count >= 5:
+            return self.heights[2]
+        if not self.heights:
+            return 0.0
+        return float(np.percentile(self.heights, self.p * 100))
+
+    def get_state(self):
+        return {
+            'count': self.count,
+            'heights': list(self.heights),
+            'positions': list(self.positions),
+            'desired': list(self.desired)
+        }
+
+    def load_state(self, state):
+        self.count = int(state['count'])
+        self.heights = [float(h) for h in state['heights']]
+        self.positions = [int(n) for n in state['positions']]
+        self.desired = [float(d) for d in state['desired']]
+
+
+class OnlineStatusStats:
+    def __init__(self, half_life=None, nonzero_only=False, min_std=2.0):
+        self.nonzero_only = nonzero_only
+        self.min_std = min_std
+        self.stats = RunningStats(half_life)
+        self.p95 = P2Quantile(0.95)
+        self.p99 = P2Quantile(0.99)
+
+    def seed(self, values, mean, std):
+        self.stats.seed(mean, std ** 2, len(values))
+        self.p95.seed(values)
+        self.p99.seed(values)
+
+    def update(self, value):
+        if self.nonzero_only and value <= 0:
+            return False
+        self.stats.update(value)
+        self.p95.update(value)
+        self.p99.update(value)
+        return True
+
+    def to_dict(self):
+        return {
+            'mean': self.stats.mean,
+            'std': max(self.stats.std, self.min_std),
+            'p95': self.p95.value,
+            'p99': self.p99.value
+        }
+
+    def get_state(self):
+        return {
+            'nonzero_only': self.nonzero_only,
+            'stats': self.stats.get_state(),
+            'p95': self.p95.get_state(),
+            'p99': self.p99.get_state()
+        }
+
+    def load_state(self, state):
+        self.nonzero_only = bool(state['nonzero_only'])
+        self.stats.load_state(state['stats'])
+        self.p95.load_state(state['p95'])
+        self.p99.load_state(state['p99'])
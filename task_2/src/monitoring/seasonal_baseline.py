@@ -0,0 +1,178 @@
+import io
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+STATUSES = ('failed', 'denied', 'reversed', 'approved', 'total')
+MINUTES_PER_DAY = 1440
+EPOCH_WEEKDAY = 3
+BASELINE_VERSION = 1
+
+
+class SeasonalBaseline:
+    def __init__(self, slot_minutes=60, by_weekday=False, min_samples=30, min_std=2.0, statuses=STATUSES):
+        if MINUTES_PER_DAY % slot_minutes:
+            raise ValueError('slot_minutes must divide a day evenly')
+
+        self.slot_minutes = slot_minutes
+        self.by_weekday = by_weekday
+        self.min_samples = min_samples
+        self.min_std = min_std
+        self.statuses = tuple(statuses)
+        self.status_index = {status: i for i, status in enumerate(self.statuses)}
+        self.slots_per_day = MINUTES_PER_DAY // slot_minutes
+        self.slots = self.slots_per_day * (7 if by_weekday else 1)
+
+        self.counts = np.zeros(self.slots, dtype=np.int64)
+        self.sums = np.zeros((self.slots, len(self.statuses)), dtype=np.float64)
+        self.sumsq = np.zeros((self.slots, len(self.statuses)), dtype=np.float64)
+        self.pending = {}
+        self.pending_day = None
+        self.days_folded = 0
+        self._refresh()
+
+    def slot_of(self, minutes):
+        slot = (minutes % MINUTES_PER_DAY) // self.slot_minutes
+        if self.by_weekday:
+            slot = slot + ((minutes // MINUTES_PER_DAY + EPOCH_WEEKDAY) % 7) * self.slots_per_day
+        return slot
+
+    def fit(self, df):
+        timestamps = pd.to_datetime(df['timestamp']).to_numpy(dtype='datetime64[m]')
+        minutes = timestamps.astype(np.int64)
+        values = self._value_matrix(df, len(df))
+
+        self.counts = np.zeros(self.slots, dtype=np.int64)
+        self.sums = np.zeros((self.slots, len(self.statuses)), dtype=np.float64)
+        self.sumsq = np.zeros((self.slots, len(self.statuses)), dtype=np.float64)
+        self.pending = {}
+        self.pending_day = int(minutes.max() // MINUTES_PER_DAY) if len(minutes) else None
+        self.days_folded = 0
+        self._accumulate(minutes, values)
+        self._refresh()
+        return self
+
+    def _value_matrix(self, df, n):
+        return np.column_stack([
+            df[status].to_numpy(dtype=np.float64) if status in df.columns else np.zeros(n)
+            for status in self.statuses
+        ])
+
+    def _accumulate(self, minutes, values):
+        slots = self.slot_of(minutes)
+        self.counts += np.bincount(slots, minlength=self.slots)
+        for j in range(len(self.statuses)):
+            self.sums[:, j] += np.bincount(slots, weights=values[:, j], minlength=self.slots)
+            self.sumsq[:, j] += np.bincount(slots, weights=values[:, j] ** 2, minlength=self.slots)
+
+    def _refresh(self):
+        counts = np.maximum(self.counts, 1)[:, None]
+        self.mean = self.sums / counts
+        variance = np.maximum(self.sumsq / counts - self.mean ** 2, 0.0)
+        self.std = np.maximum(np.sqrt(variance), self.min_std)
+        self.ready = self.counts >= self.min_samples
+
+    def observe(self, minute, status_counts):
+        day = minute // MINUTES_PER_DAY
+        if self.pending_day is not None and day < self.pending_day:
+            return False
+        if self.pending_day is not None and day > self.pending_day:
+            self.fold()
+        self.pending_day = day
+        self.pending[minute] = [float(status_counts.get(status, 0)) for status in self.statuses]
+        return True
+
+    def fold(self):
+        if self.pending:
+            minutes = np.fromiter(self.pending, dtype=np.int64, count=len(self.pending))
+            values = np.array(list(self.pending.values()), dtype=np.float64)
+            self._accumulate(minutes, values)
+            self._refresh()
+            self.days_folded += 1
+        self.pending = {}
+
+    def expected(self, minute):
+        slot = self.slot_of(minute)
+        if not self.ready[slot]:
+            return None
+        mean = self.mean[slot]
+        std = self.std[slot]
+        return {status: (float(mean[i]), float(std[i])) for i, status in enumerate(self.statuses)}
+
+    def expected_many(self, minutes):
+        slots = self.slot_of(np.asarray(minutes, dtype=np.int64))
+        return self.mean[slots], self.std[slots], self.ready[slots]
+
+    def get_stats(self):
+        return {
+            'slot_minutes': self.slot_minutes,
+            'by_weekday': self.by_weekday,
+            'slots': self.slots,
+            'ready_slots': int(self.ready.sum()),
+            'samples': int(self.counts.sum()),
+            'pending_minutes': len(self.pending),
+            'days_folded': self.days_folded
+        }
+
+    def save(self, path, fingerprint):
+        meta = {
+            'version': BASELINE_VERSION,
+            'fingerprint': fingerprint,
+            'slot_minutes': self.slot_minutes,
+            'by_weekday': self.by_weekday,
+            'statuses': list(self.statuses),
+            'pending_day': self.pending_day,
+            'days_folded': self.days_folded
+        }
+        pending_minutes = np.fromiter(self.pending, dtype=np.int64, count=len(self.pending))
+        pending_values = np.array(list(self.pending.values()), dtype=np.float64).reshape(-1, len(self.statuses))
+
+        buffer = io.BytesIO()
+        np.savez_compressed(
+            buffer,
+            meta=np.frombuffer(json.dumps(meta).encode('utf-8'), dtype=np.uint8),
+            counts=self.counts,
+            sums=self.sums,
+            sumsq=self.sumsq,
+            pending_minutes=pending_minutes,
+            pending_values=pending_values
+        )
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        tmp_path = f'{path}.tmp'
+        with open(tmp_path, 'wb') as f:
+            f.write(buffer.getvalue())
+        os.replace(tmp_path, path)
+        return len(buffer.getvalue())
+
+    def load(self, path, fingerprint=None):
+        if not os.path.exists(path):
+            return False
+
+        try:
+            with np.load(path, allow_pickle=False) as data:
+                meta = json.loads(data['meta'].tobytes().decode('utf-8'))
+                if meta.get('version') != BASELINE_VERSION:
+                    return False
+                if fingerprint is not None and meta.get('fingerprint') != fingerprint:
+                    return False
+                if (meta['slot_minutes'] != self.slot_minutes or meta['by_weekday'] != self.by_weekday
+                        or tuple(meta['statuses']) != self.statuses):
+                    return False
+
+                self.counts = data['counts']
+                self.sums = data['sums']
+                self.sumsq = data['sumsq']
+                self.pending = dict(zip(data['pending_minutes'].tolist(), data['pending_values'].tolist()))
+        except (OSError, ValueError, KeyError):
+            return False
+
+        self.pending_day = meta['pending_day']
+        self.days_folded = meta['days_folded']
+        self._refresh()
+        return True
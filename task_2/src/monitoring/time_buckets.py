@@ -0,0 +1,104 @@
+import threading
+from datetime import datetime, timedelta
+
+import pandas as pd
+
+EPOCH = datetime(1970, 1, 1)
+MINUTE_NS = 60 * 1_000_000_000
+MINUTE_KEY_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+
+def wall_clock_seconds():
+    return (datetime.now() - EPOCH).total_seconds()
+
+
+class MinuteBucketer:
+    def __init__(self, memo_size=4096):
+        self.memo_size = memo_size
+        self._memo = {}
+        self._lock = threading.Lock()
+        self.fast_hits = 0
+        self.fast_misses = 0
+        self.fallbacks = 0
+
+    def epoch_minute(self, timestamp):
+        if isinstance(timestamp, str) and len(timestamp) == 19 and self._is_fast_format(timestamp):
+            prefix = timestamp[:16]
+            minute = self._memo.get(prefix)
+            if minute is not None:
+                self.fast_hits += 1
+                return minute
+
+            minute = self._parse_prefix(prefix)
+            if minute is not None:
+                self.fast_misses += 1
+                self._remember(prefix, minute)
+                return minute
+
+        return self._fallback(timestamp)
+
+    def minute_key(self, timestamp):
+        return self.format_minute(self.epoch_minute(timestamp))
+
+    @staticmethod
+    def format_minute(epoch_minute):
+        return (EPOCH + timedelta(minutes=int(epoch_minute))).strftime(MINUTE_KEY_FORMAT)
+
+    @staticmethod
+    def to_datetime(epoch_minute):
+        return EPOCH + timedelta(minutes=int(epoch_minute))
+
+    def get_stats(self):
+        return {
+            'memo_size': len(self._memo),
+            'memo_limit': self.memo_size,
+            'fast_hits': self.fast_hits,
+            'fast_misses': self.fast_misses,
+            'fallbacks': self.fallbacks
+        }
+
+    @staticmethod
+    def _is_fast_format(timestamp):
+        return (
+            timestamp[4] == '-' and timestamp[7] == '-'
+            and timestamp[10] in (' ', 'T')
+            and timestamp[13] == ':' and timestamp[16] == ':'
+            and timestamp[17:19].isdigit() and timestamp[17:19] < '60'
+        )
+
+    @staticmethod
+    def _parse_prefix(prefix):
+        parts = (prefix[0:4], prefix[5:7], prefix[8:10], prefix[11:13], prefix[14:16])
+        if not all(part.isdigit() for part in parts):
+            return None
+
+        try:
+            dt = datetime(*(int(part) for part in parts))
+        except ValueError:
+            return None
+
+        return (dt - EPOCH) // timedelta(minutes=1)
+
+    def _remember(self, prefix, minute):
+        with self._lock:
+            if len(self._memo) >= self.memo_size:
+                self._memo.pop(next(iter(self._memo)))
+            self._memo[prefix] = minute
+
+    def _fallback(self, timestamp):
+        self.fallbacks += 1
+        try:
+            dt = pd.Timestamp(timestamp)
+        except (ValueError, TypeError) as e:
+            raise ValueError(f'Unrecognised timestamp: {timestamp!r}') from e
+
+        if dt is pd.NaT:
+            raise ValueError(f'Unrecognised timestamp: {timestamp!r}')
+
+        if dt.tzinfo is not None:
+            dt = dt.tz_localize(None)
+
+        return int(dt.floor('1min').value // MINUTE_NS)
+
+
+minute_bucketer = MinuteBucketer()
@@ -0,0 +1,286 @@
+import bisect
+import glob
+import gzip
+import json
+import os
+import re
+import threading
+import time
+from collections import deque
+from datetime import datetime
+
+SEGMENT_PATTERN = re.compile(r'^(?P<prefix>.+)_(?P<date>\d{4}-\d{2}-\d{2})(?:_(?P<seq>\d{3}))?\.json(?P<gz>\.gz)?$')
+
+
+def segment_name(prefix, date_str, seq):
+    return f'{prefix}_{date_str}_{seq:03d}.json'
+
+
+def read_index(path):
+    entries = []
+    if not os.path.exists(path):
+        return entries
+    with open(path) as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) >= 2:
+                entries.append([float(parts[0])] + [int(p) for p in parts[1:]])
+    return entries
+
+
+class AlertLogWriter:
+    def __init__(self, directory='outputs/alerts', prefix='alerts', max_bytes=64 * 1024 * 1024,
+                 flush_interval=1.0, flush_size=256, index_every=64, compress=True,
+                 max_pending=100000):
+        self.directory = directory
+        self.prefix = prefix
+        self.max_bytes = max_bytes
+        self.flush_interval = flush_interval
+        self.flush_size = flush_size
+        self.index_every = index_every
+        self.compress = compress
+        self.max_pending = max_pending
+        self._pending = deque()
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+        self._file = None
+        self._index_file = None
+        self._date = None
+        self._seq = 0
+        self._entries_in_block = 0
+        self.entries_written = 0
+        self.entries_dropped = 0
+        self.bytes_written = 0
+        self.flushes = 0
+        self.rotations = 0
+        self.write_errors = 0
+
+    def write(self, entry):
+        if len(self._pending) >= self.max_pending:
+            self.entries_dropped += 1
+            return False
+        self._pending.append((entry.setdefault('logged_at', time.time()), entry))
+        if self._thread is None:
+            self.start()
+        if len(self._pending) >= self.flush_size:
+            self._wake.set()
+        return True
+
+    def start(self):
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name='alert-log-writer', daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout=5.0):
+        self._stop.set()
+        self._wake.set()
+        thread = self._thread
+        if thread is not None:
+            thread.join(timeout)
+        self._thread = None
+
+    def flush(self, timeout=5.0):
+        if self._thread is None:
+            self._flush()
+            return
+        deadline = time.monotonic() + timeout
+        self._wake.set()
+        while self._pending and time.monotonic() < deadline:
+            time.sleep(0.005)
+
+    def get_stats(self):
+        return {
+            'pending_entries': len(self._pending),
+            'entries_written': self.entries_written,
+            'entries_dropped': self.entries_dropped,
+            'bytes_written': self.bytes_written,
+            'flushes': self.flushes,
+            'rotations': self.rotations,
+            'write_errors': self.write_errors,
+            'active_segment': self._segment_path() if self._file is not None else None
+        }
+
+    def _run(self):
+        try:
+            while not self._stop.is_set():
+                self._wake.wait(self.flush_interval)
+                self._wake.clear()
+                self._flush()
+            self._flush()
+        finally:
+            self._close_segment(compress=False)
+
+    def _flush(self):
+        if not self._pending:
+            return
+
+        try:
+            while self._pending:
+                logged_at, entry = self._pending[0]
+                self._ensure_segment(logged_at)
+                line = (json.dumps(entry, default=str) + '\n').encode('utf-8')
+
+                if self._entries_in_block == 0:
+                    self._index_file.write(f'{logged_at:.6f} {self._file.tell()}\n')
+                self._file.write(line)
+                self._pending.popleft()
+
+                self._entries_in_block = (self._entries_in_block + 1) % self.index_every
+                self.entries_written += 1
+                self.bytes_written += len(line)
+
+            self._file.flush()
+            self._index_file.flush()
+            self.flushes += 1
+        except (TypeError, ValueError):
+            self.write_errors += 1
+            self.entries_dropped += 1
+            self._pending.popleft()
+        except OSError:
+            self.write_errors += 1
+            self._close_segment(compress=False)
+
+    def _segment_path(self, date_str=None, seq=None):
+        return os.path.join(
+            self.directory,
+            segment_name(self.prefix, date_str or self._date, self._seq if seq is None else seq)
+        )
+
+    def _ensure_segment(self, logged_at):
+        date_str = datetime.fromtimestamp(logged_at).strftime('%Y-%m-%d')
+
+        if self._file is not None:
+            if date_str == self._date and self._file.tell() < self.max_bytes:
+                return
+            self._close_segment(compress=self.compress)
+            self.rotations += 1
+            if date_str == self._date:
+                self._seq += 1
+            else:
+                self._seq = 0
+        else:
+            self._seq = self._resume_seq(date_str)
+
+        self._date = date_str
+        os.makedirs(self.directory, exist_ok=True)
+        path = self._segment_path()
+        self._file = open(path, 'ab')
+        self._index_file = open(f'{path}.idx', 'a')
+        self._entries_in_block = 0
+
+    def _resume_seq(self, date_str):
+        segments = list_segments(self.directory, self.prefix)
+        today = [(seq, compressed) for date, seq, _, compressed in segments if date == date_str]
+        resume = max(today) if today else None
+
+        if self.compress:
+            for date, seq, path, compressed in segments:
+                if not compressed and (date, seq) != (date_str, resume[0] if resume else None):
+                    try:
+                        compress_segment(path)
+                    except OSError:
+                        self.write_errors += 1
+
+        if resume is None:
+            return 0
+        seq, compressed = resume
+        return seq + 1 if compressed else seq
+
+    def _close_segment(self, compress):
+        if self._file is None:
+            return
+        path = self._segment_path()
+        self._file.close()
+        self._index_file.close()
+        self._file = None
+        self._index_file = None
+        if compress:
+            try:
+                compress_segment(path)
+            except OSError:
+                self.write_errors += 1
+
+
+def compress_segment(path):
+    index = read_index(f'{path}.idx')
+    offsets = [entry[1] for entry in index] or [0]
+    gz_path = f'{path}.gz'
+    gz_index = []
+
+    with open(path, 'rb') as src, open(f'{gz_path}.tmp', 'wb') as dst:
+        size = os.fstat(src.fileno()).st_size
+        bounds = offsets[1:] + [size]
+        for i, (start, end) in enumerate(zip(offsets, bounds)):
+            src.seek(start)
+            block = src.read(end - start)
+            if index:
+                gz_index.append(f'{index[i][0]:.6f} {start} {dst.tell()}\n')
+            dst.write(gzip.compress(block))
+
+    os.replace(f'{gz_path}.tmp', gz_path)
+    with open(f'{gz_path}.idx.tmp', 'w') as f:
+        f.writelines(gz_index)
+    os.replace(f'{gz_path}.idx.tmp', f'{gz_path}.idx')
+    if os.path.exists(f'{path}.idx'):
+        os.remove(f'{path}.idx')
+    os.remove(path)
+    return gz_path
+
+
+def list_segments(directory, prefix='alerts'):
+    segments = []
+    for path in glob.glob(os.path.join(directory, f'{prefix}_*.json*')):
+        match = SEGMENT_PATTERN.match(os.path.basename(path))
+        if match and match.group('prefix') == prefix:
+            segments.append((match.group('date'), int(match.group('seq') or 0), path, bool(match.group('gz'))))
+    return sorted(segments)
+
+
+def read_alert_log(directory='outputs/alerts', start=None, end=None, prefix='alerts'):
+    start_date = datetime.fromtimestamp(start).strftime('%Y-%m-%d') if start is not None else None
+    end_date = datetime.fromtimestamp(end).strftime('%Y-%m-%d') if end is not None else None
+
+    for date_str, _, path, compressed in list_segments(directory, prefix):
+        if start_date is not None and date_str < start_date:
+            continue
+        if end_date is not None and date_str > end_date:
+            break
+
+        index = read_index(f'{path}.idx')
+        timestamps = [entry[0] for entry in index]
+        block = max(bisect.bisect_right(timestamps, start) - 1, 0) if start is not None and index else 0
+        if index and end is not None and timestamps[block] > end:
+            continue
+
+        if compressed:
+            with open(path, 'rb') as raw:
+                raw.seek(index[block][2] if index else 0)
+                with gzip.GzipFile(fileobj=raw) as f:
+                    done = yield from _scan_lines(f, start, end)
+        else:
+            with open(path, 'rb') as f:
+                f.seek(index[block][1] if index else 0)
+                done = yield from _scan_lines(f, start, end)
+
+        if done:
+            return
+
+
+def _scan_lines(f, start, end):
+    for line in f:
+        if not line.endswith(b'\n'):
+            break
+        entry = json.loads(line)
+        logged_at = entry.get('logged_at')
+        if logged_at is not None:
+            if start is not None and logged_at < start:
+                continue
+            if end is not None and logged_at > end:
+                return True
+        yield entry
+    return False
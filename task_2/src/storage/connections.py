@@ -0,0 +1,208 @@
+import os
+import queue
+import sqlite3
+import threading
+from contextlib import contextmanager
+from urllib.parse import quote
+
+MMAP_SIZE = 256 * 1024 * 1024
+CACHE_SIZE_KIB = 64 * 1024
+BUSY_TIMEOUT_MS = 5000
+READ_POOL_SIZE = 8
+WRITE_POOL_SIZE = 2
+CHECKOUT_TIMEOUT = 30.0
+
+
+class ConnectionManager:
+    def __init__(self, db_path, mmap_size=MMAP_SIZE, cache_size_kib=CACHE_SIZE_KIB,
+                 busy_timeout_ms=BUSY_TIMEOUT_MS, read_pool_size=READ_POOL_SIZE,
+                 write_pool_size=WRITE_POOL_SIZE, checkout_timeout=CHECKOUT_TIMEOUT):
+        self.db_path = os.path.abspath(db_path)
+        self.mmap_size = mmap_size
+        self.cache_size_kib = cache_size_kib
+        self.busy_timeout_ms = busy_timeout_ms
+        self.pool_sizes = {True: read_pool_size, False: write_pool_size}
+        self.checkout_timeout = checkout_timeout
+        self._idle = {True: queue.LifoQueue(), False: queue.LifoQueue()}
+        self._slots = {readonly: threading.BoundedSemaphore(size) for readonly, size in self.pool_sizes.items()}
+        self._generation = 0
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._schema = None
+        self._schema_key = None
+        self._schema_version = None
+        self.connections_opened = 0
+        self.checkouts = 0
+        self.reuses = 0
+        self.schema_loads = 0
+
+    def exists(self):
+        return os.path.exists(self.db_path)
+
+    def _file_key(self):
+        key = []
+        for path in (self.db_path, self.db_path + '-wal'):
+            try:
+                stat = os.stat(path)
+                key.append((stat.st_ino, stat.st_size, stat.st_mtime_ns))
+            except FileNotFoundError:
+                key.append(None)
+        return tuple(key)
+
+    def _open(self, readonly):
+        if readonly:
+            conn = sqlite3.connect(f'file:{quote(self.db_path)}?mode=ro', uri=True, check_same_thread=False)
+        else:
+            os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
+            conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+
+        conn.execute(f"PRAGMA busy_timeout={int(self.busy_timeout_ms)}")
+        conn.execute(f"PRAGMA cache_size=-{int(self.cache_size_kib)}")
+        conn.execute(f"PRAGMA mmap_size={int(self.mmap_size)}")
+        conn.execute("PRAGMA temp_store=MEMORY")
+        if readonly:
+            conn.execute("PRAGMA query_only=ON")
+
+        with self._lock:
+            self.connections_opened += 1
+        return conn
+
+    def _inode(self):
+        try:
+            return os.stat(self.db_path).st_ino
+        except FileNotFoundError:
+            return None
+
+    def _checkout(self, readonly):
+        if not self._slots[readonly].acquire(timeout=self.checkout_timeout):
+            raise sqlite3.OperationalError(
+                f"no {'read-only' if readonly else 'read-write'} connection free after {self.checkout_timeout}s"
+            )
+
+        try:
+            inode = self._inode()
+            while True:
+                try:
+                    entry = self._idle[readonly].get_nowait()
+                except queue.Empty:
+                    generation = self._generation
+                    conn = self._open(readonly)
+                    entry = (conn, self._inode(), generation)
+                    break
+                if entry[1] == inode and entry[2] == self._generation:
+                    with self._lock:
+                        self.reuses += 1
+                    break
+                entry[0].close()
+        except BaseException:
+            self._slots[readonly].release()
+            raise
+
+        with self._lock:
+            self.checkouts += 1
+        return entry
+
+    def _checkin(self, readonly, entry):
+        conn, inode, generation = entry
+        try:
+            if conn.in_transaction:
+                conn.rollback()
+            if generation == self._generation and inode == self._inode():
+                self._idle[readonly].put(entry)
+            else:
+                conn.close()
+        except sqlite3.Error:
+            conn.close()
+        finally:
+            self._slots[readonly].release()
+
+    @contextmanager
+    def connection(self, readonly=False):
+        held = getattr(self._local, 'held', None)
+        if held is None:
+            held = self._local.held = {}
+        if readonly in held:
+            yield held[readonly][0]
+            return
+
+        entry = self._checkout(readonly)
+        held[readonly] = entry
+        try:
+            yield entry[0]
+        finally:
+            del held[readonly]
+            self._checkin(readonly, entry)
+
+    def close(self):
+        with self._lock:
+            self._generation += 1
+        for idle in self._idle.values():
+            while True:
+                try:
+                    conn, _, _ = idle.get_nowait()
+                except queue.Empty:
+                    break
+                conn.close()
+
+    def schema(self):
+        if not self.exists():
+            return {}
+
+        key = self._file_key()
+        with self._lock:
+            if self._schema is not None and key == self._schema_key:
+                return self._schema
+
+        with self.connection(readonly=True) as conn:
+            version = conn.execute("PRAGMA schema_version").fetchone()[0]
+
+            with self._lock:
+                if self._schema is not None and version == self._schema_version:
+                    self._schema_key = key
+                    return self._schema
+
+            tables = [row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type='table'")]
+            schema = {
+                table: tuple(row[1] for row in conn.execute(f'PRAGMA table_info("{table}")'))
+                for table in tables
+            }
+
+        with self._lock:
+            self._schema = schema
+            self._schema_key = key
+            self._schema_version = version
+            self.schema_loads += 1
+        return schema
+
+    def invalidate(self):
+        with self._lock:
+            self._schema = None
+            self._schema_key = None
+            self._schema_version = None
+
+    def has_tables(self, *tables):
+        schema = self.schema()
+        return all(table in schema for table in tables)
+
+    def columns(self, table):
+        return self.schema().get(table, ())
+
+    def get_stats(self):
+        return {
+            'path': self.db_path,
+            'connections_opened': self.connections_opened,
+            'checkouts': self.checkouts,
+            'reuses': self.reuses,
+            'idle': {
+                'readonly': self._idle[True].qsize(),
+                'readwrite': self._idle[False].qsize()
+            },
+            'pool_size': {
+                'readonly': self.pool_sizes[True],
+                'readwrite': self.pool_sizes[False]
+            },
+            'schema_loads': self.schema_loads,
+            'tables': len(self._schema or {})
+        }
@@ -0,0 +1,169 @@
+import sqlite3
+import threading
+import time
+from collections import deque
+
+from storage.connections import ConnectionManager
+from storage.minute_table import LIVE_TABLE, apply_rollups, ensure_rollups, fetch_minutes
+
+STATUSES = ('approved', 'failed', 'denied', 'reversed')
+
+LIVE_MINUTES_SCHEMA = """
+    CREATE TABLE IF NOT EXISTS live_minutes (
+        minute INTEGER PRIMARY KEY,
+        timestamp TEXT NOT NULL,
+        approved INTEGER NOT NULL DEFAULT 0,
+        failed INTEGER NOT NULL DEFAULT 0,
+        denied INTEGER NOT NULL DEFAULT 0,
+        reversed INTEGER NOT NULL DEFAULT 0,
+        total INTEGER NOT NULL DEFAULT 0,
+        updated_at REAL NOT NULL
+    )
+"""
+
+LIVE_EVENTS_SCHEMA = """
+    CREATE TABLE IF NOT EXISTS live_events (
+        minute INTEGER NOT NULL,
+        timestamp TEXT NOT NULL,
+        status TEXT NOT NULL
+    )
+"""
+
+UPSERT_MINUTE = """
+    INSERT INTO live_minutes (minute, timestamp, approved, failed, denied, reversed, total, updated_at)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT(minute) DO UPDATE SET
+        approved = excluded.approved,
+        failed = excluded.failed,
+        denied = excluded.denied,
+        reversed = excluded.reversed,
+        total = excluded.total,
+        updated_at = excluded.updated_at
+"""
+
+
+class LiveTransactionWriter:
+    def __init__(self, db_path, raw_events=False, flush_interval=1.0, flush_size=5000,
+                 max_pending_events=500000, connections=None):
+        self.db_path = db_path
+        self.connections = connections or ConnectionManager(db_path)
+        self.raw_events = raw_events
+        self.flush_interval = flush_interval
+        self.flush_size = flush_size
+        self.max_pending_events = max_pending_events
+        self._minutes = {}
+        self._minutes_lock = threading.Lock()
+        self._events = deque()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+        self.minutes_written = 0
+        self.events_written = 0
+        self.events_dropped = 0
+        self.flushes = 0
+        self.write_errors = 0
+        self.last_flush_seconds = 0.0
+
+    def record_minute(self, minute, timestamp, status_counts):
+        row = (
+            minute,
+            timestamp,
+            *(int(status_counts.get(status, 0)) for status in STATUSES),
+            int(status_counts.get('total', 0))
+        )
+        with self._minutes_lock:
+            self._minutes[minute] = row
+            if len(self._minutes) >= self.flush_size:
+                self._wake.set()
+
+    def record_events(self, events):
+        if not self.raw_events:
+            return
+        if len(self._events) + len(events) > self.max_pending_events:
+            self.events_dropped += len(events)
+            return
+        self._events.extend(events)
+        if len(self._events) >= self.flush_size:
+            self._wake.set()
+
+    def start(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name='live-writer', daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout=5.0):
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+        self._thread = None
+
+    def get_stats(self):
+        return {
+            'pending_minutes': len(self._minutes),
+            'pending_events': len(self._events),
+            'minutes_written': self.minutes_written,
+            'events_written': self.events_written,
+            'events_dropped': self.events_dropped,
+            'flushes': self.flushes,
+            'write_errors': self.write_errors,
+            'last_flush_ms': round(self.last_flush_seconds * 1000, 2)
+        }
+
+    def _prepare(self, conn):
+        conn.execute(LIVE_MINUTES_SCHEMA)
+        conn.execute(LIVE_EVENTS_SCHEMA)
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_live_events_minute ON live_events (minute)")
+        conn.commit()
+        ensure_rollups(conn)
+
+    def _run(self):
+        with self.connections.connection() as conn:
+            self._prepare(conn)
+            while not self._stop.is_set():
+                self._wake.wait(self.flush_interval)
+                self._wake.clear()
+                self._flush(conn)
+            self._flush(conn)
+
+    def _flush(self, conn):
+        with self._minutes_lock:
+            minutes, self._minutes = self._minutes, {}
+
+        events = []
+        while self._events and len(events) < self.max_pending_events:
+            events.append(self._events.popleft())
+
+        if not minutes and not events:
+            return
+
+        started = time.perf_counter()
+        now = time.time()
+        try:
+            with conn:
+                if minutes:
+                    previous = fetch_minutes(conn, LIVE_TABLE, minutes)
+                    conn.executemany(UPSERT_MINUTE, [row + (now,) for row in minutes.values()])
+                    apply_rollups(conn, [
+                        (minute, row[2:], previous.get(minute))
+                        for minute, row in minutes.items() if row[2:] != previous.get(minute)
+                    ])
+                if events:
+                    conn.executemany(
+                        "INSERT INTO live_events (minute, timestamp, status) VALUES (?, ?, ?)",
+                        events
+                    )
+        except sqlite3.Error:
+            self.write_errors += 1
+            with self._minutes_lock:
+                for minute, row in minutes.items():
+                    self._minutes.setdefault(minute, row)
+            self._events.extendleft(reversed(events))
+            return
+
+        self.minutes_written += len(minutes)
+        self.events_written += len(events)
+        self.flushes += 1
+        self.last_flush_seconds = time.perf_counter() - started
@@ -0,0 +1,252 @@
+import sqlite3
+from collections import defaultdict
+from contextlib import contextmanager
+
+from storage.time_columns import ensure_time_columns
+
+MINUTE_TABLE = 'transaction_minutes'
+LIVE_TABLE = 'live_minutes'
+COUNT_COLUMNS = ('approved', 'failed', 'denied', 'reversed', 'total')
+ROLLUPS = (
+    ('transaction_days', 'day', 1440),
+    ('transaction_hours', 'hour', 60)
+)
+MINUTE_TABLES = (MINUTE_TABLE,) + tuple(table for table, _, _ in ROLLUPS)
+
+MINUTE_TABLE_SCHEMA = f"""
+    CREATE TABLE IF NOT EXISTS {MINUTE_TABLE} (
+        minute INTEGER PRIMARY KEY,
+        timestamp TEXT NOT NULL,
+        approved INTEGER NOT NULL DEFAULT 0,
+        failed INTEGER NOT NULL DEFAULT 0,
+        denied INTEGER NOT NULL DEFAULT 0,
+        reversed INTEGER NOT NULL DEFAULT 0,
+        total INTEGER NOT NULL DEFAULT 0
+    )
+"""
+
+SELECT_MINUTES = """
+    SELECT
+        ts / 60 AS minute,
+        strftime('%Y-%m-%d %H:%M:00', ts / 60 * 60, 'unixepoch'),
+        SUM(CASE WHEN status = 'approved' THEN count ELSE 0 END),
+        SUM(CASE WHEN status = 'failed' THEN count ELSE 0 END),
+        SUM(CASE WHEN status = 'denied' THEN count ELSE 0 END),
+        SUM(CASE WHEN status = 'reversed' THEN count ELSE 0 END),
+        SUM(count)
+    FROM transactions
+    WHERE ts IS NOT NULL{where}
+    GROUP BY minute
+"""
+
+UPSERT_MINUTE = f"""
+    INSERT INTO {MINUTE_TABLE} (minute, timestamp, approved, failed, denied, reversed, total)
+    VALUES (?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT(minute) DO UPDATE SET
+        approved = excluded.approved,
+        failed = excluded.failed,
+        denied = excluded.denied,
+        reversed = excluded.reversed,
+        total = excluded.total
+"""
+
+ROLLUP_COLUMNS = tuple(name for column in COUNT_COLUMNS for name in (column, f'{column}_sq')) + ('minutes',)
+
+
+def rollup_schema(table, key):
+    return f"""
+        CREATE TABLE IF NOT EXISTS {table} (
+            {key} INTEGER PRIMARY KEY,
+            timestamp TEXT NOT NULL,
+            {', '.join(f'{name} INTEGER NOT NULL DEFAULT 0' for name in ROLLUP_COLUMNS)}
+        )
+    """
+
+
+def rollup_upsert(table, key, size):
+    return f"""
+        INSERT INTO {table} ({key}, timestamp, {', '.join(ROLLUP_COLUMNS)})
+        VALUES (?1, strftime('%Y-%m-%d %H:%M:00', ?1 * {size * 60}, 'unixepoch'),
+                {', '.join(f'?{i + 2}' for i in range(len(ROLLUP_COLUMNS)))})
+        ON CONFLICT({key}) DO UPDATE SET
+            {', '.join(f'{name} = {name} + excluded.{name}' for name in ROLLUP_COLUMNS)}
+    """
+
+
+def rollup_seed(table, key, size, sources):
+    union = ' UNION ALL '.join(
+        f"SELECT minute, {', '.join(COUNT_COLUMNS)} FROM {source}" for source in sources
+    )
+    sums = ''.join(f"SUM({column}), SUM({column} * {column}), " for column in COUNT_COLUMNS)
+    return f"""
+        INSERT INTO {table} ({key}, timestamp, {', '.join(ROLLUP_COLUMNS)})
+        SELECT
+            minute / {size},
+            strftime('%Y-%m-%d %H:%M:00', minute / {size} * {size * 60}, 'unixepoch'),
+            {sums}COUNT(*)
+        FROM ({union})
+        GROUP BY minute / {size}
+    """
+
+
+def table_names(conn):
+    return {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type='table'")}
+
+
+@contextmanager
+def immediate_transaction(conn):
+    if conn.in_transaction:
+        conn.commit()
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        yield conn
+    except BaseException:
+        conn.rollback()
+        raise
+    conn.commit()
+
+
+def ensure_rollups(conn):
+    if all(table in table_names(conn) for table, _, _ in ROLLUPS):
+        return
+
+    with immediate_transaction(conn):
+        tables = table_names(conn)
+        missing = [rollup for rollup in ROLLUPS if rollup[0] not in tables]
+        sources = [table for table in (MINUTE_TABLE, LIVE_TABLE) if table in tables]
+        for table, key, size in missing:
+            conn.execute(rollup_schema(table, key))
+            if sources:
+                conn.execute(rollup_seed(table, key, size, sources))
+
+
+def fetch_minutes(conn, table, minutes, chunk_size=500):
+    minutes = list(minutes)
+    previous = {}
+    for i in range(0, len(minutes), chunk_size):
+        chunk = minutes[i:i + chunk_size]
+        rows = conn.execute(
+            f"SELECT minute, {', '.join(COUNT_COLUMNS)} FROM {table} "
+            f"WHERE minute IN ({', '.join('?' for _ in chunk)})",
+            chunk
+        )
+        for row in rows:
+            previous[row[0]] = tuple(row[1:])
+    return previous
+
+
+def apply_rollups(conn, changes):
+    empty = (0,) * len(COUNT_COLUMNS)
+
+    for table, key, size in ROLLUPS:
+        deltas = defaultdict(lambda: [0] * len(ROLLUP_COLUMNS))
+
+        for minute, counts, previous in changes:
+            delta = deltas[minute // size]
+            for i, (new, old) in enumerate(zip(counts or empty, previous or empty)):
+                delta[2 * i] += new - old
+                delta[2 * i + 1] += new * new - old * old
+            delta[-1] += (counts is not None) - (previous is not None)
+
+        conn.executemany(rollup_upsert(table, key, size), [
+            (bucket, *delta) for bucket, delta in deltas.items()
+        ])
+        conn.execute(f"DELETE FROM {table} WHERE minutes <= 0")
+
+
+def prepare_minute_table(conn):
+    ensure_time_columns(conn, 'transactions')
+    conn.execute(MINUTE_TABLE_SCHEMA)
+    conn.commit()
+    ensure_rollups(conn)
+
+
+def refresh_minutes(conn, start=None, end=None):
+    if start is None:
+        rows = conn.execute(SELECT_MINUTES.format(where='')).fetchall()
+        stored = conn.execute(f"SELECT minute, {', '.join(COUNT_COLUMNS)} FROM {MINUTE_TABLE}")
+    else:
+        first, last = start // 60, end // 60
+        rows = conn.execute(
+            SELECT_MINUTES.format(where=' AND ts BETWEEN ? AND ?'), (first * 60, last * 60 + 59)
+        ).fetchall()
+        stored = conn.execute(
+            f"SELECT minute, {', '.join(COUNT_COLUMNS)} FROM {MINUTE_TABLE} WHERE minute BETWEEN ? AND ?",
+            (first, last)
+        )
+
+    previous = {row[0]: tuple(row[1:]) for row in stored}
+    stale = set(previous) - {row[0] for row in rows}
+
+    conn.executemany(UPSERT_MINUTE, rows)
+    conn.executemany(f"DELETE FROM {MINUTE_TABLE} WHERE minute = ?", [(minute,) for minute in stale])
+    apply_rollups(
+        conn,
+        [(row[0], row[2:], previous.get(row[0])) for row in rows if row[2:] != previous.get(row[0])]
+        + [(minute, None, previous[minute]) for minute in stale]
+    )
+    return len(rows)
+
+
+def build_minute_table(conn):
+    prepare_minute_table(conn)
+    with immediate_transaction(conn):
+        return refresh_minutes(conn)
+
+
+def ensure_minute_table(conn):
+    tables = table_names(conn)
+    if MINUTE_TABLE in tables:
+        ensure_rollups(conn)
+        return True
+    if 'transactions' not in tables:
+        return False
+
+    columns = {row[1] for row in conn.execute("PRAGMA table_info(transactions)")}
+    if not {'timestamp', 'status', 'count'} <= columns:
+        return False
+
+    try:
+        build_minute_table(conn)
+    except sqlite3.OperationalError:
+        return False
+    return True
+
+
+def pick_rollup(interval):
+    for table, key, size in ROLLUPS:
+        if interval % size == 0:
+            return table, key, size
+    return None
+
+
+def bucket_query(interval, sources, start_minute=None, end_minute=None):
+    rollup = pick_rollup(interval)
+    if rollup is not None:
+        source, key, size = rollup
+    else:
+        key, size = 'minute', 1
+        source = '(' + ' UNION ALL '.join(
+            f"SELECT minute, 1 AS minutes, {', '.join(COUNT_COLUMNS)} FROM {table}" for table in sources
+        ) + ')'
+
+    factor = interval // size
+    query = f"""
+        SELECT
+            strftime('%Y-%m-%d %H:%M:00', {key} / {factor} * {interval * 60}, 'unixepoch') AS timestamp,
+            {', '.join(f'SUM({column}) AS {column}' for column in COUNT_COLUMNS)},
+            SUM(minutes) AS minutes_count
+        FROM {source}
+        WHERE 1=1
+    """
+    params = []
+
+    if start_minute is not None:
+        query += f" AND {key} >= ?"
+        params.append(start_minute // interval * factor)
+    if end_minute is not None:
+        query += f" AND {key} <= ?"
+        params.append(end_minute // size)
+
+    query += f" GROUP BY {key} / {factor} ORDER BY {key} / {factor} DESC LIMIT ?"
+    return query, params
@@ -0,0 +1,49 @@
+from datetime import datetime
+
+EPOCH = datetime(1970, 1, 1)
+TIME_COLUMNS = ('ts', 'hour', 'day')
+
+TIME_INDEXES = {
+    'transactions': (
+        ('idx_transactions_ts', '(ts, status, count)'),
+        ('idx_transactions_status_ts', '(status, ts, count)'),
+        ('idx_transactions_day', '(day, status, count)'),
+        ('idx_transactions_hour', '(hour, status, count)')
+    ),
+    'auth_codes': (
+        ('idx_auth_codes_ts', '(ts, auth_code, count)'),
+        ('idx_auth_codes_day', '(day, auth_code, count)')
+    )
+}
+
+BACKFILL = """
+    UPDATE "{table}" SET
+        ts = CAST(strftime('%s', timestamp) AS INTEGER),
+        hour = CAST(strftime('%s', timestamp) AS INTEGER) / 3600 % 24,
+        day = CAST(strftime('%s', timestamp) AS INTEGER) / 86400
+    WHERE ts IS NULL AND timestamp IS NOT NULL
+"""
+
+
+def time_columns(timestamp):
+    ts = int((datetime.fromisoformat(timestamp) - EPOCH).total_seconds())
+    return ts, ts // 3600 % 24, ts // 86400
+
+
+def table_columns(conn, table):
+    return {row[1] for row in conn.execute(f'PRAGMA table_info("{table}")')}
+
+
+def ensure_time_columns(conn, table):
+    columns = table_columns(conn, table)
+    if 'timestamp' not in columns:
+        return False
+
+    with conn:
+        for column in TIME_COLUMNS:
+            if column not in columns:
+                conn.execute(f'ALTER TABLE "{table}" ADD COLUMN {column} INTEGER')
+        conn.execute(BACKFILL.format(table=table))
+        for name, definition in TIME_INDEXES.get(table, ()):
+            conn.execute(f'CREATE INDEX IF NOT EXISTS {name} ON "{table}" {definition}')
+    return True
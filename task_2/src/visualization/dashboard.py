@@ -3,18 +3,33 @@ import pandas as pd
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 import requests
+import json
 from datetime import datetime, timedelta
 import time
 import uuid
 
 API_URL = "http://localhost:5000"
+STREAM_READ_TIMEOUT = 30
+RECENT_ALERTS_LIMIT = 100
+ALERT_FILTERS = {
+    'All': {},
+    'CRITICAL': {'severity': 'CRITICAL'},
+    'WARNING': {'severity': 'WARNING'},
+    'Failed': {'category': 'failed'},
+    'Denied': {'category': 'denied'},
+    'Reversed': {'category': 'reversed'},
+    'Statistical': {'category': 'statistical'},
+    'Entity': {'category': 'entity'},
+    'Auth Code': {'category': 'auth_code'}
+}
 
 st.set_page_config(page_title="Transaction Monitor", layout="wide")
 st.title("Transaction Monitoring System")
 
 if 'initialized' not in st.session_state:
     st.session_state.initialized = True
-    st.session_state.alert_history = []
+    st.session_state.alerts_cursors = [None]
+    st.session_state.alerts_query = None
     st.session_state.buffer_data = []
     st.session_state.alerts_page = 1
     st.session_state.alerts_filter = 'All'
@@ -28,7 +43,6 @@ if 'initialized' not in st.session_state:
     st.session_state.last_update = time.time()
     st.session_state.update_counter = 0
     st.session_state.chart_rendered = False
-    st.session_state.alert_counter = 0
     st.session_state.alert_details = {}
 
 with st.sidebar:
@@ -66,7 +80,7 @@ with st.sidebar:
             try:
                 requests.post(f"{API_URL}/api/reset", timeout=2)
                 st.success("System reset completed")
-                st.session_state.alert_history = []
+                st.session_state.alerts_cursors = [None]
                 st.session_state.buffer_data = []
                 st.session_state.alerts_page = 1
                 st.session_state.chart_initialized = False
@@ -74,7 +88,6 @@ with st.sidebar:
                 st.session_state.fig = None
                 st.session_state.chart_key = str(uuid.uuid4())
                 st.session_state.chart_rendered = False
-                st.session_state.alert_counter = 0
                 st.session_state.alert_details = {}
                 time.sleep(1)
                 st.rerun()
@@ -92,6 +105,65 @@ def should_update_chart():
     current_second = datetime.now().second
     return current_second in [0, 15, 30, 45]
 
+def read_events(response):
+    event, event_id, data = 'message', None, []
+    for line in response.iter_lines(chunk_size=None, decode_unicode=True):
+        if line.startswith(':'):
+            yield 'keepalive', None, None
+        elif line.startswith('id:'):
+            event_id = line[3:].strip()
+        elif line.startswith('event:'):
+            event = line[6:].strip()
+        elif line.startswith('data:'):
+            data.append(line[5:].strip())
+        elif not line and data:
+            yield event, event_id, json.loads('\n'.join(data))
+            event, event_id, data = 'message', None, []
+
+def seed_buffer_data(minutes):
+    snapshot = requests.get(f"{API_URL}/api/dashboard/snapshot", params={'minutes': minutes, 'alerts': 0}, timeout=2).json()
+    
+    st.session_state.buffer_data = [
+        {
+            'timestamp': datetime.strptime(point['timestamp'], '%Y-%m-%d %H:%M:%S'),
+            'failed': point.get('failed', 0),
+            'denied': point.get('denied', 0),
+            'reversed': point.get('reversed', 0),
+            'approved': point.get('approved', 0),
+            'total': point.get('total', 0)
+        }
+        for point in snapshot.get('series', [])
+    ]
+    if st.session_state.buffer_data:
+        st.session_state.chart_initialized = True
+
+def live_updates():
+    status, alerts, system_stats = {}, {'alerts': []}, {}
+    last_event_id = None
+    
+    while True:
+        headers = {'Last-Event-ID': last_event_id} if last_event_id else {}
+        with requests.get(f"{API_URL}/api/stream", headers=headers, stream=True, timeout=(2, STREAM_READ_TIMEOUT)) as response:
+            response.raise_for_status()
+            response.encoding = 'utf-8'
+            
+            for event, event_id, payload in read_events(response):
+                if event_id is not None:
+                    last_event_id = event_id
+                
+                if event == 'snapshot':
+                    status = payload['status']
+                    alerts = {'alerts': payload['alerts']}
+                    system_stats = payload['stats']
+                elif event == 'minute':
+                    status = payload
+                elif event == 'alert':
+                    alerts = {'alerts': ([payload] + alerts['alerts'])[:RECENT_ALERTS_LIMIT]}
+                elif event == 'stats':
+                    system_stats = payload
+                
+                yield status, alerts, system_stats
+
 if st.session_state.current_tab == "Dashboard":
     spike_placeholder = st.empty()
     metrics_placeholder = st.empty()
@@ -99,17 +171,20 @@ if st.session_state.current_tab == "Dashboard":
     stats_placeholder = st.empty()
     
     st.session_state.chart_rendered = False
+    updates = None
     
     while st.session_state.current_tab == "Dashboard":
         try:
+            if updates is None:
+                seed_buffer_data(chart_minutes)
+                updates = live_updates()
+            
             current_time_val = time.time()
             if current_time_val - st.session_state.last_update >= refresh_rate:
                 st.session_state.last_update = current_time_val
                 st.session_state.update_counter += 1
             
-            status = requests.get(f"{API_URL}/api/status/current", timeout=1).json()
-            alerts = requests.get(f"{API_URL}/api/alerts?limit=100", timeout=1).json()
-            system_stats = requests.get(f"{API_URL}/api/stats", timeout=1).json()
+            status, alerts, system_stats = next(updates)
             
             current_data = status.get('current_minute_data', {})
             current_minute = status.get('current_minute', None)
@@ -290,20 +365,16 @@ if st.session_state.current_tab == "Dashboard":
                 st.subheader("System Health")
                 scol1, scol2, scol3, scol4 = st.columns(4)
                 
-                detector_stats = system_stats.get('status_stats', {}).get('total', {})
-                api_stats = system_stats.get('api', {})
-                
-                scol1.metric("Total Alerts", api_stats.get('alerts_history', 0))
-                scol2.metric("Active Minutes", api_stats.get('minutes_in_buffer', 0))
-                scol3.metric("Avg Transaction/min", f"{detector_stats.get('mean', 0):.1f}")
+                scol1.metric("Total Alerts", system_stats.get('alerts_history', 0))
+                scol2.metric("Active Minutes", system_stats.get('minutes_in_buffer', 0))
+                scol3.metric("Avg Transaction/min", f"{system_stats.get('mean', 0):.1f}")
                 scol4.metric("Z-Score Threshold", system_stats.get('z_threshold', 3.0))
             
             if st.session_state.current_tab != "Dashboard":
                 break
             
-            time.sleep(0.1)
-            
         except Exception as e:
+            updates = None
             st.error(f"Connection Error: {e}")
             time.sleep(2)
             continue
@@ -316,33 +387,55 @@ elif st.session_state.current_tab == "Alerts":
     with col1:
         st.subheader("Filters")
         
-        filter_options = ['All', 'CRITICAL', 'WARNING', 'Failed', 'Denied', 'Reversed', 'Statistical']
+        filter_options = list(ALERT_FILTERS)
         selected_filter = st.selectbox("Filter by type", filter_options, key="alerts_filter_select")
         st.session_state.alerts_filter = selected_filter
+        alerts_per_page = st.selectbox("Alerts per page", [5, 10, 20, 50], index=1, key="alerts_per_page_select")
         
-        st.divider()
-        st.subheader("Statistics")
+        if st.session_state.alerts_query != (selected_filter, alerts_per_page):
+            st.session_state.alerts_query = (selected_filter, alerts_per_page)
+            st.session_state.alerts_cursors = [None]
+            st.session_state.alerts_page = 1
+        
+        params = dict(ALERT_FILTERS[selected_filter], limit=alerts_per_page)
+        cursor = st.session_state.alerts_cursors[st.session_state.alerts_page - 1]
+        if cursor:
+            params['cursor'] = cursor
+        
+        page_alerts = []
+        next_cursor = None
+        counts = {'total': 0, 'severity': {}, 'category': {}}
+        try:
+            response = requests.get(f"{API_URL}/api/alerts", params=params, timeout=2)
+            if response.status_code == 200:
+                payload = response.json()
+                page_alerts = payload.get('alerts', [])
+                next_cursor = payload.get('next_cursor')
+                counts = payload.get('counts', counts)
+            elif response.status_code == 400:
+                st.session_state.alerts_cursors = [None]
+                st.session_state.alerts_page = 1
+        except:
+            pass
         
-        total_alerts = len(st.session_state.alert_history)
-        critical_count = sum(1 for a in st.session_state.alert_history if a.get('severity') == 'CRITICAL')
-        warning_count = sum(1 for a in st.session_state.alert_history if a.get('severity') == 'WARNING')
+        total_alerts = counts.get('total', 0)
+        critical_count = counts['severity'].get('CRITICAL', 0)
+        warning_count = counts['severity'].get('WARNING', 0)
+        failed_count = counts['category'].get('failed', 0)
+        denied_count = counts['category'].get('denied', 0)
+        reversed_count = counts['category'].get('reversed', 0)
+        statistical_count = counts['category'].get('statistical', 0)
         
-        failed_count = 0
-        denied_count = 0
-        reversed_count = 0
-        statistical_count = 0
+        filter_params = ALERT_FILTERS[selected_filter]
+        if 'severity' in filter_params:
+            filtered_total = counts['severity'].get(filter_params['severity'], 0)
+        elif 'category' in filter_params:
+            filtered_total = counts['category'].get(filter_params['category'], 0)
+        else:
+            filtered_total = total_alerts
         
-        for alert in st.session_state.alert_history:
-            for anomaly in alert.get('anomalies', []):
-                anomaly_type = anomaly.get('type', '')
-                if 'failed' in anomaly_type:
-                    failed_count += 1
-                if 'denied' in anomaly_type:
-                    denied_count += 1
-                if 'reversed' in anomaly_type:
-                    reversed_count += 1
-                if 'outlier' in anomaly_type or 'statistical' in anomaly_type or 'spike' in anomaly_type:
-                    statistical_count += 1
+        st.divider()
+        st.subheader("Statistics")
         
         st.metric("Total Alerts", total_alerts)
         st.metric("Critical", critical_count)
@@ -355,88 +448,62 @@ elif st.session_state.current_tab == "Alerts":
         st.divider()
         
         if st.button("Clear All Alerts", key="clear_alerts_btn"):
-            st.session_state.alert_history = []
+            try:
+                requests.post(f"{API_URL}/api/alerts/clear", timeout=2)
+            except:
+                pass
+            st.session_state.alerts_cursors = [None]
             st.session_state.alerts_page = 1
-            st.session_state.alert_counter = 0
             st.session_state.alert_details = {}
             st.rerun()
-        
-        alerts_per_page = st.selectbox("Alerts per page", [5, 10, 20, 50], index=1, key="alerts_per_page_select")
     
     with col2:
-        try:
-            response = requests.get(f"{API_URL}/api/alerts?limit=1000", timeout=2)
-            if response.status_code == 200:
-                api_alerts = response.json().get('alerts', [])
-                
-                for alert in api_alerts:
-                    alert_id = alert.get('timestamp', '') + str(alert.get('anomaly_score', '')) + str(hash(str(alert.get('anomalies', ''))))
-                    
-                    if alert_id not in st.session_state.alert_details:
-                        st.session_state.alert_counter += 1
-                        alert_data = {
-                            'id': st.session_state.alert_counter,
-                            'alert_id': alert_id,
-                            'timestamp': alert.get('timestamp', ''),
-                            'score': alert.get('anomaly_score', 0),
-                            'severity': 'CRITICAL' if alert.get('anomaly_score', 0) >= 70 else 'WARNING',
-                            'recommendation': alert.get('recommendation', 'NORMAL'),
-                            'anomalies': alert.get('anomalies', []),
-                            'deliberations': [],
-                            'status': 'new',
-                            'acknowledged': False,
-                            'resolved': False,
-                            'notes': ''
-                        }
-                        st.session_state.alert_details[alert_id] = alert_data
-                        st.session_state.alert_history.append(alert_data)
-                
-                st.session_state.alert_history.sort(key=lambda x: x.get('timestamp', ''), reverse=True)
-        except:
-            pass
-        
-        filtered_alerts = []
-        
-        if selected_filter == 'All':
-            filtered_alerts = st.session_state.alert_history
-        elif selected_filter == 'CRITICAL':
-            filtered_alerts = [a for a in st.session_state.alert_history if a.get('severity') == 'CRITICAL']
-        elif selected_filter == 'WARNING':
-            filtered_alerts = [a for a in st.session_state.alert_history if a.get('severity') == 'WARNING']
-        elif selected_filter in ['Failed', 'Denied', 'Reversed', 'Statistical']:
-            filter_lower = selected_filter.lower()
-            for alert in st.session_state.alert_history:
-                for anomaly in alert.get('anomalies', []):
-                    anomaly_type = anomaly.get('type', '').lower()
-                    if filter_lower in anomaly_type:
-                        filtered_alerts.append(alert)
-                        break
-        
-        total_pages = max(1, (len(filtered_alerts) + alerts_per_page - 1) // alerts_per_page)
-        
-        if st.session_state.alerts_page > total_pages:
-            st.session_state.alerts_page = 1
+        for i, api_alert in enumerate(page_alerts):
+            alert_id = api_alert['id']
+            alert = st.session_state.alert_details.setdefault(alert_id, {
+                'id': alert_id,
+                'alert_id': alert_id,
+                'deliberations': [],
+                'status': 'new',
+                'acknowledged': False,
+                'resolved': False,
+                'notes': ''
+            })
+            alert.update({
+                'timestamp': api_alert.get('timestamp', ''),
+                'score': api_alert.get('anomaly_score', 0),
+                'severity': api_alert.get('severity', 'WARNING'),
+                'recommendation': api_alert.get('recommendation', 'NORMAL'),
+                'anomalies': api_alert.get('anomalies', []),
+                'incident_id': api_alert.get('incident_id'),
+                'incident_status': api_alert.get('incident_status'),
+                'occurrences': api_alert.get('occurrences', 1),
+                'last_seen': api_alert.get('last_seen')
+            })
+            page_alerts[i] = alert
         
-        if filtered_alerts:
+        if page_alerts:
             start_idx = (st.session_state.alerts_page - 1) * alerts_per_page
-            end_idx = min(start_idx + alerts_per_page, len(filtered_alerts))
-            page_alerts = filtered_alerts[start_idx:end_idx]
+            end_idx = start_idx + len(page_alerts)
             
-            st.subheader(f"Showing {start_idx + 1}-{end_idx} of {len(filtered_alerts)} alerts")
+            st.subheader(f"Showing {start_idx + 1}-{end_idx} of {filtered_total} alerts")
             
             for idx, alert in enumerate(page_alerts):
                 alert_id = alert.get('alert_id', str(idx))
                 severity = alert.get('severity', 'WARNING')
                 score = alert.get('score', 0)
                 timestamp = alert.get('timestamp', 'Unknown')
+                incident_note = ''
+                if alert.get('occurrences', 1) > 1:
+                    incident_note = f" - {alert['occurrences']}x until {alert.get('last_seen', '')} ({alert.get('incident_status', '')})"
                 
                 cols = st.columns([4, 1])
                 
                 with cols[0]:
                     if severity == 'CRITICAL':
-                        st.error(f"ALERT #{alert.get('id', '')} - [{timestamp}] CRITICAL - Score: {score}")
+                        st.error(f"ALERT #{alert.get('id', '')} - [{timestamp}] CRITICAL - Score: {score}{incident_note}")
                     else:
-                        st.warning(f"ALERT #{alert.get('id', '')} - [{timestamp}] WARNING - Score: {score}")
+                        st.warning(f"ALERT #{alert.get('id', '')} - [{timestamp}] WARNING - Score: {score}{incident_note}")
                 
                 with cols[1]:
                     status_options = ['new', 'investigating', 'mitigated', 'resolved', 'false_positive']
@@ -549,7 +616,7 @@ elif st.session_state.current_tab == "Alerts":
                 
                 st.divider()
             
-            if total_pages > 1:
+            if st.session_state.alerts_page > 1 or next_cursor:
                 col_prev, col_pages, col_next = st.columns([1, 3, 1])
                 
                 with col_prev:
@@ -558,27 +625,13 @@ elif st.session_state.current_tab == "Alerts":
                         st.rerun()
                 
                 with col_pages:
-                    page_numbers = []
-                    start_page = max(1, st.session_state.alerts_page - 2)
-                    end_page = min(total_pages, st.session_state.alerts_page + 2)
-                    
-                    for i in range(start_page, end_page + 1):
-                        page_numbers.append(i)
-                    
-                    page_cols = st.columns(len(page_numbers))
-                    for i, page_num in enumerate(page_numbers):
-                        with page_cols[i]:
-                            btn_key = f"page_{page_num}_{st.session_state.chart_key}_{idx}"
-                            if st.button(
-                                str(page_num),
-                                key=btn_key,
-                                type="primary" if page_num == st.session_state.alerts_page else "secondary"
-                            ):
-                                st.session_state.alerts_page = page_num
-                                st.rerun()
+                    total_pages = max(st.session_state.alerts_page, (filtered_total + alerts_per_page - 1) // alerts_per_page)
+                    st.write(f"Page {st.session_state.alerts_page} of {total_pages}")
                 
                 with col_next:
-                    if st.button("Next", key="next_btn", disabled=st.session_state.alerts_page >= total_pages):
+                    if st.button("Next", key="next_btn", disabled=not next_cursor):
+                        del st.session_state.alerts_cursors[st.session_state.alerts_page:]
+                        st.session_state.alerts_cursors.append(next_cursor)
                         st.session_state.alerts_page += 1
                         st.rerun()
         else: